@@ -0,0 +1,295 @@
+#Benchmark of the csvMaster stages on a synthetic schema and csv corpus.
+#Usage: python benchmark.py --tables 2000 --files 5000 --rows 200 --output bench.json
+import argparse, contextlib, datetime, json, os, platform, random, shutil, subprocess, sys, tempfile, time
+from os.path import join
+
+from main import *
+
+DATA_TYPES = ['integer', 'character varying(20)', 'text', 'numeric', 'timestamp without time zone']
+SHARED_COLUMNS = ['id', 'name', 'status', 'remarks', 'created_by', 'updated_by']
+#file marking the folders created by the benchmark, only these folders are emptied
+WORK_FOLDER_MARKER = '.csvmaster_bench'
+
+
+#returns the synthetic table structures. Each table is a list of (columnName, dataType, isNotNull, default).
+def generateTables(rnd, noOfTables, noOfColumns):
+    tableMap = {}
+    for tableCtr in range(noOfTables):
+        tableName = 'bench{}_tbl'.format(tableCtr)
+        width = rnd.randint(max(2, noOfColumns // 2), max(2, noOfColumns))
+        columnNameList = ['id'] + rnd.sample(SHARED_COLUMNS[1:], 2)
+        columnNameList += ['{}_col{}'.format(tableName[:-4], ctr) for ctr in range(width - len(columnNameList))]
+
+        columnList = []
+        for columnName in columnNameList:
+            dataType = rnd.choice(DATA_TYPES)
+            default = '0' if dataType == 'integer' and rnd.random() < 0.3 else None
+            columnList.append((columnName, dataType, columnName == 'id' or default is not None, default))
+        tableMap[tableName] = columnList
+    return tableMap
+
+
+#returns the table structures with renamed columns
+def renameTables(rnd, tableMap, tableNameList):
+    renamedTableMap = dict(tableMap)
+    for tableName in tableNameList:
+        columnList = list(tableMap[tableName])
+        index = rnd.randrange(1, len(columnList))
+        columnName, dataType, isNotNull, default = columnList[index]
+        columnList[index] = (columnName + '_renamed', dataType, isNotNull, default)
+        renamedTableMap[tableName] = columnList
+    return renamedTableMap
+
+
+#returns the table structures with reordered, added and deleted columns
+def restructureTables(rnd, tableMap, tableNameList):
+    restructuredTableMap = dict(tableMap)
+    for tableName in tableNameList:
+        columnList = list(reversed(tableMap[tableName]))
+        if len(columnList) > 3:
+            del columnList[rnd.randrange(len(columnList))]
+        columnList.append(('{}_added'.format(tableName[:-4]), 'integer', True, '0'))
+        restructuredTableMap[tableName] = columnList
+    return restructuredTableMap
+
+
+#function to write a schema file the same way pg_dump does
+def writeSchema(schemaPath, tableMap):
+    with open(schemaPath, 'w', encoding='utf-8') as fp:
+        for tableName in tableMap:
+            fp.write('CREATE TABLE public.{} (\n'.format(tableName))
+            definitionList = []
+            for columnName, dataType, isNotNull, default in tableMap[tableName]:
+                definition = '    {} {}'.format(columnName, dataType)
+                if default is not None:
+                    definition += ' DEFAULT {}'.format(default)
+                if isNotNull:
+                    definition += ' NOT NULL'
+                definitionList.append(definition)
+            fp.write(',\n'.join(definitionList))
+            fp.write('\n);\n\n')
+
+
+#function to write the csv corpus. Returns the number of rows and bytes written.
+def writeCorpus(rnd, sourcePath, tableMap, tableGroupMap, parameterMap):
+    noOfRows = 0
+    noOfBytes = 0
+    groupNameList = ['renamed', 'restructured', 'unknown', 'unchanged']
+    groupWeightList = [parameterMap['renamed'], parameterMap['restructured'], parameterMap['unknown']]
+    groupWeightList.append(max(0.0, 1.0 - sum(groupWeightList)))
+
+    for fileCtr in range(parameterMap['files']):
+        folderPath = join(sourcePath, 'folder{}'.format(fileCtr % parameterMap['folders']))
+        os.makedirs(folderPath, exist_ok=True)
+
+        groupName = rnd.choices(groupNameList, groupWeightList)[0]
+        if groupName == 'unknown' or not tableGroupMap[groupName]:
+            columnNameList = ['unknown{}_{}'.format(fileCtr, ctr) for ctr in range(rnd.randint(2, parameterMap['columns']))]
+        else:
+            columnNameList = [column[0] for column in tableMap[rnd.choice(tableGroupMap[groupName])]]
+
+        filePath = join(folderPath, 'file{}.csv'.format(fileCtr))
+        if parameterMap['compression']:
+            filePath += '.' + parameterMap['compression']
+        with openCsvFile(filePath, 'wt', encoding='utf-8') as fp:
+            fp.write(','.join(columnNameList) + '\n')
+            for rowCtr in range(parameterMap['rows']):
+                fp.write(','.join('' if rnd.random() < 0.1 else str(rowCtr) for columnName in columnNameList) + '\n')
+        noOfRows += parameterMap['rows']
+        noOfBytes += os.path.getsize(filePath)
+    return noOfRows, noOfBytes
+
+
+#function to generate the schemas and the csv corpus in the work folder
+def generateCorpus(workPath, parameterMap):
+    rnd = random.Random(parameterMap['seed'])
+    tableMap = generateTables(rnd, parameterMap['tables'], parameterMap['columns'])
+    tableNameList = list(tableMap)
+    rnd.shuffle(tableNameList)
+
+    noOfRenamed = int(len(tableNameList) * parameterMap['renamed'])
+    noOfRestructured = int(len(tableNameList) * parameterMap['restructured'])
+    tableGroupMap = {}
+    tableGroupMap['renamed'] = tableNameList[:noOfRenamed]
+    tableGroupMap['restructured'] = tableNameList[noOfRenamed:noOfRenamed + noOfRestructured]
+    tableGroupMap['unchanged'] = tableNameList[noOfRenamed + noOfRestructured:]
+
+    renamedTableMap = renameTables(rnd, tableMap, tableGroupMap['renamed'])
+    restructuredTableMap = restructureTables(rnd, renamedTableMap, tableGroupMap['restructured'])
+
+    schemaPathMap = {}
+    schemaPathMap['current'] = join(workPath, 'schema-current.sql')
+    schemaPathMap['renaming'] = join(workPath, 'schema-renaming.sql')
+    schemaPathMap['latest'] = join(workPath, 'schema-latest.sql')
+    writeSchema(schemaPathMap['current'], tableMap)
+    writeSchema(schemaPathMap['renaming'], renamedTableMap)
+    writeSchema(schemaPathMap['latest'], restructuredTableMap)
+
+    sourcePath = join(workPath, 'source')
+    noOfRows, noOfBytes = writeCorpus(rnd, sourcePath, tableMap, tableGroupMap, parameterMap)
+
+    corpusMap = {}
+    corpusMap['schemaPathMap'] = schemaPathMap
+    corpusMap['sourcePath'] = sourcePath
+    corpusMap['rows'] = noOfRows
+    corpusMap['bytes'] = noOfBytes
+    return corpusMap
+
+
+#runs a stage and saves its wall and cpu time
+def timeStage(stageTimeMap, stageName, function, *args):
+    wallStart = time.perf_counter()
+    cpuStart = time.process_time()
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        result = function(*args)
+    stageTimeMap[stageName] = {'wallSeconds': time.perf_counter() - wallStart, 'cpuSeconds': time.process_time() - cpuStart}
+    return result
+
+
+#runs all the stages once on the corpus, the same way main.py does
+def runStages(corpusMap, parameterMap, workPath):
+    stageTimeMap = {}
+    schemaPathMap = corpusMap['schemaPathMap']
+    schemaMap = timeStage(stageTimeMap, 'parseSchema', parseSchemaFiles, list(schemaPathMap.values()), '', parameterMap['workers'])
+    tableMap, tableColumnCurrentMap = schemaMap[schemaPathMap['current']]
+    tableRenamedMap, tableColumnRenamedMap = schemaMap[schemaPathMap['renaming']]
+    tableRestructuredMap, tableColumnRestructuredMap = schemaMap[schemaPathMap['latest']]
+
+    renamedTableList = getModifiedTables(tableColumnCurrentMap, tableColumnRenamedMap)
+    updatedTableColumnMap = tableColumnCurrentMap.copy()
+    updateTableColumns(updatedTableColumnMap, tableColumnRenamedMap, renamedTableList)
+    restructuredTableList = getModifiedTables(updatedTableColumnMap, tableColumnRestructuredMap)
+
+    fileSearchPattern = config['OTHERS']['FILES_SEARCH_PATTERN']
+    fileNamePattern = config['OTHERS']['FILES_TO_FIND']
+    fileList = timeStage(stageTimeMap, 'listFiles', listFiles, corpusMap['sourcePath'], fileSearchPattern, fileNamePattern)
+
+    excludedFieldNameList = covertTrimmedStringToList(config['OTHERS']['EXCLUDED_SUFFIX_FIELD_NAMES'])
+    excludedColumnMap = getExcludedColumnMap(tableColumnCurrentMap, excludedFieldNameList)
+    tableIndexMap = buildTableIndex(excludedColumnMap)
+    isTestMode = 'Y' if parameterMap['testMode'] else 'N'
+    if parameterMap['pipeline'] == 'asyncio':
+        #identification and processing overlap so they are timed together
+        dataMap = getProcessData(updatedTableColumnMap, restructuredTableList, tableColumnRestructuredMap, tableRestructuredMap, '', isTestMode, parameterMap['engine'], CHUNK_SIZE, parameterMap['headerFastPath'], 0, None, parameterMap['compressOutput'], parameterMap['splitThreshold'])
+        pipelineCoroutine = processPipeline(iter(fileList), excludedColumnMap, excludedFieldNameList, tableIndexMap, renamedTableList, restructuredTableList, dataMap, 'Y', parameterMap['ioConcurrency'], parameterMap['workers'])
+        csvTableMapping, processedFileResultMap = timeStage(stageTimeMap, 'processPipeline', asyncio.run, pipelineCoroutine)
+    else:
+        csvTableMapping = timeStage(stageTimeMap, 'processCsvTableIdentification', processCsvTableIdentification, fileList, excludedColumnMap, excludedFieldNameList, parameterMap['ioConcurrency'], tableIndexMap)
+        processedFileResultMap = timeStage(stageTimeMap, 'process', process, csvTableMapping, renamedTableList, updatedTableColumnMap, restructuredTableList, tableColumnRestructuredMap, tableRestructuredMap, '', isTestMode, 'Y', parameterMap['workers'], parameterMap['engine'], CHUNK_SIZE, None, parameterMap['headerFastPath'], 0, None, parameterMap['compressOutput'], parameterMap['splitThreshold'])
+
+    newTableList, deletedTableList = getNewAndDeletedTableList(updatedTableColumnMap, tableColumnRestructuredMap)
+    reportingMap = {}
+    reportingMap['originalTableList'] = tableColumnCurrentMap.keys()
+    reportingMap['renamedTableList'] = renamedTableList
+    reportingMap['restructuredTableList'] = restructuredTableList
+    reportingMap['newTableList'] = newTableList
+    reportingMap['deletedTableList'] = deletedTableList
+    reportingMap['csvTableMapping'] = csvTableMapping
+    reportingMap['processedFileResultMap'] = processedFileResultMap
+    timeStage(stageTimeMap, 'createReport', createReport, reportingMap, join(workPath, 'report.xlsx'))
+
+    modeCountMap = {}
+    for filePath in processedFileResultMap:
+        mode = str(processedFileResultMap[filePath]['mode'])
+        modeCountMap[mode] = modeCountMap.get(mode, 0) + 1
+    return stageTimeMap, modeCountMap
+
+
+#returns True when a folder can be used for the corpus: it does not exist yet, it is empty or it was created by the benchmark
+def isWorkFolder(workDir):
+    if not os.path.exists(workDir):
+        return True
+    return os.path.isdir(workDir) and (not os.listdir(workDir) or os.path.isfile(join(workDir, WORK_FOLDER_MARKER)))
+
+
+#returns the empty folder where the corpus of a run is generated, a temporary folder when workDir is not given.
+#workDir is only emptied when it was created by the benchmark.
+def prepareWorkFolder(workDir):
+    if not workDir:
+        return tempfile.mkdtemp(prefix='csvmaster_bench_')
+    if not isWorkFolder(workDir):
+        raise ValueError('{} is not empty and was not created by the benchmark!'.format(workDir))
+    if os.path.isfile(join(workDir, WORK_FOLDER_MARKER)):
+        shutil.rmtree(workDir)
+    os.makedirs(workDir, exist_ok=True)
+    open(join(workDir, WORK_FOLDER_MARKER), 'w').close()
+    return workDir
+
+
+#returns the commit of the working tree, if any
+def getCommit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=currentPath, capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return ''
+
+
+def parseArguments():
+    parser = argparse.ArgumentParser(description='Benchmark the csvMaster stages on a synthetic corpus.')
+    parser.add_argument('--tables', type=int, default=500, help='number of tables in the schema')
+    parser.add_argument('--columns', type=int, default=20, help='maximum number of columns per table')
+    parser.add_argument('--files', type=int, default=2000, help='number of csv files')
+    parser.add_argument('--folders', type=int, default=50, help='number of folders the csv files are spread in')
+    parser.add_argument('--rows', type=int, default=100, help='number of data rows per csv file')
+    parser.add_argument('--renamed', type=float, default=0.2, help='fraction of tables (and files) with renamed columns')
+    parser.add_argument('--restructured', type=float, default=0.2, help='fraction of tables (and files) that are restructured')
+    parser.add_argument('--unknown', type=float, default=0.1, help='fraction of files with an unknown header')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=1, help='number of runs, the fastest time per stage is kept')
+    parser.add_argument('--workers', default='1', help='same as WORKERS in config.ini')
+    parser.add_argument('--io-concurrency', dest='ioConcurrency', default='1', help='same as IO_CONCURRENCY in config.ini')
+    parser.add_argument('--engine', default='python', help='same as ENGINE in config.ini')
+    parser.add_argument('--header-fast-path', dest='headerFastPath', default='Y', help='same as HEADER_FAST_PATH in config.ini')
+    parser.add_argument('--pipeline', default='sequential', help='same as PIPELINE in config.ini')
+    parser.add_argument('--compression', default='', help='gz, bz2 or xz to generate compressed csv files')
+    parser.add_argument('--compress-output', dest='compressOutput', default='', help='same as COMPRESS_OUTPUT in config.ini')
+    parser.add_argument('--split-threshold', dest='splitThreshold', type=int, default=0, help='same as SPLIT_THRESHOLD in config.ini')
+    parser.add_argument('--test-mode', dest='testMode', action='store_true', help='transform the files without writing them')
+    parser.add_argument('--work-dir', dest='workDir', default='', help='new or empty folder of the generated corpus, a temporary folder by default. It is emptied on each run and kept afterwards.')
+    parser.add_argument('--output', default='benchmark.json', help='JSON file where the results are saved')
+    arguments = parser.parse_args()
+    if arguments.workDir and not isWorkFolder(arguments.workDir):
+        parser.error('--work-dir {} is not empty and was not created by the benchmark'.format(arguments.workDir))
+    return arguments
+
+
+if __name__ == "__main__":
+    arguments = parseArguments()
+    parameterMap = vars(arguments).copy()
+    workDir = parameterMap.pop('workDir')
+    outputFile = parameterMap.pop('output')
+    parameterMap.pop('repeat')
+
+    bestStageTimeMap = {}
+    for runCtr in range(max(1, arguments.repeat)):
+        #the corpus is generated again since the files are rewritten by each run
+        workPath = prepareWorkFolder(workDir)
+        try:
+            corpusMap = generateCorpus(workPath, parameterMap)
+            stageTimeMap, modeCountMap = runStages(corpusMap, parameterMap, workPath)
+        finally:
+            if not workDir:
+                shutil.rmtree(workPath, ignore_errors=True)
+
+        for stageName in stageTimeMap:
+            if stageName not in bestStageTimeMap or stageTimeMap[stageName]['wallSeconds'] < bestStageTimeMap[stageName]['wallSeconds']:
+                bestStageTimeMap[stageName] = stageTimeMap[stageName]
+
+    resultMap = {}
+    resultMap['commit'] = getCommit()
+    resultMap['timestamp'] = datetime.datetime.now().isoformat()
+    resultMap['python'] = sys.version.split()[0]
+    resultMap['platform'] = platform.platform()
+    resultMap['cpuCount'] = os.cpu_count()
+    resultMap['parameters'] = parameterMap
+    resultMap['corpus'] = {'files': arguments.files, 'rows': corpusMap['rows'], 'bytes': corpusMap['bytes']}
+    resultMap['modes'] = modeCountMap
+    resultMap['stages'] = bestStageTimeMap
+    resultMap['totalWallSeconds'] = sum(stageTime['wallSeconds'] for stageTime in bestStageTimeMap.values())
+
+    with open(outputFile, 'w', encoding='utf-8') as fp:
+        json.dump(resultMap, fp, indent=2)
+
+    for stageName in bestStageTimeMap:
+        print('{:<32} {:>10.3f}s wall {:>10.3f}s cpu'.format(stageName, bestStageTimeMap[stageName]['wallSeconds'], bestStageTimeMap[stageName]['cpuSeconds']))
+    print('Results saved on {}'.format(outputFile))
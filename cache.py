@@ -0,0 +1,94 @@
+import hashlib, os, pickle, tempfile
+
+from constants import *
+
+#returns the path of the cache file of a source file
+def getCacheFilePath(cacheFolder, filePath, suffix):
+    key = hashlib.sha1(os.path.abspath(filePath).encode('utf-8')).hexdigest()
+    return os.path.join(cacheFolder, key + suffix)
+
+
+#returns the content hash of a file
+def getFileHash(filePath):
+    sha = hashlib.sha1()
+    with open(filePath, 'rb') as fp:
+        while True:
+            block = fp.read(CACHE_READ_SIZE)
+            if not block:
+                break
+            sha.update(block)
+    return sha.hexdigest()
+
+
+#function to load a cache file. Returns None when the cache file does not exist or can not be read.
+def readCacheFile(cacheFilePath):
+    try:
+        with open(cacheFilePath, 'rb') as fp:
+            return pickle.load(fp)
+    except:
+        return None
+
+
+#function to write a cache file. The cache file is replaced only once it has been completely written.
+def writeCacheFile(cacheFilePath, cacheMap):
+    cacheFolder = os.path.dirname(cacheFilePath) or '.'
+    os.makedirs(cacheFolder, exist_ok=True)
+    fd, tempFilePath = tempfile.mkstemp(suffix='.tmp', dir=cacheFolder)
+    try:
+        with open(fd, 'wb') as fp:
+            pickle.dump(cacheMap, fp, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tempFilePath, cacheFilePath)
+    except:
+        if os.path.exists(tempFilePath):
+            os.remove(tempFilePath)
+        raise
+
+
+#returns the cached (tableMap, tableColumnMap) of a schema file. Returns None when the schema or the parser settings changed.
+def loadSchemaCache(schemaPath, settingMap, cacheFolder):
+    cacheMap = readCacheFile(getCacheFilePath(cacheFolder, schemaPath, '.schema.pickle'))
+    if not cacheMap or cacheMap.get('version') != SCHEMA_CACHE_VERSION:
+        return None
+    if cacheMap['path'] != os.path.abspath(schemaPath) or cacheMap['settings'] != settingMap:
+        return None
+
+    stat = os.stat(schemaPath)
+    if stat.st_size != cacheMap['size']:
+        return None
+    #the content is only hashed when the file has been touched since it was cached
+    if stat.st_mtime_ns != cacheMap['mtime'] and getFileHash(schemaPath) != cacheMap['hash']:
+        return None
+    return cacheMap['tableMap'], cacheMap['tableColumnMap']
+
+
+#function to save the parsed schema in the cache
+def saveSchemaCache(schemaPath, settingMap, cacheFolder, tableMap, tableColumnMap):
+    stat = os.stat(schemaPath)
+    cacheMap = {}
+    cacheMap['version'] = SCHEMA_CACHE_VERSION
+    cacheMap['path'] = os.path.abspath(schemaPath)
+    cacheMap['size'] = stat.st_size
+    cacheMap['mtime'] = stat.st_mtime_ns
+    cacheMap['hash'] = getFileHash(schemaPath)
+    cacheMap['settings'] = settingMap
+    cacheMap['tableMap'] = tableMap
+    cacheMap['tableColumnMap'] = tableColumnMap
+    writeCacheFile(getCacheFilePath(cacheFolder, schemaPath, '.schema.pickle'), cacheMap)
+
+
+
+#returns the file entries recorded by the previous run. The manifest is ignored when the settings changed.
+def loadManifest(manifestFilePath, settingMap):
+    manifestMap = readCacheFile(manifestFilePath)
+    if not manifestMap or manifestMap.get('version') != MANIFEST_VERSION or manifestMap['settings'] != settingMap:
+        return {}
+    return manifestMap['fileMap']
+
+
+#function to save the file entries of the current run
+def saveManifest(manifestFilePath, settingMap, fileMap):
+    manifestMap = {}
+    manifestMap['version'] = MANIFEST_VERSION
+    manifestMap['settings'] = settingMap
+    manifestMap['fileMap'] = fileMap
+    writeCacheFile(manifestFilePath, manifestMap)
@@ -0,0 +1,61 @@
+import csv
+
+from constants import *
+from compression import *
+from split import *
+
+#returns the lines of a restructured csv file. Rows are read in chunks and remapped with column-wide operations.
+#When byteRange is given, only the lines of this range of the file are remapped, the range starting after the header.
+#The rows are decoded as latin-1 to be read by pandas, each byte being one character, so the bytes that are not valid in the encoding
+#are kept as they are. The default values are converted the same way and the lines are returned encoded again as latin-1.
+def transformChunks(filePath, header, remapPlan, chunkSize=CHUNK_SIZE, byteRange=None, encoding=ENCODING_LIST[0]):
+    #pandas is only loaded by the runs using this engine
+    import pandas as pd
+
+    if byteRange is None:
+        fp = openCsvFile(filePath, 'rt', encoding='latin-1')
+    else:
+        fp = openFileRange(filePath, byteRange, encoding='latin-1')
+    remapPlan = [(index, value.encode(encoding).decode('latin-1')) for index, value in remapPlan]
+    with fp:
+        #an empty file stays empty
+        if byteRange is None and not fp.readline():
+            return
+        #replace the column header
+        yield header.encode(encoding)
+
+        try:
+            reader = pd.read_csv(fp, sep=',', header=None, dtype=object, keep_default_na=False, na_filter=False, quoting=csv.QUOTE_NONE, skip_blank_lines=False, chunksize=int(chunkSize))
+        except pd.errors.EmptyDataError:
+            #the file only has the header
+            return
+
+        with reader:
+            for chunk in reader:
+                #each chunk is returned as a single block of lines
+                yield remapChunk(chunk, remapPlan).encode('latin-1')
+
+
+#remaps a chunk of rows based on the remap plan of the restructured table
+def remapChunk(chunk, remapPlan):
+    import numpy as np
+
+    valueArray = chunk.to_numpy(dtype=object)
+    #lines are trimmed the same way the python engine trims their bytes, element-wise on the first and last columns.
+    #Only the ascii white spaces are removed.
+    valueArray[:, 0] = np.frompyfunc(lambda value: value.lstrip(ASCII_WHITESPACE), 1, 1)(valueArray[:, 0])
+    valueArray[:, -1] = np.frompyfunc(lambda value: value.rstrip(ASCII_WHITESPACE), 1, 1)(valueArray[:, -1])
+
+    lineArray = np.empty((len(chunk), len(remapPlan)), dtype=object)
+    for slot, (index, value) in enumerate(remapPlan):
+        if index is None:
+            #new column, always the default value
+            lineArray[:, slot] = value
+        elif value:
+            #empty values of NOT NULL columns are replaced with the default value
+            columnArray = valueArray[:, index]
+            lineArray[:, slot] = np.where(columnArray == '', value, columnArray)
+        else:
+            lineArray[:, slot] = valueArray[:, index]
+
+    return NEWLINE.join(map(','.join, lineArray.tolist()))
@@ -0,0 +1,41 @@
+import io, os, bz2, gzip, lzma
+
+from constants import *
+
+#modules opening the compressed csv files per file suffix
+compressionModuleMap = {'.gz': gzip, '.bz2': bz2, '.xz': lzma}
+
+
+#returns the path without its compression suffix together with the suffix. Uncompressed files have an empty suffix.
+def splitCompressionSuffix(filePath):
+    for suffix in compressionModuleMap:
+        if filePath.lower().endswith(suffix):
+            return filePath[:-len(suffix)], filePath[-len(suffix):].lower()
+    return filePath, ''
+
+
+#function to open a csv file, compressed or not, based on its suffix. An already opened binary file can be given as
+#fileObject, it is then read or written through the compression and is left open once the returned file is closed.
+def openCsvFile(filePath, mode='rb', encoding=None, fileObject=None, errors=None):
+    suffix = splitCompressionSuffix(filePath)[1]
+    if suffix:
+        target = fileObject if fileObject is not None else filePath
+        if suffix == '.gz' and 'w' in mode:
+            #the default level of gzip is the slowest one, the zlib default is used instead
+            return gzip.open(target, mode, compresslevel=GZIP_COMPRESS_LEVEL, encoding=encoding, errors=errors)
+        return compressionModuleMap[suffix].open(target, mode, encoding=encoding, errors=errors)
+    if fileObject is not None:
+        return fileObject if 'b' in mode else io.TextIOWrapper(fileObject, encoding=encoding, errors=errors)
+    return open(filePath, mode, encoding=encoding, errors=errors)
+
+
+#returns the path of a rewritten file. The suffix of APPEND_MODIFIED_FILE goes before the file extension and the
+#compression suffix. compressOutput is gz, bz2 or xz to compress the rewritten file, otherwise the compression of the file is kept.
+def getOutputFilePath(filePath, appendModifiedFile='', compressOutput=''):
+    basePath, suffix = splitCompressionSuffix(filePath)
+    if compressOutput:
+        suffix = '.' + compressOutput.lower().lstrip('.')
+    if appendModifiedFile:
+        fileData = os.path.splitext(basePath)
+        basePath = fileData[0] + appendModifiedFile + fileData[1]
+    return basePath + suffix
@@ -1,3 +1,36 @@
-NEWLINE= "\n"
-SUCCESS= "Success"
-FAILED= "Failed!"
\ No newline at end of file
+NEWLINE= "\n"
+NEWLINE_BYTES= b"\n"
+ASCII_WHITESPACE= " \t\r\n\x0b\x0c"
+SUCCESS= "Success"
+FAILED= "Failed!"
+NOT_WRITTEN= "No csv file written!"
+STATUS_LIST= ['-', SUCCESS, FAILED, NOT_WRITTEN]
+WRITE_BUFFER_SIZE= 1024 * 1024
+COPY_BLOCK_SIZE= 64 * 1024 * 1024
+GZIP_COMPRESS_LEVEL= 6
+HEADER_READ_SIZE= 8192
+READ_BLOCK_SIZE= 1024 * 1024
+ENCODING_LIST= ['utf-8']
+CHUNK_SIZE= 100000
+PIPELINE_QUEUE_SIZE= 256
+MAX_INFLIGHT_BYTES= 256 * 1024 * 1024
+PIPELINE_BATCH_BYTES= 4 * 1024 * 1024
+PIPELINE_BATCH_FILES= 64
+SPLIT_MIN_RANGE_BYTES= 4 * 1024 * 1024
+SPLIT_RANGES_PER_WORKER= 4
+CACHE_READ_SIZE= 1024 * 1024
+SCHEMA_CACHE_VERSION= 3
+MANIFEST_VERSION= 1
+SHARD_VERSION= 1
+SHARD_FILE_COST= 16 * 1024
+SHARD_TABLE_LIST_NAMES= ['originalTableList', 'renamedTableList', 'restructuredTableList', 'newTableList', 'deletedTableList']
+SLOWEST_FILE_COUNT= 10
+WATCH_INTERVAL= 5
+DRY_RUN_MAX_MESSAGES= 5
+VALIDATION_SAMPLE_LINES= 5
+PREFIX_FILTER_RATIO= 8
+TRACEMALLOC_FRAMES= 5
+TRACEMALLOC_TOP_COUNT= 30
+FILE_REPORT_COLUMNS= ['No.', 'File', 'Table name', 'Suggested table model', 'Unmatched column names', 'New File Created', 'Remarks', 'CSV creation status']
+PROJECTION_REPORT_COLUMNS= ['No.', 'File', 'Table name', 'Mode', 'Sampled rows', 'Estimated rows', 'Estimated bytes', 'Estimated time (s)', 'Validation']
+VALIDATION_REPORT_COLUMNS= ['No.', 'File', 'Table name', 'Rows', 'Column count', 'NOT NULL', 'Type', 'Length', 'Sample line numbers']
@@ -0,0 +1,73 @@
+import re, math
+from collections import Counter
+
+from constants import *
+
+#characters ignored when comparing column names, so that user_id, UserID and user-id are the same name
+separatorPattern = re.compile(r'[^0-9a-z]')
+
+
+#returns the column name without case and separators
+def normalizeColumnName(columnName):
+    return separatorPattern.sub('', columnName.lower())
+
+
+#returns the set of character trigrams of a column name. The name is padded so that its first and last characters weigh more.
+def getTrigrams(columnName):
+    paddedName = '  ' + normalizeColumnName(columnName) + ' '
+    return frozenset(paddedName[index:index + 3] for index in range(len(paddedName) - 2))
+
+
+#returns the trigram index of the column names: the trigrams of each column and the columns having each trigram
+def buildTrigramIndex(columnNameList):
+    columnTrigramMap = {}
+    trigramColumnMap = {}
+    for columnName in columnNameList:
+        if columnName in columnTrigramMap:
+            continue
+        columnTrigramMap[columnName] = getTrigrams(columnName)
+        for trigram in columnTrigramMap[columnName]:
+            trigramColumnMap.setdefault(trigram, []).append(columnName)
+
+    trigramIndexMap = {}
+    trigramIndexMap['columnTrigramMap'] = columnTrigramMap
+    trigramIndexMap['trigramColumnMap'] = trigramColumnMap
+    return trigramIndexMap
+
+
+#returns the indexed columns similar to a column name as (columnName, similarity), the most similar first.
+#The similarity is the Dice coefficient of the trigrams, between 0 and 1.
+def findSimilarColumns(columnName, trigramIndexMap, threshold):
+    trigramSet = getTrigrams(columnName)
+    columnTrigramMap = trigramIndexMap['columnTrigramMap']
+    trigramColumnMap = trigramIndexMap['trigramColumnMap']
+
+    #a column reaching the threshold shares at least minSharedCount trigrams, so it has at least one of the rarest
+    #len(trigramSet) - minSharedCount + 1 trigrams
+    minSharedCount = max(1, math.ceil(threshold * len(trigramSet) / (2 - threshold) - 1e-9))
+    postingListList = sorted((trigramColumnMap.get(trigram, ()) for trigram in trigramSet), key=len)
+    rarePostingListList = postingListList[:len(trigramSet) - minSharedCount + 1]
+
+    sharedCountMap = {}
+    if sum(map(len, rarePostingListList)) * PREFIX_FILTER_RATIO < sum(map(len, postingListList)):
+        #only the columns having one of the rarest trigrams are compared
+        candidateSet = set()
+        for postingList in rarePostingListList:
+            candidateSet.update(postingList)
+        for candidateName in candidateSet:
+            sharedCountMap[candidateName] = len(trigramSet & columnTrigramMap[candidateName])
+    else:
+        #the rarest trigrams are common as well, the shared trigrams of all the columns are counted at once
+        sharedCountMap = Counter()
+        for postingList in postingListList:
+            sharedCountMap.update(postingList)
+
+    similarColumnList = []
+    for candidateName, sharedCount in sharedCountMap.items():
+        if sharedCount < minSharedCount:
+            continue
+        similarity = 2 * sharedCount / (len(trigramSet) + len(columnTrigramMap[candidateName]))
+        if similarity >= threshold:
+            similarColumnList.append((candidateName, similarity))
+    similarColumnList.sort(key=lambda item: (-item[1], item[0]))
+    return similarColumnList
@@ -1,556 +1,2075 @@
-import configparser, os, re, datetime, time, xlsxwriter, xlrd
-import logging
-from pathlib import Path
-from os.path import exists, join
-from shutil import copyfile
-
-from constants import *
-from reporting import *
-
-logger = logging.getLogger()
-logger.setLevel(logging.DEBUG)
-
-configFileName= 'config.ini'
-
-currentPath= Path(__file__).resolve().parent
-config_file = join(currentPath, configFileName)
-config = configparser.ConfigParser()
-config.read(config_file, encoding='UTF-8')
-
-#function to parse DB schema
-def parseSchema(schemaPath):
-    tableStartIndicator = config['OTHERS']['TABLE_START']
-    tableEndIndicator = config['OTHERS']['TABLE_END']
-    tableNameSearchPattern = config['OTHERS']['TABLE_NAME_SEARCH_PATTERN']
-    fieldNameExclude = config['OTHERS']['FIELD_NAME_EXCLUDE']
-    notNull = config['OTHERS']['NOT_NULL']
-    default = config['OTHERS']['DEFAULT']
-    primaryKey = config['OTHERS']['PRIMARY_KEY']    
-    
-    regexTableStart= re.compile(tableStartIndicator, re.IGNORECASE)
-    regexTableName= re.compile(tableNameSearchPattern, re.IGNORECASE)
-    regexFieldNameExclude = re.compile(fieldNameExclude, re.IGNORECASE)
-    regexNotNull = re.compile(notNull, re.IGNORECASE)
-    regexDefault = re.compile(default, re.IGNORECASE)
-    regexPrimarykey = re.compile(primaryKey, re.IGNORECASE)
-    
-    with open(schemaPath, 'rt', encoding='utf-8') as fp:
-        tableMap = {}
-        tableColumnMap = {}
-        tableName = ''
-        isNewTable= False
-
-        for line in fp:
-            line = line.strip()
-            #print(f'line: {line}') 
-            
-            #make sure line is not empty
-            if not line or line == '(':
-                continue
-            
-            hasTable = regexTableStart.search(line)
-            if hasTable:
-                #This is for collecting the table names
-                tableName = regexTableName.search(line)
-                if tableName:
-                    isNewTable= True
-                    tableName = tableName.group()
-                    tableMap[tableName] = []
-                    tableColumnMap[tableName] = []
-                    #print(f'tableName: {tableName}')
-                    continue
-
-            #Check first if the table structure has been terminated/closed.
-            if tableEndIndicator in line:
-                isNewTable= False
-                
-            #Next is we need to collect the table fields
-            fieldNameExcluded =  regexFieldNameExclude.search(line)
-            if isNewTable and not fieldNameExcluded:
-                columnList = tableMap[tableName]
-                line = line.replace(',','')
-                item = []
-                for ele in re.split('\s', line):
-                    if ele.strip():
-                        item.append(ele)
-                
-                columnName = item[0]
-                dataType = item[1]
-
-                fieldMap= {}
-                fieldMap['fieldName'] = columnName
-                fieldMap['dataType'] = dataType
-                fieldMap['isNotNull'] = False
-                #fieldMap['isPrimaryKey'] = False
-                
-                tableColumnMap[tableName].append(columnName)
-                
-                isNotNull = regexNotNull.search(line)
-                if isNotNull:
-                    fieldMap['isNotNull'] = True
-
-                hasDefault = regexDefault.search(line)
-                if hasDefault:
-                    fieldMap['default'] = item[3]
-
-                hasPrimaryKey = regexPrimarykey.search(line)
-                if hasPrimaryKey:
-                    fieldMap['isPrimaryKey'] = True
-
-                columnList.append(fieldMap)
-    return tableMap, tableColumnMap           
-
-
-#returns the list of modified tables
-def getModifiedTables(tableColumnOrigMap, tableColumnUpdatedMap):
-    #Determine what table(s) has been changed
-    modifiedTableList= []
-    for tableName in tableColumnOrigMap:
-        columnsOrig= tableColumnOrigMap[tableName]
-        columnsUpdated = tableColumnUpdatedMap[tableName]
-        if columnsOrig != columnsUpdated:
-            modifiedTableList.append(tableName)
-    return modifiedTableList
-
-
-#updates the current table columns based on the renamed table columns
-def updateTableColumns(updatedTableColumnMap, tableColumnRenamedMap, renamedTableList):
-    for tableName in renamedTableList:
-        updatedTableColumnMap[tableName] = tableColumnRenamedMap[tableName]
-
-
-#returns the list of files to evaluate
-def listFiles(path, fileSearchPattern):
-    fileList = []
-    # r=root, d=directories, f = files
-    for r, d, f in os.walk(path):
-        for file in f:
-            filePath= join(r, file)
-            baseFile= re.search(fileSearchPattern, filePath, re.IGNORECASE)
-            
-            if baseFile:
-                fileName = os.path.basename(filePath)
-                fileList.append(filePath)
-    return fileList
-
-#convert column names to list with trim. This also ensures that column names are trimmed.
-def covertTrimmedStringToList(columnNames):
-    newColumnList= []
-    if columnNames:
-        columnList= columnNames.lower().split(',')
-        for columName in columnList:
-             newColumnList.append(columName.strip())
-    return newColumnList
-
-
-#try to remove excluded suffixes
-def removeExcludedSuffices(columnList, excludedFieldNameList):
-    newColumnList= []
-    for columnName in columnList:
-        columnName = columnName.strip().lower()
-        if not columnName in excludedFieldNameList:
-            newColumnList.append(columnName)
-    return newColumnList
-
-
-#Try to predict the table structure of the CSV file.
-def predictCsvTable(columnList, tableColumnMap, excludedFieldNameList):
-    #Algo:
-    #1. Loop through all the identified tables
-    #2. Per table, loop all the elements of the columnList. Count the matching column names
-    #3. Saved the matching percentage per table.
-    #4. Once done, identify the suggested table(s) when the score is more than 50%.
-    predictivityPercentageThreshold = config['OTHERS']['PREDICTIVITY_PERCENTAGE_THRESHOLD']
-    columnList = removeExcludedSuffices(columnList, excludedFieldNameList)
-
-    suggestedTableMap= {}
-    suggestedTableName= ''
-    noOfColumns = len(columnList)
-    
-    for tableName in tableColumnMap:
-        ctr= 0
-        unmatchedColumnList = []
-        for columnName in columnList:
-
-            if columnName in tableColumnMap[tableName]:
-                ctr += 1
-            else:
-                unmatchedColumnList.append(columnName)
-
-        matchPercentage = round((ctr/noOfColumns)*100)
-        if matchPercentage >= float(predictivityPercentageThreshold):
-            suggestedTableMap[tableName]= {}
-            suggestedTableMap[tableName]['percentage'] = matchPercentage
-            suggestedTableMap[tableName]['unmatchedColumns'] = unmatchedColumnList
-            suggestedTableMap[tableName]['lackingColumns'] = []
-        
-            #in this case, the columns evaluated has lacking columns from the based table structure
-            if matchPercentage == 100.0:
-                suggestedTableMap[tableName]['lackingColumns'] = [item for item in tableColumnMap[tableName] if (item not in columnList)]
-    
-    if suggestedTableMap:
-        suggestionList= {}
-        for tableName in suggestedTableMap:
-            suggestionList[tableName]= suggestedTableMap[tableName]['percentage']
-        suggestedTableName =  list(dict(sorted(suggestionList.items(), key=lambda i : i[1], reverse=True)))[0]
-        
-    return suggestedTableMap, suggestedTableName
-
-
-#returns the column list removing the excluded suffixed column names.
-def getExcludedColumnMap(tableColumnMap, excludedFieldNameList):
-    if excludedFieldNameList:
-        newTableColumnMap= {}
-        for tableName in tableColumnMap:
-            newTableColumnMap[tableName] = removeExcludedSuffices(tableColumnMap[tableName], excludedFieldNameList)
-        return newTableColumnMap
-    return tableColumnMap
-
-
-#returns a map containing the table structure of the csv
-def processCsvTableIdentification(fileList, tableColumnMap, excludedFieldNameList):
-    csvTableMapping = {}
-    for filePath in fileList:
-        csvTableName = ''
-        suggestedTableName = ''
-        suggestedTableNamePercentage = 0
-        unmatchedColumns = ''
-        lackingColumns = ''
-        errorEncountered = ''
-        columnList = []
-        suggestedTableColumnList = []
-
-        ctr= 0
-        try:
-            with open(filePath, 'r', encoding='utf-8') as fp:
-                for line in fp:
-                    line = line.strip()
-                    ctr+= 1
-                    #extract column names. Excluded columns names are removed to avoid false matching.
-                    columnList= removeExcludedSuffices(covertTrimmedStringToList(line), excludedFieldNameList)
-                    
-                    #identify the table structure used in the csv file
-                    for tableName in tableColumnMap:
-                        tableColumns = tableColumnMap[tableName]
-
-                        if tableColumns == columnList:
-                            #print(f'tableName: {tableName}')
-                            csvTableName = tableName
-                            break                        
-
-                    if not csvTableName:       
-                        suggestedTableMap, suggestedTableName= predictCsvTable(columnList, tableColumnMap, excludedFieldNameList)
-
-                        if suggestedTableMap:
-                            suggestedTableInfo = suggestedTableMap[suggestedTableName]
-                            suggestedTableColumnList = tableColumnMap[suggestedTableName]
-                            suggestedTableNamePercentage = suggestedTableMap[suggestedTableName].get('percentage')
-                            unmatchedColumns = ', '.join(item for item in suggestedTableMap[suggestedTableName].get('unmatchedColumns')) 
-                            lackingColumns = ', '.join(item for item in suggestedTableMap[suggestedTableName].get('lackingColumns'))
-                    #No need to read the succeeding lines
-                    break
-        except:
-            if ctr == 0:
-                errorEncountered = 'Can not read file!'
-            else:
-                errorEncountered = 'Line no. {} can not be read!!!'.format(ctr + 1)
-            print('{} => {}'.format(errorEncountered, filePath))
-        
-        csvTableMapping[filePath] = {}
-        csvTableMapping[filePath] ['tableName'] = csvTableName
-        csvTableMapping[filePath] ['numberOfColumns'] = len(columnList)
-        csvTableMapping[filePath] ['suggestedTableName'] = suggestedTableName
-        csvTableMapping[filePath] ['suggestedTableNamePercentage'] = suggestedTableNamePercentage
-        csvTableMapping[filePath] ['suggestedTableNumberOfColumns'] = len(suggestedTableColumnList)
-        csvTableMapping[filePath] ['unmatchedColumns'] = unmatchedColumns
-        csvTableMapping[filePath] ['lackingColumns'] = lackingColumns
-        csvTableMapping[filePath] ['error'] = errorEncountered
-
-    return csvTableMapping
-
-
-#function to detect the new 
-def getNewAndDeletedTableList(updatedTableColumnMap, tableColumnRestructuredMap):
-    newTableList = []
-    deletedTableList = []
-    #list all new tables
-    if updatedTableColumnMap:
-        for tableName in tableColumnRestructuredMap:
-            if tableName not in updatedTableColumnMap:
-                newTableList.append(tableName)
-    
-    #list all deleted tables
-    if tableColumnRestructuredMap:
-        for tableName in updatedTableColumnMap:
-            if tableName not in tableColumnRestructuredMap:
-                deletedTableList.append(tableName)
-    
-    return newTableList, deletedTableList
-
-
-#function to write files
-def writeFile(filePath, lineList):
-    #write the updated file
-    with open(filePath, 'w+', encoding='utf-8') as fp:
-        for line in lineList:
-            #print(line)
-            fp.write(line + NEWLINE)
-        fp.close()
-
-
-#Column index mapping
-def mapColumnIndex(tableList, tableMap):
-    columnIndexMap = {}
-    for tableName in tableList:
-        columnsMapping = {}
-        for columnName in tableMap[tableName]:
-            columnsMapping[columnName] = tableMap[tableName].index(columnName)
-        columnIndexMap[tableName] = columnsMapping
-    return columnIndexMap
-
-
-#return the default value
-def getDefaultValue(tableMap, columnName):
-    value= ''
-    isNotNull = False
-    for fieldMap in tableMap:
-        if columnName == fieldMap.get('fieldName'):
-            #If column found in the old but the value is null then try to correct it with the new table structure.
-            #Check if it is expected not to be NULL
-            isNotNull = fieldMap.get('isNotNull')
-
-            #try to get the default value
-            defaultValue = fieldMap.get('default')
-            if defaultValue:
-                    value = defaultValue
-            break
-    return value, isNotNull
-
-
-#function to process csv files for renamed columns and restructed tables.
-def process(csvTableMapping, renamedTableList, updatedTableColumnMap, restructuredTableList, tableColumnRestructuredMap, tableRestructuredMap, appendModifiedFile, isTestMode, isAutoFix):
-    #get the column indices of the restructured table.
-    newColumnIndexMap = mapColumnIndex(restructuredTableList, tableColumnRestructuredMap)
-    #print(f'newColumnIndexMap: {newColumnIndexMap}')
-
-    #get the column indices of the updated table.
-    oldColumnIndexMap = mapColumnIndex(restructuredTableList, updatedTableColumnMap)
-    #print(f'newColumnIndexMap: {newColumnIndexMap}')
-
-    #Mode of all files evaluated.
-    processFileModeMap = {}
-    
-    #loop all the files. Checking if it needs to be modified based on renamed columns or restructured table
-    for filePath in csvTableMapping:
-        print(f'>> {filePath}')
-        
-        mode = 0 #For untouched file
-        tableName = csvTableMapping[filePath]['tableName']
-        
-
-        #Try to associate the csv with the suggested table name in cases where its table name is undefined.
-        if isAutoFix  == 'Y' and not tableName:
-            #Objective: to find a suitable table structure of the csv file.
-            #Check first if there is a suggested table name and there is no lacking columns.
-            #Lacking columns are columns defined in the table structure but not present in the csv file.
-            if csvTableMapping[filePath]['suggestedTableName'] and not csvTableMapping[filePath]['lackingColumns']:
-                #When the percentage is 100.0% and there is no lacking column, it means that the columns are reordered. We will allow the correction of the header name.
-                #In this case, to be able to apply the suggested table name, the column numbers of the csv file must match the column number of the suggested table.           
-                #There are cases that column numbers are not matched (not safe to assumme the suggested table).                 
-                    if csvTableMapping[filePath]['numberOfColumns'] == csvTableMapping[filePath]['suggestedTableNumberOfColumns']:
-                        tableName = csvTableMapping[filePath]['suggestedTableName']
-                        csvTableMapping[filePath]['tableName']= '{} (Auto applied)'.format(tableName) 
-                        mode = 4        
-
-        if tableName in restructuredTableList:
-            mode = 2 #for restructured table
-            if tableName in renamedTableList:
-                mode = 3 #for renamed columns and restructured table
-        elif tableName in renamedTableList:
-            mode = 1 #for renamed columns
-
-        #save the mode per file evaluated.
-        processFileModeMap[filePath] = {'mode': mode }
-        
-        if mode == 0:
-            #No need to further process the file since its associated table is not either renamed or restructured.
-            processFileModeMap[filePath]['status'] = '-'
-            continue
-        else:
-            #time to read the file
-            with open(filePath, 'r', encoding='utf-8') as fp:
-                lineList = []
-                ctr = 0
-                for line in fp:
-                    line = line.strip()
-                    ctr+=1
-                    if ctr == 1:
-                        if mode in (1,4):
-                            #just copy the renamed column header
-                            line = ','.join(updatedTableColumnMap[tableName])
-                        else:
-                            #make use of the column header of the restructured table 
-                            line = ','.join(tableColumnRestructuredMap[tableName])
-                        
-                        #append the new column header
-                        lineList.append(line)
-                        #proceed to the next line
-                        continue
-
-                    if mode in (2,3):
-                        #convert line to a list
-                        columnValueLineList = re.split(',', line)
-                        
-                        #retrieve the column index of the old table structure
-                        oldColumnMap = oldColumnIndexMap[tableName]
-                        
-                        #retrieve the column index of the restructured table
-                        newColumnMap= newColumnIndexMap[tableName]
-                        
-                        newColumnValueList = []
-                        for columnName in newColumnMap:
-                            value= ''
-                            isFoundInOldTable= False
-                            isNotNull = False
-
-                            #check if the columnName exist in the old table. Otherwise, get the default value for the new column
-                            if columnName in oldColumnMap:
-                                isFoundInOldTable= True
-                                value= columnValueLineList[oldColumnMap[columnName]]
-
-                            if (not isFoundInOldTable) or (not value and isFoundInOldTable):
-                                #Check if there is a default value for the new table column(s)
-                                value, isNotNull = getDefaultValue(tableRestructuredMap[tableName], columnName)
-                                #try to determine if the column must not be NULL.
-                                if isFoundInOldTable and not isNotNull:
-                                    value = ''
-
-                            #insert the new value in the correct index    
-                            newColumnValueList.insert(newColumnMap[columnName], value)
-                        #recreate line with the renamed columns or restructured table
-                        line = ','.join(newColumnValueList)
-                    
-                    #append new line
-                    lineList.append(line)
-                #close file
-                fp.close()
-
-            if appendModifiedFile:
-                fileData = os.path.splitext(filePath)
-                processFileModeMap[filePath]['newFilePath'] = fileData[0] + appendModifiedFile + fileData[1]
-            
-            if isTestMode != 'Y':
-                try:
-                    #time to rewrite the csv file.
-                    newFilePath = processFileModeMap[filePath].get('newFilePath')
-                    
-                    if not newFilePath:
-                        newFilePath = filePath
-
-                    writeFile(newFilePath, lineList)
-                    processFileModeMap[filePath]['status'] = SUCCESS
-                except:
-                    processFileModeMap[filePath]['status'] = FAILED
-                    #print(f'Error: Failed writing file => ', filePath)
-            else:
-                processFileModeMap[filePath]['status'] = 'No csv file written!'               
-
-    return processFileModeMap
-
-
-if __name__ == "__main__":
-    try:
-        start = datetime.datetime.now()
-        print(f'\nInitializing...\nTime started: {start}')
-
-        #parsing the current schema
-        schemaCurrentPath = config['PATH']['SCHEMA_CURRENT']
-        tableMap, tableColumnCurrentMap = parseSchema(schemaCurrentPath) 
-        #print(f'tableMap: {tableMap}')
-        #print(f'tableColumnCurrentMap: {tableColumnCurrentMap}')
-        
-        #parsing the schema - for renamed columns
-        schemaRenamedPath = config['PATH']['SCHEMA_FOR_RENAMING']
-        tableRenamedMap, tableColumnRenamedMap = {},{}
-        if schemaRenamedPath:
-            tableRenamedMap, tableColumnRenamedMap = parseSchema(schemaRenamedPath)
-        #print(f'tableColumnRenamedMap: {tableColumnRenamedMap}')
-
-        #Identify the renamed tables
-        renamedTableList = []
-        if tableColumnRenamedMap:
-            renamedTableList = getModifiedTables(tableColumnCurrentMap, tableColumnRenamedMap)
-        #print(f'renamedTableList: {renamedTableList}')
-
-        #Identify the restructured table(s)
-        schemaRestructuredPath = config['PATH']['SCHEMA_FOR_RESTRUCTURED']
-        tableRestructuredMap, tableColumnRestructuredMap = {},{}
-        if schemaRestructuredPath:
-            tableRestructuredMap, tableColumnRestructuredMap = parseSchema(schemaRestructuredPath)
-        #print(f'tableRestructuredMap: {tableRestructuredMap}')
-        #print(f'tableColumnRestructuredMap: {tableColumnRestructuredMap}')
-        
-        #Get the updated renamed table columns.
-        updatedTableColumnMap = tableColumnCurrentMap.copy()
-        if not renamedTableList:
-            print(f'No table column(s) has been renamed!')
-        else:
-            updateTableColumns(updatedTableColumnMap, tableColumnRenamedMap, renamedTableList)
-        #print(f'updatedTableColumnMap: {updatedTableColumnMap}')
-
-        #Identify the restructured tables
-        restructuredTableList = []
-        if not tableColumnRestructuredMap:
-            print(f'No table(s) has been retructured!')
-        else:    
-            restructuredTableList = getModifiedTables(updatedTableColumnMap, tableColumnRestructuredMap)
-        #print(f'restructuredTableList: {restructuredTableList}')
-
-        #list all the csv files to evaluate
-        sourcePath= config['PATH']['SOURCE']
-        fileSearchPattern = config['OTHERS']['FILES_SEARCH_PATTERN']
-        fileList = listFiles(sourcePath, fileSearchPattern)
-        #print(f'fileList: {fileList}')
-
-        #Identify the table associated with the Csv file
-        excludedFieldNameList = covertTrimmedStringToList(config['OTHERS']['EXCLUDED_SUFFIX_FIELD_NAMES'])
-        excludedColumnMap = getExcludedColumnMap(tableColumnCurrentMap, excludedFieldNameList)
-        csvTableMapping= processCsvTableIdentification(fileList, excludedColumnMap, excludedFieldNameList)
-        #print(f'csvTableMapping: {csvTableMapping}')
-
-        #Time to process the csv files with the restructured tables.
-        isTestMode = config['OTHERS']['TEST_MODE']
-        isAutoFix = config['OTHERS']['AUTO_FIX']
-        appendModifiedFile = config['OTHERS']['APPEND_MODIFIED_FILE']
-        
-        processedFileResultMap = process(csvTableMapping, renamedTableList, updatedTableColumnMap, restructuredTableList, tableColumnRestructuredMap, tableRestructuredMap, appendModifiedFile, isTestMode, isAutoFix)
-        #print(f'processedFileResultMap: {processedFileResultMap}')
-
-        #Identify the new and deleted tables
-        newTableList, deletedTableList = getNewAndDeletedTableList(updatedTableColumnMap, tableColumnRestructuredMap)
-
-        #Time to create the report file
-        outputDirectory= config['REPORT']['OUTPUT']
-        reportFolder= config['REPORT']['FOLDER_NAME']
-        reportFileName= config['REPORT']['FILE_NAME']
-
-        if not outputDirectory:
-            outputDirectory= join(currentPath, reportFolder)
-        outputFileXls= join(outputDirectory, reportFileName)
-
-        reportingMap = {}
-        reportingMap['originalTableList'] = tableColumnCurrentMap.keys()
-        reportingMap['renamedTableList'] = renamedTableList
-        reportingMap['restructuredTableList'] = restructuredTableList
-        reportingMap['newTableList'] = newTableList
-        reportingMap['deletedTableList'] = deletedTableList
-        reportingMap['csvTableMapping'] = csvTableMapping
-        reportingMap['processedFileResultMap'] = processedFileResultMap
-
-        outputFileXls= "{}_{}.xlsx".format(outputFileXls, datetime.datetime.now().strftime("%m%d%Y_%H%M%S"))
-        createReport(reportingMap, outputFileXls)
-
-        finish = datetime.datetime.now()
-        print(f'\nTime elapsed:\n{finish - start}')
-    except Exception as err:
+import argparse, configparser, os, re, datetime, time, signal
+import logging, tempfile, codecs, hashlib, cProfile, tracemalloc, asyncio
+from collections import deque
+from itertools import chain, islice
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from pathlib import Path
+from os.path import exists, join
+from shutil import copyfile, copymode, copyfileobj
+
+from constants import *
+from reporting import *
+from columnar import *
+from cache import *
+from metrics import *
+from validation import *
+from compression import *
+from fuzzy import *
+from shard import *
+from split import *
+from records import *
+from schema import *
+
+logger = logging.getLogger()
+logger.setLevel(logging.DEBUG)
+
+configFileName= 'config.ini'
+
+currentPath= Path(__file__).resolve().parent
+config_file = join(currentPath, configFileName)
+config = configparser.ConfigParser()
+config.read(config_file, encoding='UTF-8')
+
+#file creation mask of the process. Temporary files are created privately so this is used to restore the default permission.
+fileCreationMask = os.umask(0)
+os.umask(fileCreationMask)
+
+#end of the header line, the same line endings recognized when reading files in text mode.
+headerEndPattern = re.compile(b'[\r\n]')
+
+#returns the config settings used when parsing the schema
+def getSchemaSettings():
+    settingMap = {}
+    for settingName in ('TABLE_START', 'TABLE_END', 'TABLE_NAME_SEARCH_PATTERN', 'FIELD_NAME_EXCLUDE', 'NOT_NULL', 'DEFAULT', 'PRIMARY_KEY'):
+        settingMap[settingName] = config['OTHERS'][settingName]
+    return settingMap
+
+
+#function to parse DB schema
+def parseSchema(schemaPath):
+    return parseSchemaFile(schemaPath, getSchemaSettings())
+
+
+#returns the (tableMap, tableColumnMap) of each schema file. A parsed schema is reused from the cache when neither the schema file
+#nor the parser settings changed. The other schema files are parsed at the same time by up to workers processes.
+def parseSchemaFiles(schemaPathList, cacheFolder, workers=1):
+    settingMap = getSchemaSettings()
+    schemaMap = {}
+    for schemaPath in dict.fromkeys(schemaPathList):
+        cachedSchema = loadSchemaCache(schemaPath, settingMap, cacheFolder) if cacheFolder else None
+        if cachedSchema:
+            print(f'Schema loaded from cache: {schemaPath}')
+            schemaMap[schemaPath] = cachedSchema
+
+    parsePathList = [schemaPath for schemaPath in dict.fromkeys(schemaPathList) if schemaPath not in schemaMap]
+    workers = min(getWorkerCount(workers), len(parsePathList))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            schemaList = list(executor.map(parseSchemaFile, parsePathList, [settingMap] * len(parsePathList)))
+    else:
+        schemaList = [parseSchemaFile(schemaPath, settingMap) for schemaPath in parsePathList]
+
+    for schemaPath, (tableMap, tableColumnMap) in zip(parsePathList, schemaList):
+        schemaMap[schemaPath] = tableMap, tableColumnMap
+        if not cacheFolder:
+            continue
+        try:
+            saveSchemaCache(schemaPath, settingMap, cacheFolder, tableMap, tableColumnMap)
+        except Exception as err:
+            print(f'Can not save the schema cache: {err}')
+    return schemaMap
+
+
+#returns the list of modified tables
+def getModifiedTables(tableColumnOrigMap, tableColumnUpdatedMap):
+    #Determine what table(s) has been changed
+    modifiedTableList= []
+    for tableName in tableColumnOrigMap:
+        columnsOrig= tableColumnOrigMap[tableName]
+        columnsUpdated = tableColumnUpdatedMap[tableName]
+        if columnsOrig != columnsUpdated:
+            modifiedTableList.append(tableName)
+    return modifiedTableList
+
+
+#updates the current table columns based on the renamed table columns
+def updateTableColumns(updatedTableColumnMap, tableColumnRenamedMap, renamedTableList):
+    for tableName in renamedTableList:
+        updatedTableColumnMap[tableName] = tableColumnRenamedMap[tableName]
+
+
+#returns the matching files and the subdirectories of a directory
+def scanDirectory(path, regexFileName, regexFileSearch):
+    fileList = []
+    directoryList = []
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    isDirectory = entry.is_dir()
+                except OSError:
+                    isDirectory = False
+
+                if isDirectory:
+                    #symbolic links to directories are not followed, the same as os.walk
+                    if not entry.is_symlink():
+                        directoryList.append(entry.path)
+                elif regexFileName.search(splitCompressionSuffix(entry.name)[0]) and regexFileSearch.search(entry.path):
+                    #the file name is checked first since it is shorter than the path. Compressed files are matched without their compression suffix.
+                    fileList.append(entry.path)
+    except OSError:
+        #unreadable directories are skipped, the same as os.walk
+        pass
+    return fileList, directoryList
+
+
+#returns the files to evaluate one at a time while the directories are still being walked.
+#Subdirectories are walked in parallel when walkWorkers is more than one, the files are then returned in the order they are found.
+#fileNamePattern is searched in the file names, fileSearchPattern in the file paths.
+#The number of files found is not printed when isQuiet.
+def iterFiles(path, fileSearchPattern, fileNamePattern='', walkWorkers=1, metricsMap=None, isQuiet=False):
+    regexFileSearch = re.compile(fileSearchPattern, re.IGNORECASE)
+    regexFileName = re.compile(fileNamePattern, re.IGNORECASE)
+    walkWorkers = int(walkWorkers or 1)
+
+    start = time.perf_counter()
+    firstFileTime = None
+    ctr = 0
+
+    if walkWorkers <= 1:
+        #same order as os.walk, the files of a directory come before its subdirectories
+        directoryStack = [path]
+        while directoryStack:
+            fileList, directoryList = scanDirectory(directoryStack.pop(), regexFileName, regexFileSearch)
+            directoryStack.extend(reversed(directoryList))
+            for filePath in fileList:
+                if firstFileTime is None:
+                    firstFileTime = time.perf_counter() - start
+                ctr += 1
+                yield filePath
+    else:
+        with ThreadPoolExecutor(max_workers=walkWorkers) as executor:
+            pendingSet = {executor.submit(scanDirectory, path, regexFileName, regexFileSearch)}
+            while pendingSet:
+                doneSet, pendingSet = wait(pendingSet, return_when=FIRST_COMPLETED)
+                for future in doneSet:
+                    fileList, directoryList = future.result()
+                    for directoryPath in directoryList:
+                        pendingSet.add(executor.submit(scanDirectory, directoryPath, regexFileName, regexFileSearch))
+                    for filePath in fileList:
+                        if firstFileTime is None:
+                            firstFileTime = time.perf_counter() - start
+                        ctr += 1
+                        yield filePath
+
+    walkTime = time.perf_counter() - start
+    if not isQuiet:
+        print(f'Files found: {ctr}, first file after {firstFileTime or 0:.3f}s, walk completed in {walkTime:.3f}s')
+    if metricsMap is not None:
+        addCounter(metricsMap, 'filesFound', ctr)
+        metricsMap['walk'] = {'firstFileSeconds': firstFileTime or 0, 'wallSeconds': walkTime}
+
+
+#returns the list of files to evaluate
+def listFiles(path, fileSearchPattern, fileNamePattern='', walkWorkers=1):
+    return list(iterFiles(path, fileSearchPattern, fileNamePattern, walkWorkers))
+
+
+#returns the files of a shard in the order they were found, with the position of each file in the listing of the whole tree.
+#Files are keyed by their path relative to the source folder so that the nodes mounting the source tree at different paths compute the same shards.
+def getShardFileList(fileList, sourcePath, shardIndex, shardCount, shardPlanFile=''):
+    fileKeyMap = {filePath: os.path.relpath(filePath, sourcePath).replace(os.sep, '/') for filePath in fileList}
+    fileShardMap = loadShardPlan(shardPlanFile, shardCount) if shardPlanFile else None
+    if fileShardMap is None:
+        fileShardMap = assignShards({fileKeyMap[filePath]: getFileSize(filePath) for filePath in fileList}, shardCount)
+        #the plan keeps the order of the listing
+        fileShardMap = {fileKeyMap[filePath]: fileShardMap[fileKeyMap[filePath]] for filePath in fileList}
+        if shardPlanFile:
+            #files rewritten in place change size, the nodes starting later use the sizes seen before any rewrite
+            saveShardPlan(shardPlanFile, shardCount, fileShardMap)
+
+    #files created since the plan was saved, such as the files written by the other shards, are not evaluated
+    unplannedFileCount = sum(1 for filePath in fileList if fileKeyMap[filePath] not in fileShardMap)
+    if unplannedFileCount:
+        print(f'File(s) created after the shard plan was saved, not evaluated: {unplannedFileCount}')
+    filePositionMap = {fileKey: position for position, fileKey in enumerate(fileShardMap)}
+    shardFileList = [filePath for filePath in fileList if fileShardMap.get(fileKeyMap[filePath]) == shardIndex]
+    return shardFileList, {filePath: filePositionMap[fileKeyMap[filePath]] for filePath in shardFileList}
+
+
+#returns the files as they are walked while keeping the list of all the files returned
+def recordFiles(fileIterator, fileList):
+    for filePath in fileIterator:
+        fileList.append(filePath)
+        yield filePath
+
+
+#convert column names to list with trim. This also ensures that column names are trimmed.
+def covertTrimmedStringToList(columnNames):
+    newColumnList= []
+    if columnNames:
+        columnList= columnNames.lower().split(',')
+        for columName in columnList:
+             newColumnList.append(columName.strip())
+    return newColumnList
+
+
+#try to remove excluded suffixes
+def removeExcludedSuffices(columnList, excludedFieldNameList):
+    newColumnList= []
+    for columnName in columnList:
+        columnName = columnName.strip().lower()
+        if not columnName in excludedFieldNameList:
+            newColumnList.append(columnName)
+    return newColumnList
+
+
+#builds the index used to score the tables against the csv columns. This is built once from the parsed schema.
+def buildTableIndex(tableColumnMap):
+    #tables having the column, per column name
+    columnTableMap = {}
+    #set of columns per table
+    tableColumnSetMap = {}
+    #position of the table in the schema. Candidate tables are scored in this order.
+    tableOrderMap = {}
+    #table having exactly the columns, the first table in the schema wins.
+    exactMatchMap = {}
+
+    for tableName in tableColumnMap:
+        tableOrderMap[tableName] = len(tableOrderMap)
+        exactMatchMap.setdefault(tuple(tableColumnMap[tableName]), tableName)
+        tableColumnSetMap[tableName] = frozenset(tableColumnMap[tableName])
+        for columnName in tableColumnSetMap[tableName]:
+            columnTableMap.setdefault(columnName, set()).add(tableName)
+
+    tableIndexMap = {}
+    tableIndexMap['columnTableMap'] = columnTableMap
+    tableIndexMap['tableColumnSetMap'] = tableColumnSetMap
+    tableIndexMap['tableOrderMap'] = tableOrderMap
+    tableIndexMap['exactMatchMap'] = exactMatchMap
+    return tableIndexMap
+
+
+#Try to predict the table structure of the CSV file.
+def predictCsvTable(columnList, tableColumnMap, excludedFieldNameList, tableIndexMap=None):
+    #Algo:
+    #1. Collect the candidate tables sharing at least one column with the columnList
+    #2. Per candidate table, loop all the elements of the columnList. Count the matching column names
+    #3. Saved the matching percentage per table.
+    #4. Once done, identify the suggested table(s) when the score is more than 50%.
+    #Column names that are not in the schema count as matching when they are similar enough to a column of the table.
+    predictivityPercentageThreshold = float(config['OTHERS']['PREDICTIVITY_PERCENTAGE_THRESHOLD'])
+    fuzzyMatchPercentageThreshold = float(config['OTHERS'].get('FUZZY_MATCH_PERCENTAGE_THRESHOLD', '0'))
+    columnList = removeExcludedSuffices(columnList, excludedFieldNameList)
+
+    if tableIndexMap is None:
+        tableIndexMap = buildTableIndex(tableColumnMap)
+    tableColumnSetMap = tableIndexMap['tableColumnSetMap']
+
+    suggestedTableMap= {}
+    suggestedTableName= ''
+    noOfColumns = len(columnList)
+    columnSet = set(columnList)
+
+    if tableColumnMap and not noOfColumns:
+        raise ValueError('No column names to evaluate!')
+
+    #schema columns similar to each column name that is not in the schema, the most similar first
+    similarColumnMap = {}
+    if fuzzyMatchPercentageThreshold > 0:
+        if 'trigramIndexMap' not in tableIndexMap:
+            #trigrams of the schema column names, built once on first use
+            tableIndexMap['trigramIndexMap'] = buildTrigramIndex(tableIndexMap['columnTableMap'])
+        for columnName in columnSet:
+            if columnName not in tableIndexMap['columnTableMap']:
+                similarColumnList = [similarColumnName for similarColumnName, similarity in findSimilarColumns(columnName, tableIndexMap['trigramIndexMap'], fuzzyMatchPercentageThreshold / 100) if similarColumnName not in columnSet]
+                if similarColumnList:
+                    similarColumnMap[columnName] = similarColumnList
+
+    if predictivityPercentageThreshold > 0:
+        #tables without any matching column can not reach the threshold
+        candidateTableSet = set()
+        for columnName in columnSet:
+            candidateTableSet.update(tableIndexMap['columnTableMap'].get(columnName, ()))
+        for similarColumnList in similarColumnMap.values():
+            for similarColumnName in similarColumnList:
+                candidateTableSet.update(tableIndexMap['columnTableMap'][similarColumnName])
+        candidateTableList = sorted(candidateTableSet, key=tableIndexMap['tableOrderMap'].get)
+    else:
+        candidateTableList = tableColumnMap
+
+    for tableName in candidateTableList:
+        tableColumnSet = tableColumnSetMap[tableName]
+        ctr= 0
+        unmatchedColumnList = []
+        #table columns matched by a similar column name
+        similarMatchSet = set()
+        for columnName in columnList:
+
+            if columnName in tableColumnSet:
+                ctr += 1
+            else:
+                #the most similar column of the table that is not matched yet
+                similarColumnName = next((item for item in similarColumnMap.get(columnName, ()) if item in tableColumnSet and item not in similarMatchSet), None)
+                if similarColumnName:
+                    ctr += 1
+                    similarMatchSet.add(similarColumnName)
+                    unmatchedColumnList.append(f'{columnName} ~ {similarColumnName}')
+                else:
+                    unmatchedColumnList.append(columnName)
+
+        matchPercentage = round((ctr/noOfColumns)*100)
+        if matchPercentage >= predictivityPercentageThreshold:
+            suggestedTableMap[tableName]= {}
+            suggestedTableMap[tableName]['percentage'] = matchPercentage
+            suggestedTableMap[tableName]['unmatchedColumns'] = unmatchedColumnList
+            suggestedTableMap[tableName]['lackingColumns'] = []
+        
+            #in this case, the columns evaluated has lacking columns from the based table structure
+            if matchPercentage == 100.0:
+                suggestedTableMap[tableName]['lackingColumns'] = [item for item in tableColumnMap[tableName] if (item not in columnSet and item not in similarMatchSet)]
+    
+    if suggestedTableMap:
+        suggestionList= {}
+        for tableName in suggestedTableMap:
+            suggestionList[tableName]= suggestedTableMap[tableName]['percentage']
+        suggestedTableName =  list(dict(sorted(suggestionList.items(), key=lambda i : i[1], reverse=True)))[0]
+        
+    return suggestedTableMap, suggestedTableName
+
+
+#returns the column list removing the excluded suffixed column names.
+def getExcludedColumnMap(tableColumnMap, excludedFieldNameList):
+    if excludedFieldNameList:
+        newTableColumnMap= {}
+        for tableName in tableColumnMap:
+            newTableColumnMap[tableName] = removeExcludedSuffices(tableColumnMap[tableName], excludedFieldNameList)
+        return newTableColumnMap
+    return tableColumnMap
+
+
+#returns the first line of a file together with its encoding. Only a fixed-size prefix of the file is read instead of iterating its lines.
+#The encodings are tried in order on the bytes read, the line and the start of the data, the rest of the file is not decoded.
+#Compressed files are only decompressed up to their first block.
+def readHeader(filePath, encodingList=ENCODING_LIST):
+    data = b''
+    with openCsvFile(filePath, 'rb') as fp:
+        while True:
+            block = fp.read(HEADER_READ_SIZE)
+            data += block
+            lineEnd = headerEndPattern.search(data, len(data) - len(block))
+            if lineEnd or not block:
+                break
+    if not data:
+        #an empty file does not have a header
+        return None, encodingList[0]
+
+    headerData = data[:lineEnd.start()] if lineEnd else data
+    #a plain ascii header is decoded by most encodings, so the first encoding also decoding the start of the data read with it is
+    #preferred. The last character read may be cut. The first encoding decoding the header is used when none decodes the data.
+    for encoding in encodingList:
+        try:
+            codecs.getincrementaldecoder(encoding)().decode(data)
+            return headerData.decode(encoding), encoding
+        except UnicodeDecodeError:
+            pass
+    for encoding in encodingList:
+        try:
+            return headerData.decode(encoding), encoding
+        except UnicodeDecodeError:
+            pass
+    raise ValueError('The header of {} is not encoded with {}!'.format(filePath, ', '.join(encodingList)))
+
+
+#returns the encodings tried on the headers. The lines are split on the bytes of the ascii new line and comma,
+#only the encodings writing them as ascii are supported.
+def getEncodingList(encodings):
+    encodingList = []
+    for encoding in covertTrimmedStringToList(encodings) or ENCODING_LIST:
+        encoding = codecs.lookup(encoding).name
+        if ',\r\n'.encode(encoding) != b',\r\n':
+            raise ValueError('Encoding {} is not supported, the lines must be ascii compatible!'.format(encoding))
+        encodingList.append(encoding)
+    return encodingList
+
+
+#returns the header of a file together with the error encountered while reading it and its encoding
+def sniffHeader(filePath, encodingList=ENCODING_LIST):
+    try:
+        header, encoding = readHeader(filePath, encodingList)
+        return filePath, header, '', encoding
+    except:
+        return filePath, None, 'Can not read file!', encodingList[0]
+
+
+#same as executor.map but only a limited number of tasks are pending at a time. Results are returned in order.
+def boundedMap(executor, function, iterable, limit):
+    pendingList = deque()
+    for item in iterable:
+        pendingList.append(executor.submit(function, item))
+        if len(pendingList) >= limit:
+            yield pendingList.popleft().result()
+    while pendingList:
+        yield pendingList.popleft().result()
+
+
+#returns the header of each file. Files are opened concurrently since the time is mostly spent waiting for the storage.
+def sniffHeaders(fileList, ioConcurrency=1, encodingList=ENCODING_LIST):
+    ioConcurrency = int(ioConcurrency or 1)
+    if ioConcurrency <= 1:
+        for filePath in fileList:
+            yield sniffHeader(filePath, encodingList)
+        return
+
+    with ThreadPoolExecutor(max_workers=ioConcurrency) as executor:
+        yield from boundedMap(executor, partial(sniffHeader, encodingList=encodingList), fileList, ioConcurrency * 4)
+
+
+#identify the table structure used by the columns of a csv file
+def identifyCsvTable(columnList, tableColumnMap, excludedFieldNameList, tableIndexMap):
+    csvTableName = tableIndexMap['exactMatchMap'].get(tuple(columnList), '')
+    suggestedTableName = ''
+    suggestedTableNamePercentage = 0
+    unmatchedColumns = ''
+    lackingColumns = ''
+    suggestedTableColumnList = []
+
+    if not csvTableName:       
+        suggestedTableMap, suggestedTableName= predictCsvTable(columnList, tableColumnMap, excludedFieldNameList, tableIndexMap)
+
+        if suggestedTableMap:
+            suggestedTableColumnList = tableColumnMap[suggestedTableName]
+            suggestedTableNamePercentage = suggestedTableMap[suggestedTableName].get('percentage')
+            #the column lists are only joined when the report is written
+            unmatchedColumns = suggestedTableMap[suggestedTableName].get('unmatchedColumns')
+            lackingColumns = suggestedTableMap[suggestedTableName].get('lackingColumns')
+
+    identificationMap = {}
+    identificationMap['tableName'] = csvTableName
+    identificationMap['suggestedTableName'] = suggestedTableName
+    identificationMap['suggestedTableNamePercentage'] = suggestedTableNamePercentage
+    identificationMap['suggestedTableNumberOfColumns'] = len(suggestedTableColumnList)
+    identificationMap['unmatchedColumns'] = unmatchedColumns
+    identificationMap['lackingColumns'] = lackingColumns
+    return identificationMap
+
+
+#returns a map containing the table structure of the csv
+def processCsvTableIdentification(fileList, tableColumnMap, excludedFieldNameList, ioConcurrency=1, tableIndexMap=None, metricsMap=None, encodingList=ENCODING_LIST):
+    if tableIndexMap is None:
+        tableIndexMap = buildTableIndex(tableColumnMap)
+
+    identificationStateMap = createIdentificationState()
+    csvTableMapping = {}
+    for filePath, header, errorEncountered, encoding in sniffHeaders(fileList, ioConcurrency, encodingList):
+        csvTableMapping[filePath] = getCsvTableInfo(filePath, header, errorEncountered, tableColumnMap, excludedFieldNameList, tableIndexMap, identificationStateMap, encoding)
+
+    closeIdentificationState(identificationStateMap, metricsMap)
+    return csvTableMapping
+
+
+#returns the state shared by the identification of the files.
+#Identification is done per distinct header, files sharing the same header are identified only once.
+def createIdentificationState():
+    identificationStateMap = {}
+    identificationStateMap['cache'] = {}
+    identificationStateMap['cacheHits'] = 0
+    identificationStateMap['cacheMisses'] = 0
+    identificationStateMap['headerBytes'] = 0
+    return identificationStateMap
+
+
+#function to report the counters of the identification
+def closeIdentificationState(identificationStateMap, metricsMap=None):
+    print(f'Header identification cache: {identificationStateMap["cacheHits"]} hit(s), {identificationStateMap["cacheMisses"]} miss(es).')
+    if metricsMap is not None:
+        addCounter(metricsMap, 'identifiedBytes', identificationStateMap['headerBytes'])
+        addCounter(metricsMap, 'headerCacheHits', identificationStateMap['cacheHits'])
+        addCounter(metricsMap, 'headerCacheMisses', identificationStateMap['cacheMisses'])
+
+
+#returns the table associated with a csv file based on its header
+def getCsvTableInfo(filePath, header, errorEncountered, tableColumnMap, excludedFieldNameList, tableIndexMap, identificationStateMap, encoding=ENCODING_LIST[0]):
+    identificationMap = None
+    columnList = []
+
+    try:
+        if header is not None:
+            identificationStateMap['headerBytes'] += len(header)
+            line = header.strip()
+            #extract column names. Excluded columns names are removed to avoid false matching.
+            columnList= removeExcludedSuffices(covertTrimmedStringToList(line), excludedFieldNameList)
+            
+            #identify the table structure used in the csv file
+            headerSignature = tuple(columnList)
+            identificationMap = identificationStateMap['cache'].get(headerSignature)
+            if identificationMap is None:
+                identificationMap = identifyCsvTable(columnList, tableColumnMap, excludedFieldNameList, tableIndexMap)
+                identificationStateMap['cacheMisses'] += 1
+                identificationStateMap['cache'][headerSignature] = identificationMap
+            else:
+                identificationStateMap['cacheHits'] += 1
+    except:
+        #the header has been read so the error is on the succeeding line
+        errorEncountered = 'Line no. 2 can not be read!!!'
+
+    if errorEncountered:
+        print('{} => {}'.format(errorEncountered, filePath))
+    
+    csvTableInfo = CsvTableInfo()
+    csvTableInfo['tableName'] = ''
+    csvTableInfo['numberOfColumns'] = len(columnList)
+    csvTableInfo['suggestedTableName'] = ''
+    csvTableInfo['suggestedTableNamePercentage'] = 0
+    csvTableInfo['suggestedTableNumberOfColumns'] = 0
+    csvTableInfo['unmatchedColumns'] = ''
+    csvTableInfo['lackingColumns'] = ''
+    csvTableInfo['error'] = errorEncountered
+    #the lines of the file are rewritten as bytes, the new header and default values are encoded like its header
+    csvTableInfo['encoding'] = encoding
+    if identificationMap:
+        csvTableInfo.update(identificationMap)
+    return csvTableInfo
+
+
+#function to detect the new 
+def getNewAndDeletedTableList(updatedTableColumnMap, tableColumnRestructuredMap):
+    newTableList = []
+    deletedTableList = []
+    #list all new tables
+    if updatedTableColumnMap:
+        for tableName in tableColumnRestructuredMap:
+            if tableName not in updatedTableColumnMap:
+                newTableList.append(tableName)
+    
+    #list all deleted tables
+    if tableColumnRestructuredMap:
+        for tableName in updatedTableColumnMap:
+            if tableName not in tableColumnRestructuredMap:
+                deletedTableList.append(tableName)
+    
+    return newTableList, deletedTableList
+
+
+#function to split the lines of an opened binary file, one list of lines per block read. Lines end with \n, \r\n or \r
+#the same way as in text mode. The lines keep their line ending when keepends.
+def splitLineBlocks(fp, blockSize=READ_BLOCK_SIZE, keepends=False):
+    remainder = b''
+    while True:
+        block = fp.read(blockSize)
+        if not block:
+            break
+        data = remainder + block
+        lineList = data.splitlines(keepends)
+        if data.endswith(b'\n'):
+            remainder = b''
+        else:
+            #the last line goes on in the next block. A \r is kept in case it is followed by a \n.
+            remainder = lineList.pop() + (b'\r' if data.endswith(b'\r') and not keepends else b'')
+        yield lineList
+    if remainder:
+        yield remainder.splitlines(keepends)
+
+
+#function to read the lines of a file one at a time as bytes, they are not decoded. When byteRange is given, only the lines
+#of this range of the file are read. Lines end with \n, \r\n or \r the same way as in text mode.
+def readLines(filePath, byteRange=None):
+    with (openCsvFile(filePath, 'rb') if byteRange is None else openFileRange(filePath, byteRange)) as fp:
+        for lineList in splitLineBlocks(fp):
+            for line in lineList:
+                yield line.strip()
+
+
+#function to replace a file with a completely written temporary file
+def replaceFile(tempFilePath, filePath):
+    #keep the permission of the file being replaced, otherwise use the default permission of new files.
+    if exists(filePath):
+        copymode(filePath, tempFilePath)
+    else:
+        os.chmod(tempFilePath, 0o666 & ~fileCreationMask)
+    os.replace(tempFilePath, filePath)
+
+
+#function to write lines of bytes. The lines end with the new line of the platform, the same way text files are written.
+def writeLines(fp, lines):
+    lineEnd = os.linesep.encode('ascii')
+    isTranslated = os.linesep != NEWLINE
+    for line in lines:
+        if isTranslated:
+            #the pandas engine returns blocks of lines
+            line = line.replace(NEWLINE_BYTES, lineEnd)
+        fp.write(line + lineEnd)
+
+
+#function to write files. Files with a compression suffix are written compressed.
+def writeFile(filePath, lines):
+    #write into a temporary file first so that the target file is only replaced once the whole file has been written.
+    fd, tempFilePath = tempfile.mkstemp(suffix='.tmp', dir=os.path.dirname(filePath) or '.')
+    try:
+        with open(fd, 'wb', buffering=WRITE_BUFFER_SIZE) as rawFile, openCsvFile(filePath, 'wb', fileObject=rawFile) as fp:
+            writeLines(fp, lines)
+        replaceFile(tempFilePath, filePath)
+    except:
+        if exists(tempFilePath):
+            os.remove(tempFilePath)
+        raise
+
+
+#function to copy the bytes of the source file from its current position up to its end.
+#The kernel copies the data when copy_file_range or sendfile is available, otherwise it is copied in large blocks.
+def copyFileData(source, target):
+    offset = source.tell()
+    remaining = os.fstat(source.fileno()).st_size - offset
+    target.flush()
+
+    if remaining > 0 and hasattr(os, 'copy_file_range'):
+        try:
+            while remaining > 0:
+                copied = os.copy_file_range(source.fileno(), target.fileno(), min(remaining, COPY_BLOCK_SIZE), offset)
+                if not copied:
+                    break
+                offset += copied
+                remaining -= copied
+        except OSError:
+            #not supported between these files, the copy goes on with the next method
+            pass
+
+    if remaining > 0 and hasattr(os, 'sendfile'):
+        try:
+            while remaining > 0:
+                copied = os.sendfile(target.fileno(), source.fileno(), offset, min(remaining, COPY_BLOCK_SIZE))
+                if not copied:
+                    break
+                offset += copied
+                remaining -= copied
+        except OSError:
+            pass
+
+    #whatever is left, including data appended while copying
+    source.seek(offset)
+    copyfileobj(source, target, COPY_BLOCK_SIZE)
+
+
+#function to copy a stream from its current position up to its end through a buffer. Returns the last byte copied.
+def copyStream(source, target):
+    lastByte = b''
+    while True:
+        data = source.read(WRITE_BUFFER_SIZE)
+        if not data:
+            return lastByte
+        target.write(data)
+        lastByte = data[-1:]
+
+
+#function to write a file with a new header, encoded like the file. The lines after the header are copied as they are.
+#Compressed files can not be copied by the kernel, their lines are streamed through the decompression instead.
+def writeFileHeader(filePath, newFilePath, header, encoding=ENCODING_LIST[0]):
+    isCompressed = bool(splitCompressionSuffix(filePath)[1] or splitCompressionSuffix(newFilePath)[1])
+    with openCsvFile(filePath, 'rb') as source:
+        #the header ends on the first \r or \n, the same way readHeader finds it. A \r ending the data read may be followed by a \n.
+        data = b''
+        while True:
+            block = source.read(HEADER_READ_SIZE)
+            data += block
+            headerEnd = headerEndPattern.search(data)
+            if not block or headerEnd and headerEnd.end() < len(data):
+                break
+
+        #the new header keeps the line terminator of the file
+        lineEnd = NEWLINE_BYTES
+        headerLength = len(data)
+        if headerEnd:
+            lineEnd = b'\r\n' if data.startswith(b'\r\n', headerEnd.start()) else headerEnd.group()
+            headerLength = headerEnd.start() + len(lineEnd)
+
+        #the file is terminated the same way the rewritten lines are
+        isTerminated = True
+        if not isCompressed:
+            if os.fstat(source.fileno()).st_size > headerLength:
+                source.seek(-1, os.SEEK_END)
+                isTerminated = source.read(1) in (b'\n', b'\r')
+            source.seek(headerLength)
+
+        fd, tempFilePath = tempfile.mkstemp(suffix='.tmp', dir=os.path.dirname(newFilePath) or '.')
+        try:
+            with open(fd, 'wb') as rawFile, openCsvFile(newFilePath, 'wb', fileObject=rawFile) as target:
+                target.write(header.encode(encoding) + lineEnd)
+                if isCompressed:
+                    #the lines read along with the header are written first
+                    target.write(data[headerLength:])
+                    lastByte = copyStream(source, target) or data[headerLength:][-1:]
+                    isTerminated = lastByte in (b'', b'\n', b'\r')
+                else:
+                    copyFileData(source, target)
+                if not isTerminated:
+                    target.write(lineEnd)
+            replaceFile(tempFilePath, newFilePath)
+        except:
+            if exists(tempFilePath):
+                os.remove(tempFilePath)
+            raise
+
+
+#Column index mapping
+def mapColumnIndex(tableList, tableMap):
+    columnIndexMap = {}
+    for tableName in tableList:
+        columnsMapping = {}
+        for columnName in tableMap[tableName]:
+            columnsMapping[columnName] = tableMap[tableName].index(columnName)
+        columnIndexMap[tableName] = columnsMapping
+    return columnIndexMap
+
+
+#return the default value
+def getDefaultValue(tableMap, columnName):
+    value= ''
+    isNotNull = False
+    for fieldMap in tableMap:
+        if columnName == fieldMap.get('fieldName'):
+            #If column found in the old but the value is null then try to correct it with the new table structure.
+            #Check if it is expected not to be NULL
+            isNotNull = fieldMap.get('isNotNull')
+
+            #try to get the default value
+            defaultValue = fieldMap.get('default')
+            if defaultValue:
+                    value = defaultValue
+            break
+    return value, isNotNull
+
+
+#compiles how the lines of a restructured table are remapped. Each column of the restructured table is either
+#taken from an index of the old line, with the value used when it is empty, or a constant value for new columns.
+def compileRemapPlan(oldColumnMap, newColumnMap, tableStructure):
+    remapPlan = []
+    for columnName in newColumnMap:
+        #Check if there is a default value for the new table column(s)
+        value, isNotNull = getDefaultValue(tableStructure, columnName)
+
+        #check if the columnName exist in the old table. Otherwise, the default value is always used for the new column
+        if columnName in oldColumnMap:
+            #an empty value is only replaced with the default value when the column must not be NULL.
+            if not isNotNull:
+                value = ''
+            remapPlan.append((oldColumnMap[columnName], value))
+        else:
+            remapPlan.append((None, value))
+    return remapPlan
+
+
+#returns the remap plans of the restructured tables
+def compileRemapPlanMap(restructuredTableList, updatedTableColumnMap, tableColumnRestructuredMap, tableRestructuredMap):
+    #get the column indices of the restructured table.
+    newColumnIndexMap = mapColumnIndex(restructuredTableList, tableColumnRestructuredMap)
+    #get the column indices of the updated table.
+    oldColumnIndexMap = mapColumnIndex(restructuredTableList, updatedTableColumnMap)
+
+    remapPlanMap = {}
+    for tableName in restructuredTableList:
+        remapPlanMap[tableName] = compileRemapPlan(oldColumnIndexMap[tableName], newColumnIndexMap[tableName], tableRestructuredMap[tableName])
+    return remapPlanMap
+
+
+#function to transform the lines of a csv file. Lines are transformed one at a time as they are read.
+#The lines are bytes, the header and the values of the remap plan are encoded like the file.
+def transformLines(lines, header, remapPlan=None, violationMap=None):
+    if violationMap is not None:
+        import numpy as np
+
+    ctr = 0
+    columnCount = 0
+    for line in lines:
+        ctr+=1
+        if ctr == 1:
+            #replace the column header
+            yield header
+            columnCount = line.count(b',') + 1
+            #proceed to the next line
+            continue
+
+        if remapPlan is not None:
+            #recreate line with the restructured table
+            columnValueLineList = line.split(b',')
+            if violationMap is not None and len(columnValueLineList) != columnCount:
+                addViolations(violationMap, 'Column count', '', np.array([ctr]))
+            line = b','.join([(columnValueLineList[index] or value) if index is not None else value for index, value in remapPlan])
+        
+        yield line
+
+
+#returns the index and name of the NOT NULL columns of the restructured tables
+def getNotNullColumnMap(restructuredTableList, tableColumnRestructuredMap, tableRestructuredMap):
+    notNullColumnMap = {}
+    for tableName in restructuredTableList:
+        notNullColumnMap[tableName] = []
+        for index, columnName in enumerate(tableColumnRestructuredMap[tableName]):
+            if getDefaultValue(tableRestructuredMap[tableName], columnName)[1]:
+                notNullColumnMap[tableName].append((index, columnName))
+    return notNullColumnMap
+
+
+#returns the estimated cost of rewriting a file from a sample of its lines. The sampled lines are transformed and
+#checked against the restructured table without writing anything. The estimates are exact when the whole file is sampled.
+#Compressed files are scaled from the compressed bytes read, which include the read-ahead of the decompression.
+#With a violationMap, the transformed lines of the sample are validated the same way as the rewritten lines.
+def sampleFile(filePath, mode, tableName, fileSize, encoding=ENCODING_LIST[0], violationMap=None):
+    start = time.perf_counter()
+    columnCount = len(workerDataMap['updatedTableColumnMap'][tableName])
+    if mode in (1,4):
+        header = ','.join(workerDataMap['updatedTableColumnMap'][tableName]).encode(encoding)
+        remapPlan = None
+        notNullColumnList = []
+    else:
+        header = ','.join(workerDataMap['tableColumnRestructuredMap'][tableName]).encode(encoding)
+        remapPlan = getEncodedRemapPlan(tableName, encoding)
+        notNullColumnList = workerDataMap['notNullColumnMap'][tableName]
+
+    #header plus the sampled rows
+    lineList = []
+    headerBytes = 0
+    sampleBytes = 0
+    isCompressed = bool(splitCompressionSuffix(filePath)[1])
+    with open(filePath, 'rb') as rawFile, openCsvFile(filePath, 'rb', fileObject=rawFile) as fp:
+        #the lines are split the same way as when the file is rewritten
+        rawLines = chain.from_iterable(splitLineBlocks(fp, HEADER_READ_SIZE, True))
+        for rawLine in islice(rawLines, workerDataMap['dryRunSampleRows'] + 1):
+            if not lineList:
+                headerBytes = len(rawLine)
+            sampleBytes += len(rawLine)
+            lineList.append(rawLine.strip())
+        isComplete = next(rawLines, None) is None
+        if isCompressed:
+            #sizes are compared in compressed bytes
+            headerBytes = 0
+            sampleBytes = rawFile.tell()
+
+    #lines which would make the rewrite fail or would not fit the table
+    validationList = []
+    validLineList = lineList[:1]
+    lineNumberList = [1]
+    columnCountLineNumberList = []
+    for lineNumber, line in enumerate(lineList[1:], 2):
+        valueCount = line.count(b',') + 1
+        if valueCount != columnCount:
+            validationList.append(f'Line no. {lineNumber}: {valueCount} value(s) for {columnCount} column(s)')
+            columnCountLineNumberList.append(lineNumber)
+        else:
+            validLineList.append(line)
+            lineNumberList.append(lineNumber)
+
+    outputBytes = 0
+    outputLineList = []
+    for lineNumber, line in zip(lineNumberList, transformLines(validLineList, header, remapPlan)):
+        outputBytes += len(line) + len(NEWLINE)
+        if lineNumber > 1:
+            outputLineList.append(line)
+        if lineNumber > 1 and notNullColumnList:
+            valueList = line.split(b',')
+            for index, columnName in notNullColumnList:
+                if not valueList[index]:
+                    validationList.append(f'Line no. {lineNumber}: NOT NULL column {columnName} is empty')
+
+    if violationMap is not None:
+        validateSampleLines(outputLineList, lineNumberList[1:], columnCountLineNumberList, workerDataMap['validationPlanMap'][(tableName, mode in (2,3))], violationMap, encoding)
+
+    #the whole file is scaled from the data lines that were sampled
+    sampleRows = max(0, len(lineList) - 1)
+    scale = 1.0
+    if not isComplete and sampleBytes < fileSize and sampleBytes > headerBytes:
+        scale = (fileSize - headerBytes) / (sampleBytes - headerBytes)
+
+    sampleMap = {}
+    sampleMap['sampleRows'] = sampleRows
+    sampleMap['estimatedRows'] = round(sampleRows * scale)
+    sampleMap['estimatedBytes'] = round(outputBytes * scale)
+    sampleMap['estimatedSeconds'] = (time.perf_counter() - start) * scale
+    sampleMap['validationErrors'] = len(validationList)
+    sampleMap['validation'] = '; '.join(validationList[:DRY_RUN_MAX_MESSAGES]) if validationList else 'OK'
+    return sampleMap
+
+
+#passes the lines through while counting them on the result map. The pandas engine yields blocks of lines.
+def countLines(lines, resultMap):
+    resultMap['rows'] = 0
+    for line in lines:
+        resultMap['rows'] += line.count(NEWLINE_BYTES) + 1
+        yield line
+
+
+#returns the mode of the csv file and its associated table
+def getFileMode(csvTableInfo, renamedTableList, restructuredTableList, isAutoFix):
+    mode = 0 #For untouched file
+    tableName = csvTableInfo['tableName']
+
+    #Try to associate the csv with the suggested table name in cases where its table name is undefined.
+    if isAutoFix  == 'Y' and not tableName:
+        #Objective: to find a suitable table structure of the csv file.
+        #Check first if there is a suggested table name and there is no lacking columns.
+        #Lacking columns are columns defined in the table structure but not present in the csv file.
+        if csvTableInfo['suggestedTableName'] and not csvTableInfo['lackingColumns']:
+            #When the percentage is 100.0% and there is no lacking column, it means that the columns are reordered. We will allow the correction of the header name.
+            #In this case, to be able to apply the suggested table name, the column numbers of the csv file must match the column number of the suggested table.           
+            #There are cases that column numbers are not matched (not safe to assumme the suggested table).                 
+                if csvTableInfo['numberOfColumns'] == csvTableInfo['suggestedTableNumberOfColumns']:
+                    tableName = csvTableInfo['suggestedTableName']
+                    csvTableInfo['tableName']= '{} (Auto applied)'.format(tableName) 
+                    mode = 4        
+
+    if tableName in restructuredTableList:
+        mode = 2 #for restructured table
+        if tableName in renamedTableList:
+            mode = 3 #for renamed columns and restructured table
+    elif tableName in renamedTableList:
+        mode = 1 #for renamed columns
+
+    return mode, tableName
+
+
+#Data shared by all the files being processed. When running in parallel, this is sent once to each worker process.
+workerDataMap = {}
+
+def initWorker(dataMap):
+    workerDataMap.clear()
+    workerDataMap.update(dataMap)
+
+
+#returns the remap plan of a restructured table with its values encoded like the lines of a file.
+#The plan of each table is only encoded once per encoding.
+def getEncodedRemapPlan(tableName, encoding):
+    encodedRemapPlanMap = workerDataMap.setdefault('encodedRemapPlanMap', {})
+    if (tableName, encoding) not in encodedRemapPlanMap:
+        encodedRemapPlanMap[(tableName, encoding)] = [(index, value.encode(encoding)) for index, value in workerDataMap['remapPlanMap'][tableName]]
+    return encodedRemapPlanMap[(tableName, encoding)]
+
+
+#returns the number of worker processes to use. Zero means all available cores.
+def getWorkerCount(workers):
+    workers = int(workers or 1)
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    return workers
+
+
+#function to rewrite a csv file for renamed columns and restructed tables. The lines are rewritten as bytes,
+#encoding is the encoding of the header used for the new header and the default values.
+def processFile(filePath, mode, tableName, encoding=ENCODING_LIST[0]):
+    updatedTableColumnMap = workerDataMap['updatedTableColumnMap']
+    tableColumnRestructuredMap = workerDataMap['tableColumnRestructuredMap']
+    appendModifiedFile = workerDataMap['appendModifiedFile']
+    isTestMode = workerDataMap['isTestMode']
+
+    start = time.perf_counter()
+    resultMap = {}
+    try:
+        resultMap['bytes'] = os.path.getsize(filePath)
+    except OSError:
+        resultMap['bytes'] = 0
+
+    #the rows are validated while they are being rewritten
+    validationPlanMap = workerDataMap['validationPlanMap']
+    violationMap = None
+    if validationPlanMap:
+        violationMap = createViolationMap()
+        resultMap['violationMap'] = violationMap
+
+    if mode in (1,4):
+        #just copy the renamed column header
+        header = ','.join(updatedTableColumnMap[tableName])
+        if workerDataMap['headerFastPath'] == 'Y':
+            #only the header changes, the remaining bytes are copied without going through the lines
+            lines = None
+        else:
+            lines = transformLines(readLines(filePath), header.encode(encoding))
+    else:
+        #make use of the column header of the restructured table 
+        header = ','.join(tableColumnRestructuredMap[tableName])
+        if workerDataMap['engine'] == 'pandas':
+            #rows are remapped in chunks using column-wide operations
+            lines = transformChunks(filePath, header, workerDataMap['remapPlanMap'][tableName], workerDataMap['chunkSize'], encoding=encoding)
+        else:
+            lines = transformLines(readLines(filePath), header.encode(encoding), getEncodedRemapPlan(tableName, encoding), violationMap)
+    isSampled = isTestMode == 'Y' and workerDataMap['dryRunSampleRows'] > 0
+    if violationMap is not None and lines is not None:
+        #remapped rows always have the columns of the restructured table, their values were counted while being remapped
+        lines = validateLines(lines, validationPlanMap[(tableName, mode in (2,3))], violationMap, workerDataMap['chunkSize'], mode in (1,4), encoding)
+    elif violationMap is not None and not isSampled:
+        #the lines copied as they are by the header fast path are validated on a separate pass, before the file is rewritten
+        deque(countLines(validateLines(readLines(filePath), validationPlanMap[(tableName, False)], violationMap, workerDataMap['chunkSize'], True, encoding), resultMap), maxlen=0)
+    if lines is not None:
+        lines = countLines(lines, resultMap)
+
+    #a new file is created when a suffix is appended or when the compression of the file changes
+    newFilePath = getOutputFilePath(filePath, appendModifiedFile, workerDataMap['compressOutput'])
+    if newFilePath != filePath:
+        resultMap['newFilePath'] = newFilePath
+    
+    if isSampled:
+        #only a sample of the lines is transformed, the cost of the whole file is estimated from it
+        resultMap.update(sampleFile(filePath, mode, tableName, resultMap['bytes'], encoding, violationMap))
+        resultMap['status'] = NOT_WRITTEN
+    elif isTestMode != 'Y':
+        try:
+            #time to rewrite the csv file.
+            newFilePath = resultMap.get('newFilePath')
+            
+            if not newFilePath:
+                newFilePath = filePath
+
+            if lines is None:
+                writeFileHeader(filePath, newFilePath, header, encoding)
+            else:
+                writeFile(newFilePath, lines)
+            if not appendModifiedFile and newFilePath != filePath:
+                #the file is overwritten with another compression, the rewritten file replaces it
+                os.remove(filePath)
+            resultMap['status'] = SUCCESS
+        except:
+            resultMap['status'] = FAILED
+            #print(f'Error: Failed writing file => ', filePath)
+    else:
+        #still run the lines through the pipeline without writing anything.
+        if lines is not None:
+            deque(lines, maxlen=0)
+        resultMap['status'] = NOT_WRITTEN               
+
+    resultMap['seconds'] = time.perf_counter() - start
+    return resultMap
+
+
+#returns True when a file is rewritten in byte ranges by several workers. Only the lines of restructured files are remapped
+#one by one, the files with renamed columns are mostly copied. Compressed files can not be read from an offset.
+def isSplitFile(filePath, mode, fileSize, dataMap, workers):
+    if workers <= 1 or mode not in (2,3) or not dataMap['splitThreshold'] or fileSize < dataMap['splitThreshold']:
+        return False
+    if dataMap['isTestMode'] == 'Y' and dataMap['dryRunSampleRows'] > 0:
+        #only a sample of the file is read
+        return False
+    return not splitCompressionSuffix(filePath)[1] and not dataMap['compressOutput']
+
+
+#returns the header of a file and the byte ranges of the lines after it, or None when the file only fits in a single range.
+#A file that can not be read is rewritten as a whole, its failure being reported the usual way.
+def getFileRanges(filePath, fileSize, workers):
+    try:
+        with open(filePath, 'rb') as fp:
+            headerLine = fp.readline()
+            byteRangeList = getByteRanges(fp, len(headerLine), fileSize, getRangeSize(fileSize - len(headerLine), workers))
+    except OSError:
+        return None
+    if len(byteRangeList) < 2:
+        return None
+    return headerLine.strip(), byteRangeList
+
+
+#function to rewrite a byte range of a restructured csv file into a part file. The lines are remapped and validated the same
+#way as in processFile, the line numbers of the violations start from the range. The header is left out of the part.
+def processFileRange(filePath, mode, tableName, sourceHeader, byteRange, partFilePath, encoding=ENCODING_LIST[0]):
+    start = time.perf_counter()
+    header = ','.join(workerDataMap['tableColumnRestructuredMap'][tableName])
+    resultMap = {}
+
+    validationPlanMap = workerDataMap['validationPlanMap']
+    violationMap = None
+    if validationPlanMap:
+        violationMap = createViolationMap()
+        resultMap['violationMap'] = violationMap
+
+    if workerDataMap['engine'] == 'pandas':
+        lines = transformChunks(filePath, header, workerDataMap['remapPlanMap'][tableName], workerDataMap['chunkSize'], byteRange, encoding)
+    else:
+        #the header of the file comes first so that the values of each line are counted against it
+        lines = transformLines(chain([sourceHeader], readLines(filePath, byteRange)), header.encode(encoding), getEncodedRemapPlan(tableName, encoding), violationMap)
+    if violationMap is not None:
+        lines = validateLines(lines, validationPlanMap[(tableName, True)], violationMap, workerDataMap['chunkSize'], False, encoding)
+    lines = countLines(islice(lines, 1, None), resultMap)
+
+    if partFilePath:
+        with open(partFilePath, 'wb', buffering=WRITE_BUFFER_SIZE) as fp:
+            writeLines(fp, lines)
+    else:
+        deque(lines, maxlen=0)
+
+    resultMap['seconds'] = time.perf_counter() - start
+    return resultMap
+
+
+#function to submit the byte ranges of a file to the workers. Returns the part files with the future of their result,
+#the part files being created next to the rewritten file so that the kernel can copy them.
+#Returns None when the part files can not be created, the file is then rewritten as a whole.
+def submitFileRanges(executor, filePath, mode, tableName, encoding, fileRangeInfo, dataMap):
+    sourceHeader, byteRangeList = fileRangeInfo
+    folderPath = os.path.dirname(getOutputFilePath(filePath, dataMap['appendModifiedFile'])) or '.'
+    partList = []
+    try:
+        for byteRange in byteRangeList:
+            partFilePath = None
+            if dataMap['isTestMode'] != 'Y':
+                fd, partFilePath = tempfile.mkstemp(suffix='.part', dir=folderPath)
+                os.close(fd)
+            partList.append((partFilePath, executor.submit(processFileRange, filePath, mode, tableName, sourceHeader, byteRange, partFilePath, encoding)))
+    except OSError:
+        removeFileParts(partList)
+        return None
+    except:
+        removeFileParts(partList)
+        raise
+    return partList
+
+
+#function to cancel the parts of a file which are not rewritten yet and to remove its part files
+def removeFileParts(partList):
+    for partFilePath, future in partList:
+        future.cancel()
+        if partFilePath and exists(partFilePath):
+            os.remove(partFilePath)
+
+
+#function to add the result of a part to the result of its file
+def addPartResult(resultMap, partResultMap):
+    if 'violationMap' in resultMap:
+        #the line numbers of the part start after the lines of the previous parts
+        mergeViolations(resultMap['violationMap'], partResultMap['violationMap'], resultMap['rows'] - 1)
+    resultMap['rows'] += partResultMap['rows']
+    resultMap['seconds'] += partResultMap['seconds']
+
+
+#function to write a file split in byte ranges. The part files are copied in order behind the new header as soon as
+#each one is written. Returns the result of the file the same way processFile does, its time being the time of all the parts.
+def joinFileRanges(filePath, tableName, encoding, partList, dataMap):
+    start = time.perf_counter()
+    header = ','.join(dataMap['tableColumnRestructuredMap'][tableName])
+    resultMap = {}
+    resultMap['bytes'] = getFileSize(filePath)
+    #the header is counted the same way as when the file is rewritten as a whole
+    resultMap['rows'] = 1
+    resultMap['seconds'] = 0.0
+    if dataMap['validationPlanMap']:
+        resultMap['violationMap'] = createViolationMap()
+
+    newFilePath = getOutputFilePath(filePath, dataMap['appendModifiedFile'])
+    if newFilePath != filePath:
+        resultMap['newFilePath'] = newFilePath
+
+    try:
+        if dataMap['isTestMode'] == 'Y':
+            for partFilePath, future in partList:
+                addPartResult(resultMap, future.result())
+            resultMap['status'] = NOT_WRITTEN
+        else:
+            fd, tempFilePath = tempfile.mkstemp(suffix='.tmp', dir=os.path.dirname(newFilePath) or '.')
+            try:
+                with open(fd, 'wb') as target:
+                    #the header ends with the same new line as the lines of the parts
+                    target.write(header.encode(encoding) + os.linesep.encode('ascii'))
+                    for partFilePath, future in partList:
+                        addPartResult(resultMap, future.result())
+                        with open(partFilePath, 'rb') as source:
+                            copyFileData(source, target)
+                        os.remove(partFilePath)
+                replaceFile(tempFilePath, newFilePath)
+                resultMap['status'] = SUCCESS
+            except:
+                resultMap['status'] = FAILED
+                if exists(tempFilePath):
+                    os.remove(tempFilePath)
+    finally:
+        removeFileParts(partList)
+
+    resultMap['seconds'] += time.perf_counter() - start
+    return resultMap
+
+
+#function to rewrite a large file by the workers of the executor, split in byte ranges when it has more than one
+def processFileRanges(executor, filePath, mode, tableName, encoding, fileSize, dataMap, workers):
+    fileRangeInfo = getFileRanges(filePath, fileSize, workers)
+    partList = submitFileRanges(executor, filePath, mode, tableName, encoding, fileRangeInfo, dataMap) if fileRangeInfo else None
+    if not partList:
+        return executor.submit(processFile, filePath, mode, tableName, encoding).result()
+    return joinFileRanges(filePath, tableName, encoding, partList, dataMap)
+
+
+#returns the data shared by all the files being processed
+def getProcessData(updatedTableColumnMap, restructuredTableList, tableColumnRestructuredMap, tableRestructuredMap, appendModifiedFile, isTestMode, engine='python', chunkSize=CHUNK_SIZE, headerFastPath='N', dryRunSampleRows=0, validationPlanMap=None, compressOutput='', splitThreshold=0):
+    dataMap = {}
+    dataMap['updatedTableColumnMap'] = updatedTableColumnMap
+    dataMap['tableColumnRestructuredMap'] = tableColumnRestructuredMap
+    dataMap['appendModifiedFile'] = appendModifiedFile
+    dataMap['isTestMode'] = isTestMode
+    dataMap['engine'] = engine
+    dataMap['chunkSize'] = chunkSize
+    dataMap['headerFastPath'] = headerFastPath
+    #the restructured tables are compiled once, the lines are then remapped with their plan.
+    dataMap['remapPlanMap'] = compileRemapPlanMap(restructuredTableList, updatedTableColumnMap, tableColumnRestructuredMap, tableRestructuredMap)
+    dataMap['dryRunSampleRows'] = int(dryRunSampleRows or 0)
+    dataMap['notNullColumnMap'] = getNotNullColumnMap(restructuredTableList, tableColumnRestructuredMap, tableRestructuredMap)
+    dataMap['validationPlanMap'] = validationPlanMap or {}
+    dataMap['compressOutput'] = compressOutput
+    dataMap['splitThreshold'] = int(splitThreshold or 0)
+    return dataMap
+
+
+#returns the column checks of the rewritten files per table. Files keeping the structure of their table are keyed with
+#(tableName, False), their columns are checked against the current or renamed schema. Restructured files are keyed with (tableName, True).
+def compileValidationPlanMap(updatedTableColumnMap, tableMap, tableRenamedMap, renamedTableList, restructuredTableList, tableColumnRestructuredMap, tableRestructuredMap):
+    validationPlanMap = {}
+    for tableName in updatedTableColumnMap:
+        fieldList = tableRenamedMap[tableName] if tableName in renamedTableList else tableMap.get(tableName, [])
+        validationPlanMap[(tableName, False)] = compileColumnCheckList(updatedTableColumnMap[tableName], fieldList)
+    for tableName in restructuredTableList:
+        validationPlanMap[(tableName, True)] = compileColumnCheckList(tableColumnRestructuredMap[tableName], tableRestructuredMap[tableName])
+    return validationPlanMap
+
+
+#function reporting the evaluated files in the order they were found, up to the first file still being processed.
+#Returns the position of this file.
+def reportFilesInOrder(filePathList, position, pendingFileSet, csvTableMapping, processFileModeMap, onFileProcessed):
+    while position < len(filePathList) and filePathList[position] not in pendingFileSet:
+        filePath = filePathList[position]
+        if onFileProcessed:
+            onFileProcessed(filePath, csvTableMapping[filePath], processFileModeMap[filePath])
+        position += 1
+    return position
+
+
+#function to process csv files for renamed columns and restructed tables.
+#onFileProcessed is called with the file path, its associated table and its result as soon as the file and all the files found
+#before it have been processed, so the files are reported in the order they were found.
+def process(csvTableMapping, renamedTableList, updatedTableColumnMap, restructuredTableList, tableColumnRestructuredMap, tableRestructuredMap, appendModifiedFile, isTestMode, isAutoFix, workers=1, engine='python', chunkSize=CHUNK_SIZE, onFileProcessed=None, headerFastPath='N', dryRunSampleRows=0, validationPlanMap=None, compressOutput='', splitThreshold=0):
+    dataMap = getProcessData(updatedTableColumnMap, restructuredTableList, tableColumnRestructuredMap, tableRestructuredMap, appendModifiedFile, isTestMode, engine, chunkSize, headerFastPath, dryRunSampleRows, validationPlanMap, compressOutput, splitThreshold)
+
+    #Mode of all files evaluated.
+    processFileModeMap = {}
+    fileTaskList = []
+    
+    #loop all the files. Checking if it needs to be modified based on renamed columns or restructured table
+    for filePath in csvTableMapping:
+        print(f'>> {filePath}')
+        
+        mode, tableName = getFileMode(csvTableMapping[filePath], renamedTableList, restructuredTableList, isAutoFix)
+
+        #save the mode per file evaluated.
+        processFileModeMap[filePath] = ProcessResult(mode=mode)
+        
+        if mode == 0:
+            #No need to further process the file since its associated table is not either renamed or restructured.
+            processFileModeMap[filePath]['status'] = '-'
+        else:
+            fileTaskList.append((filePath, mode, tableName, csvTableMapping[filePath]['encoding']))
+
+    #the files not needing any change are reported until the first file to process
+    reportFileList = list(csvTableMapping)
+    pendingFileSet = {fileTask[0] for fileTask in fileTaskList}
+    reportPosition = reportFilesInOrder(reportFileList, 0, pendingFileSet, csvTableMapping, processFileModeMap, onFileProcessed)
+
+    workers = getWorkerCount(workers)
+    if workers > 1 and (len(fileTaskList) > 1 or dataMap['splitThreshold']):
+        #the files are independent from each other so they are rewritten in parallel.
+        with ProcessPoolExecutor(max_workers=workers, initializer=initWorker, initargs=(dataMap,)) as executor:
+            #the ranges of the large files are submitted first, they are rewritten by all the workers
+            filePartMap = {}
+            for filePath, mode, tableName, encoding in fileTaskList:
+                fileSize = getFileSize(filePath)
+                if isSplitFile(filePath, mode, fileSize, dataMap, workers):
+                    fileRangeInfo = getFileRanges(filePath, fileSize, workers)
+                    partList = submitFileRanges(executor, filePath, mode, tableName, encoding, fileRangeInfo, dataMap) if fileRangeInfo else None
+                    if partList:
+                        filePartMap[filePath] = partList
+
+            resultList = iter(())
+            wholeFileTaskList = [fileTask for fileTask in fileTaskList if fileTask[0] not in filePartMap]
+            if wholeFileTaskList:
+                filePathList, modeList, tableNameList, encodingList = zip(*wholeFileTaskList)
+                chunkSize = max(1, min(64, len(wholeFileTaskList) // (workers * 8)))
+                resultList = executor.map(processFile, filePathList, modeList, tableNameList, encodingList, chunksize=chunkSize)
+
+            for filePath, mode, tableName, encoding in fileTaskList:
+                if filePath in filePartMap:
+                    resultMap = joinFileRanges(filePath, tableName, encoding, filePartMap[filePath], dataMap)
+                else:
+                    resultMap = next(resultList)
+                processFileModeMap[filePath].update(resultMap)
+                pendingFileSet.discard(filePath)
+                reportPosition = reportFilesInOrder(reportFileList, reportPosition, pendingFileSet, csvTableMapping, processFileModeMap, onFileProcessed)
+    else:
+        initWorker(dataMap)
+        for filePath, mode, tableName, encoding in fileTaskList:
+            processFileModeMap[filePath].update(processFile(filePath, mode, tableName, encoding))
+            pendingFileSet.discard(filePath)
+            reportPosition = reportFilesInOrder(reportFileList, reportPosition, pendingFileSet, csvTableMapping, processFileModeMap, onFileProcessed)
+
+    return processFileModeMap
+
+
+#Pipeline stages. Each file goes through discover -> sniff -> identify -> transform/write -> report,
+#the stages being connected by bounded queues so that walking, reading, rewriting and reporting overlap.
+#A queue item is a tuple starting with the position of the file in the walk, None marks the end of a stage.
+
+#stage walking the directories
+async def discoverFiles(pipelineMap, fileIterator):
+    loop = asyncio.get_running_loop()
+    sequence = 0
+    while True:
+        filePath = await loop.run_in_executor(pipelineMap['ioExecutor'], next, fileIterator, None)
+        if filePath is None:
+            break
+        await pipelineMap['sniffQueue'].put((sequence, filePath))
+        sequence += 1
+
+    for ctr in range(pipelineMap['ioConcurrency']):
+        await pipelineMap['sniffQueue'].put(None)
+
+
+#stage reading the header of the files. Several of them run at the same time.
+async def sniffFiles(pipelineMap):
+    loop = asyncio.get_running_loop()
+    while True:
+        item = await pipelineMap['sniffQueue'].get()
+        if item is None:
+            await pipelineMap['identifyQueue'].put(None)
+            break
+        sequence, filePath = item
+        filePath, header, errorEncountered, encoding = await loop.run_in_executor(pipelineMap['ioExecutor'], sniffHeader, filePath, pipelineMap['encodingList'])
+        await pipelineMap['identifyQueue'].put((sequence, filePath, header, errorEncountered, encoding))
+
+
+#stage identifying the table of the files and their mode. Files that are not modified go straight to the report.
+async def identifyFiles(pipelineMap, tableColumnMap, excludedFieldNameList, tableIndexMap, renamedTableList, restructuredTableList, isAutoFix):
+    runningSniffers = pipelineMap['ioConcurrency']
+    while runningSniffers:
+        item = await pipelineMap['identifyQueue'].get()
+        if item is None:
+            runningSniffers -= 1
+            continue
+        sequence, filePath, header, errorEncountered, encoding = item
+        csvTableInfo = getCsvTableInfo(filePath, header, errorEncountered, tableColumnMap, excludedFieldNameList, tableIndexMap, pipelineMap['identificationState'], encoding)
+
+        print(f'>> {filePath}')
+        mode, tableName = getFileMode(csvTableInfo, renamedTableList, restructuredTableList, isAutoFix)
+        processResult = ProcessResult(mode=mode)
+        if mode == 0:
+            processResult['status'] = '-'
+            await pipelineMap['reportQueue'].put((sequence, filePath, csvTableInfo, processResult))
+        else:
+            await pipelineMap['transformQueue'].put((sequence, filePath, csvTableInfo, processResult, tableName))
+
+    await pipelineMap['transformQueue'].put(None)
+
+
+#waits until the batch fits in the bytes being processed. A batch larger than the limit is processed alone.
+async def acquireInflight(pipelineMap, batchSize):
+    async with pipelineMap['inflightCondition']:
+        await pipelineMap['inflightCondition'].wait_for(lambda: pipelineMap['inflightBatches'] == 0 or (pipelineMap['inflightBatches'] < pipelineMap['maxInflightBatches'] and pipelineMap['inflightBytes'] + batchSize <= pipelineMap['maxInflightBytes']))
+        pipelineMap['inflightBatches'] += 1
+        pipelineMap['inflightBytes'] += batchSize
+
+
+#function to release the bytes of a processed batch
+async def releaseInflight(pipelineMap, batchSize):
+    async with pipelineMap['inflightCondition']:
+        pipelineMap['inflightBatches'] -= 1
+        pipelineMap['inflightBytes'] -= batchSize
+        pipelineMap['inflightCondition'].notify_all()
+
+
+#function to process a batch of files, small files are sent to the workers together
+def processFiles(fileTaskList):
+    return [processFile(filePath, mode, tableName, encoding) for filePath, mode, tableName, encoding in fileTaskList]
+
+
+#rewrites a batch of files on the process executor
+async def transformBatch(pipelineMap, itemList, batchSize):
+    loop = asyncio.get_running_loop()
+    fileTaskList = [(filePath, processResult['mode'], tableName, csvTableInfo['encoding']) for sequence, filePath, csvTableInfo, processResult, tableName in itemList]
+    try:
+        resultList = await loop.run_in_executor(pipelineMap['processExecutor'], processFiles, fileTaskList)
+    finally:
+        await releaseInflight(pipelineMap, batchSize)
+
+    for (sequence, filePath, csvTableInfo, processResult, tableName), resultMap in zip(itemList, resultList):
+        processResult.update(resultMap)
+        await pipelineMap['reportQueue'].put((sequence, filePath, csvTableInfo, processResult))
+
+
+#rewrites a large file split in byte ranges. The ranges are submitted and their parts joined on a thread of their own,
+#the parts being rewritten by the process executor.
+async def transformFileRanges(pipelineMap, item, fileSize):
+    loop = asyncio.get_running_loop()
+    sequence, filePath, csvTableInfo, processResult, tableName = item
+    try:
+        resultMap = await loop.run_in_executor(None, processFileRanges, pipelineMap['processExecutor'], filePath, processResult['mode'], tableName, csvTableInfo['encoding'], fileSize, pipelineMap['dataMap'], pipelineMap['workers'])
+    finally:
+        await releaseInflight(pipelineMap, fileSize)
+
+    processResult.update(resultMap)
+    await pipelineMap['reportQueue'].put((sequence, filePath, csvTableInfo, processResult))
+
+
+#returns the size of a file being rewritten
+def getFileSize(filePath):
+    try:
+        return os.path.getsize(filePath)
+    except OSError:
+        return 0
+
+
+#stage rewriting the files. Files are rewritten concurrently as long as the bytes being processed are within the limit.
+#Files already waiting are grouped in batches up to PIPELINE_BATCH_BYTES so that small files do not cost a round trip each.
+async def transformFiles(pipelineMap):
+    taskSet = set()
+    isLastBatch = False
+    while not isLastBatch:
+        item = await pipelineMap['transformQueue'].get()
+        if item is None:
+            break
+
+        itemList = []
+        batchSize = 0
+        while True:
+            fileSize = getFileSize(item[1])
+            if isSplitFile(item[1], item[3]['mode'], fileSize, pipelineMap['dataMap'], pipelineMap['workers']):
+                #large files are rewritten by all the workers on their own
+                await acquireInflight(pipelineMap, fileSize)
+                taskSet.add(asyncio.ensure_future(transformFileRanges(pipelineMap, item, fileSize)))
+            else:
+                itemList.append(item)
+                batchSize += fileSize
+            if batchSize >= PIPELINE_BATCH_BYTES or len(itemList) >= PIPELINE_BATCH_FILES or pipelineMap['transformQueue'].empty():
+                break
+            item = pipelineMap['transformQueue'].get_nowait()
+            if item is None:
+                isLastBatch = True
+                break
+
+        if itemList:
+            await acquireInflight(pipelineMap, batchSize)
+            taskSet.add(asyncio.ensure_future(transformBatch(pipelineMap, itemList, batchSize)))
+
+        #completed tasks are dropped, their errors are raised here
+        for task in [task for task in taskSet if task.done()]:
+            taskSet.remove(task)
+            task.result()
+
+    await asyncio.gather(*taskSet)
+    await pipelineMap['reportQueue'].put(None)
+
+
+#stage collecting the results. They are reported in the order the files were found.
+async def reportFiles(pipelineMap, onFileProcessed):
+    pendingMap = {}
+    nextSequence = 0
+    while True:
+        item = await pipelineMap['reportQueue'].get()
+        if item is None:
+            break
+        pendingMap[item[0]] = item
+        while nextSequence in pendingMap:
+            sequence, filePath, csvTableInfo, processResult = pendingMap.pop(nextSequence)
+            pipelineMap['csvTableMapping'][filePath] = csvTableInfo
+            pipelineMap['processFileModeMap'][filePath] = processResult
+            if onFileProcessed:
+                onFileProcessed(filePath, csvTableInfo, processResult)
+            nextSequence += 1
+
+
+#function to identify and process the csv files through the pipeline stages. Returns the same maps as processCsvTableIdentification and process.
+async def processPipeline(fileIterator, tableColumnMap, excludedFieldNameList, tableIndexMap, renamedTableList, restructuredTableList, dataMap, isAutoFix, ioConcurrency=1, workers=1, maxInflightBytes=MAX_INFLIGHT_BYTES, onFileProcessed=None, metricsMap=None, encodingList=ENCODING_LIST):
+    ioConcurrency = max(1, int(ioConcurrency or 1))
+    workers = getWorkerCount(workers)
+
+    pipelineMap = {}
+    pipelineMap['ioConcurrency'] = ioConcurrency
+    pipelineMap['encodingList'] = encodingList
+    pipelineMap['sniffQueue'] = asyncio.Queue(PIPELINE_QUEUE_SIZE)
+    pipelineMap['identifyQueue'] = asyncio.Queue(PIPELINE_QUEUE_SIZE)
+    pipelineMap['transformQueue'] = asyncio.Queue(PIPELINE_QUEUE_SIZE)
+    pipelineMap['reportQueue'] = asyncio.Queue(PIPELINE_QUEUE_SIZE)
+    pipelineMap['identificationState'] = createIdentificationState()
+    pipelineMap['inflightCondition'] = asyncio.Condition()
+    pipelineMap['inflightBatches'] = 0
+    pipelineMap['inflightBytes'] = 0
+    pipelineMap['maxInflightBatches'] = workers * 2
+    pipelineMap['maxInflightBytes'] = int(maxInflightBytes or MAX_INFLIGHT_BYTES)
+    pipelineMap['csvTableMapping'] = {}
+    pipelineMap['processFileModeMap'] = {}
+    pipelineMap['dataMap'] = dataMap
+    pipelineMap['workers'] = workers
+
+    #one more thread for the walk
+    pipelineMap['ioExecutor'] = ThreadPoolExecutor(max_workers=ioConcurrency + 1)
+    if workers > 1:
+        pipelineMap['processExecutor'] = ProcessPoolExecutor(max_workers=workers, initializer=initWorker, initargs=(dataMap,))
+    else:
+        #the file is still rewritten on its own thread so that it overlaps with the other stages
+        initWorker(dataMap)
+        pipelineMap['processExecutor'] = ThreadPoolExecutor(max_workers=1)
+
+    taskList = [asyncio.ensure_future(discoverFiles(pipelineMap, fileIterator))]
+    taskList.extend(asyncio.ensure_future(sniffFiles(pipelineMap)) for ctr in range(ioConcurrency))
+    taskList.append(asyncio.ensure_future(identifyFiles(pipelineMap, tableColumnMap, excludedFieldNameList, tableIndexMap, renamedTableList, restructuredTableList, isAutoFix)))
+    taskList.append(asyncio.ensure_future(transformFiles(pipelineMap)))
+    taskList.append(asyncio.ensure_future(reportFiles(pipelineMap, onFileProcessed)))
+
+    isCompleted = False
+    try:
+        await asyncio.gather(*taskList)
+        isCompleted = True
+    finally:
+        if not isCompleted:
+            for task in taskList:
+                task.cancel()
+        pipelineMap['ioExecutor'].shutdown(wait=isCompleted, cancel_futures=not isCompleted)
+        pipelineMap['processExecutor'].shutdown(wait=isCompleted, cancel_futures=not isCompleted)
+
+    closeIdentificationState(pipelineMap['identificationState'], metricsMap)
+    return pipelineMap['csvTableMapping'], pipelineMap['processFileModeMap']
+
+
+#returns the config settings affecting the result of each file
+def getManifestSettings():
+    settingMap = getSchemaSettings()
+    for settingName in ('EXCLUDED_SUFFIX_FIELD_NAMES', 'PREDICTIVITY_PERCENTAGE_THRESHOLD', 'APPEND_MODIFIED_FILE', 'TEST_MODE', 'AUTO_FIX'):
+        settingMap[settingName] = config['OTHERS'][settingName]
+    settingMap['DRY_RUN_SAMPLE_ROWS'] = config['OTHERS'].get('DRY_RUN_SAMPLE_ROWS', '0')
+    settingMap['VALIDATE'] = config['OTHERS'].get('VALIDATE', 'N')
+    settingMap['COMPRESS_OUTPUT'] = config['OTHERS'].get('COMPRESS_OUTPUT', '')
+    settingMap['FUZZY_MATCH_PERCENTAGE_THRESHOLD'] = config['OTHERS'].get('FUZZY_MATCH_PERCENTAGE_THRESHOLD', '0')
+    settingMap['ENCODINGS'] = config['OTHERS'].get('ENCODINGS', '')
+    #the engine and the header fast path change how the lines are rewritten, the fast path keeps the lines as they are
+    settingMap['ENGINE'] = config['OTHERS'].get('ENGINE', 'python').strip().lower()
+    settingMap['HEADER_FAST_PATH'] = config['OTHERS'].get('HEADER_FAST_PATH', 'N')
+    return settingMap
+
+
+#returns a signature per table of everything in the schemas affecting the files of the table.
+#Files without an identified table depend on the whole schema, their signature is saved with an empty table name.
+def getTableSignatureMap(excludedColumnMap, updatedTableColumnMap, tableColumnRestructuredMap, tableRestructuredMap, renamedTableList, restructuredTableList):
+    tableSignatureMap = {}
+    for tableName in updatedTableColumnMap:
+        tableInfo = (excludedColumnMap.get(tableName), updatedTableColumnMap[tableName], tableColumnRestructuredMap.get(tableName), tableRestructuredMap.get(tableName), tableName in renamedTableList, tableName in restructuredTableList)
+        tableSignatureMap[tableName] = hashlib.sha1(repr(tableInfo).encode('utf-8')).hexdigest()
+    tableSignatureMap[''] = hashlib.sha1(repr(list(tableSignatureMap.items())).encode('utf-8')).hexdigest()
+    return tableSignatureMap
+
+
+#returns the files to evaluate again. The manifest entries of the unchanged files are saved in carriedFileMap.
+def filterChangedFiles(fileIterator, manifestFileMap, tableSignatureMap, carriedFileMap):
+    for filePath in fileIterator:
+        manifestEntry = manifestFileMap.get(filePath)
+        if manifestEntry and tableSignatureMap.get(manifestEntry['tableName']) == manifestEntry['tableSignature']:
+            try:
+                stat = os.stat(filePath)
+                if stat.st_size == manifestEntry['size'] and stat.st_mtime_ns == manifestEntry['mtime']:
+                    carriedFileMap[filePath] = manifestEntry
+                    continue
+            except OSError:
+                pass
+        yield filePath
+
+
+#returns the manifest entries of all the files. The evaluated files are recorded as they are after being processed.
+def updateManifest(fileList, csvTableMapping, processedFileResultMap, carriedFileMap, tableSignatureMap):
+    fileMap = {}
+    for filePath in fileList:
+        if filePath in carriedFileMap:
+            fileMap[filePath] = carriedFileMap[filePath]
+            continue
+
+        try:
+            stat = os.stat(filePath)
+        except OSError:
+            #file is no longer there, it will be evaluated again on the next run
+            continue
+
+        tableName = csvTableMapping[filePath]['tableName']
+        if tableName not in tableSignatureMap:
+            tableName = ''
+
+        header = sniffHeader(filePath, [csvTableMapping[filePath]['encoding']])[1]
+        manifestEntry = {}
+        manifestEntry['size'] = stat.st_size
+        manifestEntry['mtime'] = stat.st_mtime_ns
+        manifestEntry['headerHash'] = hashlib.sha1(header.encode('utf-8')).hexdigest() if header is not None else ''
+        manifestEntry['tableName'] = tableName
+        manifestEntry['tableSignature'] = tableSignatureMap[tableName]
+        manifestEntry['csvTableInfo'] = csvTableMapping[filePath]
+        manifestEntry['processResult'] = processedFileResultMap[filePath]
+        fileMap[filePath] = manifestEntry
+    return fileMap
+
+
+#returns the results of all the files, adding the results carried forward from the previous run in the file order.
+def mergeCarriedFiles(fileList, csvTableMapping, processedFileResultMap, carriedFileMap):
+    mergedCsvTableMapping = {}
+    mergedProcessedFileResultMap = {}
+    for filePath in fileList:
+        if filePath in carriedFileMap:
+            mergedCsvTableMapping[filePath] = carriedFileMap[filePath]['csvTableInfo']
+            mergedProcessedFileResultMap[filePath] = carriedFileMap[filePath]['processResult']
+        else:
+            mergedCsvTableMapping[filePath] = csvTableMapping[filePath]
+            mergedProcessedFileResultMap[filePath] = processedFileResultMap[filePath]
+    return mergedCsvTableMapping, mergedProcessedFileResultMap
+
+
+#function to write the result of a csv file on all the file reports
+def writeFileReports(fileReportStreamList, filePath, csvTableInfo, processResult):
+    for fileReportStreamMap in fileReportStreamList:
+        writeFileReport(fileReportStreamMap, filePath, csvTableInfo, processResult)
+
+
+#returns the base path of the report files. Reports are named after the time the run started.
+def getReportFile():
+    outputDirectory= config['REPORT']['OUTPUT']
+    reportFolder= config['REPORT']['FOLDER_NAME']
+    reportFileName= config['REPORT']['FILE_NAME']
+
+    if not outputDirectory:
+        outputDirectory= join(currentPath, reportFolder)
+    os.makedirs(outputDirectory, exist_ok=True)
+    return "{}_{}".format(join(outputDirectory, reportFileName), datetime.datetime.now().strftime("%m%d%Y_%H%M%S"))
+
+
+#function to run the evaluation under a profiler. The profile is saved next to the report.
+def runProfiled(profiler, outputFile, metricsMap, shardMap=None):
+    if profiler == 'cprofile':
+        profile = cProfile.Profile()
+        try:
+            profile.runcall(run, outputFile, metricsMap, shardMap)
+        finally:
+            profile.dump_stats(outputFile + '.prof')
+            print("Profile written on ", outputFile + '.prof')
+    elif profiler == 'tracemalloc':
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+        try:
+            run(outputFile, metricsMap, shardMap)
+        finally:
+            snapshot = tracemalloc.take_snapshot()
+            peakSize = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            with open(outputFile + '.tracemalloc.txt', 'w', encoding='utf-8') as fp:
+                fp.write(f'Peak traced memory: {peakSize} bytes{NEWLINE}')
+                for statistic in snapshot.statistics('traceback')[:TRACEMALLOC_TOP_COUNT]:
+                    fp.write(str(statistic) + NEWLINE)
+                    for line in statistic.traceback.format():
+                        fp.write(line + NEWLINE)
+            print("Memory profile written on ", outputFile + '.tracemalloc.txt')
+    else:
+        run(outputFile, metricsMap, shardMap)
+
+
+#returns the folder where the parsed schemas are cached, empty when the cache is disabled
+def getCacheFolder():
+    cacheFolder = config['OTHERS'].get('CACHE_FOLDER', '')
+    return join(currentPath, cacheFolder) if cacheFolder else ''
+
+
+#returns the tables of the schemas and the structures used to identify and rewrite the csv files
+def loadRunState(cacheFolder, metricsMap):
+    with measureStage(metricsMap, 'parseSchema'):
+        #the schema files are parsed at the same time
+        schemaCurrentPath = config['PATH']['SCHEMA_CURRENT']
+        schemaRenamedPath = config['PATH']['SCHEMA_FOR_RENAMING']
+        schemaRestructuredPath = config['PATH']['SCHEMA_FOR_RESTRUCTURED']
+        schemaPathList = [schemaPath for schemaPath in (schemaCurrentPath, schemaRenamedPath, schemaRestructuredPath) if schemaPath]
+        schemaMap = parseSchemaFiles(schemaPathList, cacheFolder, config['OTHERS'].get('WORKERS', '1'))
+
+        #parsing the current schema
+        tableMap, tableColumnCurrentMap = schemaMap[schemaCurrentPath]
+        #print(f'tableMap: {tableMap}')
+        #print(f'tableColumnCurrentMap: {tableColumnCurrentMap}')
+    
+        #parsing the schema - for renamed columns
+        tableRenamedMap, tableColumnRenamedMap = {},{}
+        if schemaRenamedPath:
+            tableRenamedMap, tableColumnRenamedMap = schemaMap[schemaRenamedPath]
+        #print(f'tableColumnRenamedMap: {tableColumnRenamedMap}')
+
+        #Identify the renamed tables
+        renamedTableList = []
+        if tableColumnRenamedMap:
+            renamedTableList = getModifiedTables(tableColumnCurrentMap, tableColumnRenamedMap)
+        #print(f'renamedTableList: {renamedTableList}')
+
+        #Identify the restructured table(s)
+        tableRestructuredMap, tableColumnRestructuredMap = {},{}
+        if schemaRestructuredPath:
+            tableRestructuredMap, tableColumnRestructuredMap = schemaMap[schemaRestructuredPath]
+        #print(f'tableRestructuredMap: {tableRestructuredMap}')
+        #print(f'tableColumnRestructuredMap: {tableColumnRestructuredMap}')
+    
+        #Get the updated renamed table columns.
+        updatedTableColumnMap = tableColumnCurrentMap.copy()
+        if not renamedTableList:
+            print(f'No table column(s) has been renamed!')
+        else:
+            updateTableColumns(updatedTableColumnMap, tableColumnRenamedMap, renamedTableList)
+        #print(f'updatedTableColumnMap: {updatedTableColumnMap}')
+
+        #Identify the restructured tables
+        restructuredTableList = []
+        if not tableColumnRestructuredMap:
+            print(f'No table(s) has been retructured!')
+        else:    
+            restructuredTableList = getModifiedTables(updatedTableColumnMap, tableColumnRestructuredMap)
+        #print(f'restructuredTableList: {restructuredTableList}')
+
+    #Identify the table associated with the Csv file
+    excludedFieldNameList = covertTrimmedStringToList(config['OTHERS']['EXCLUDED_SUFFIX_FIELD_NAMES'])
+    excludedColumnMap = getExcludedColumnMap(tableColumnCurrentMap, excludedFieldNameList)
+
+    runStateMap = {}
+    runStateMap['schemaPathList'] = schemaPathList
+    runStateMap['tableMap'] = tableMap
+    runStateMap['tableColumnCurrentMap'] = tableColumnCurrentMap
+    runStateMap['tableRenamedMap'] = tableRenamedMap
+    runStateMap['renamedTableList'] = renamedTableList
+    runStateMap['tableRestructuredMap'] = tableRestructuredMap
+    runStateMap['tableColumnRestructuredMap'] = tableColumnRestructuredMap
+    runStateMap['updatedTableColumnMap'] = updatedTableColumnMap
+    runStateMap['restructuredTableList'] = restructuredTableList
+    runStateMap['excludedFieldNameList'] = excludedFieldNameList
+    runStateMap['excludedColumnMap'] = excludedColumnMap
+    runStateMap['tableIndexMap'] = buildTableIndex(excludedColumnMap)
+    runStateMap['tableSignatureMap'] = getTableSignatureMap(excludedColumnMap, updatedTableColumnMap, tableColumnRestructuredMap, tableRestructuredMap, renamedTableList, restructuredTableList)
+
+    #column checks of the rows being rewritten
+    runStateMap['validationPlanMap'] = {}
+    if config['OTHERS'].get('VALIDATE', 'N') == 'Y':
+        runStateMap['validationPlanMap'] = compileValidationPlanMap(updatedTableColumnMap, tableMap, tableRenamedMap, renamedTableList, restructuredTableList, tableColumnRestructuredMap, tableRestructuredMap)
+    return runStateMap
+
+
+#returns the csv and jsonl reports of the formats, written while the files are being processed
+def openFileReports(outputFile, reportFormatList):
+    fileReportStreamList = []
+    for reportFormat in reportFormatList:
+        if reportFormat in ('csv', 'jsonl'):
+            fileReportStreamList.append(openFileReport('{}.{}'.format(outputFile, reportFormat), reportFormat))
+    return fileReportStreamList
+
+
+#returns the (csvTableMapping, processedFileResultMap) of the files once identified and processed with the settings of config.ini.
+#onFileProcessed is called with the result of each file as soon as it is processed.
+def evaluateFiles(runStateMap, fileIterator, onFileProcessed, metricsMap):
+    encodingList = getEncodingList(config['OTHERS'].get('ENCODINGS', ''))
+
+    #Time to process the csv files with the restructured tables.
+    ioConcurrency = config['OTHERS'].get('IO_CONCURRENCY', '1')
+    isTestMode = config['OTHERS']['TEST_MODE']
+    isAutoFix = config['OTHERS']['AUTO_FIX']
+    appendModifiedFile = config['OTHERS']['APPEND_MODIFIED_FILE']
+    workers = config['OTHERS'].get('WORKERS', '1')
+    engine = config['OTHERS'].get('ENGINE', 'python').strip().lower()
+    chunkSize = config['OTHERS'].get('CHUNK_SIZE', str(CHUNK_SIZE))
+    headerFastPath = config['OTHERS'].get('HEADER_FAST_PATH', 'N')
+    pipeline = config['OTHERS'].get('PIPELINE', 'sequential').strip().lower()
+    maxInflightBytes = config['OTHERS'].get('MAX_INFLIGHT_BYTES', str(MAX_INFLIGHT_BYTES))
+    dryRunSampleRows = config['OTHERS'].get('DRY_RUN_SAMPLE_ROWS', '0')
+    compressOutput = config['OTHERS'].get('COMPRESS_OUTPUT', '').strip().lower()
+    splitThreshold = config['OTHERS'].get('SPLIT_THRESHOLD', '0')
+
+    excludedColumnMap = runStateMap['excludedColumnMap']
+    excludedFieldNameList = runStateMap['excludedFieldNameList']
+    tableIndexMap = runStateMap['tableIndexMap']
+    renamedTableList = runStateMap['renamedTableList']
+    restructuredTableList = runStateMap['restructuredTableList']
+    updatedTableColumnMap = runStateMap['updatedTableColumnMap']
+    tableColumnRestructuredMap = runStateMap['tableColumnRestructuredMap']
+    tableRestructuredMap = runStateMap['tableRestructuredMap']
+    validationPlanMap = runStateMap['validationPlanMap']
+
+    if pipeline == 'asyncio':
+        #the files are rewritten while the directories are still being walked and the headers read
+        dataMap = getProcessData(updatedTableColumnMap, restructuredTableList, tableColumnRestructuredMap, tableRestructuredMap, appendModifiedFile, isTestMode, engine, chunkSize, headerFastPath, dryRunSampleRows, validationPlanMap, compressOutput, splitThreshold)
+        with measureStage(metricsMap, 'pipeline'):
+            csvTableMapping, processedFileResultMap = asyncio.run(processPipeline(fileIterator, excludedColumnMap, excludedFieldNameList, tableIndexMap, renamedTableList, restructuredTableList, dataMap, isAutoFix, ioConcurrency, workers, maxInflightBytes, onFileProcessed, metricsMap, encodingList))
+        collectIdentificationMetrics(metricsMap, csvTableMapping)
+    else:
+        #the directories are walked while the files are being identified
+        with measureStage(metricsMap, 'identification'):
+            csvTableMapping= processCsvTableIdentification(fileIterator, excludedColumnMap, excludedFieldNameList, ioConcurrency, tableIndexMap, metricsMap, encodingList)
+        collectIdentificationMetrics(metricsMap, csvTableMapping)
+        #print(f'csvTableMapping: {csvTableMapping}')
+
+        with measureStage(metricsMap, 'process'):
+            processedFileResultMap = process(csvTableMapping, renamedTableList, updatedTableColumnMap, restructuredTableList, tableColumnRestructuredMap, tableRestructuredMap, appendModifiedFile, isTestMode, isAutoFix, workers, engine, chunkSize, onFileProcessed, headerFastPath, dryRunSampleRows, validationPlanMap, compressOutput, splitThreshold)
+            #print(f'processedFileResultMap: {processedFileResultMap}')
+    return csvTableMapping, processedFileResultMap
+
+
+#runs the whole evaluation. The file reports are named after outputFile and the metrics are collected on metricsMap.
+#With a shardMap, only the files of the shard are evaluated and the partial results are saved instead of the xlsx report.
+def run(outputFile, metricsMap, shardMap=None):
+    runStateMap = loadRunState(getCacheFolder(), metricsMap)
+
+    #list all the csv files to evaluate. The files are identified while the directories are still being walked.
+    sourcePath= config['PATH']['SOURCE']
+    fileSearchPattern = config['OTHERS']['FILES_SEARCH_PATTERN']
+    fileNamePattern = config['OTHERS']['FILES_TO_FIND']
+    walkWorkers = config['OTHERS'].get('WALK_WORKERS', '1')
+    fileList = []
+    fileIterator = recordFiles(iterFiles(sourcePath, fileSearchPattern, fileNamePattern, walkWorkers, metricsMap), fileList)
+
+    if shardMap:
+        #the whole tree is listed before the files of this shard are evaluated
+        allFileList = list(fileIterator)
+        fileList, filePositionMap = getShardFileList(allFileList, sourcePath, shardMap['shardIndex'], shardMap['shardCount'], shardMap['shardPlanFile'])
+        fileIterator = iter(fileList)
+        metricsMap['counters']['filesFound'] = len(fileList)
+        print(f'Shard {shardMap["shardIndex"]}/{shardMap["shardCount"]}: {len(fileList)} of {len(allFileList)} file(s)')
+
+    #Skip the files that did not change since the previous run
+    manifestFile = config['OTHERS'].get('MANIFEST_FILE', '')
+    manifestSettingMap = getManifestSettings()
+    tableSignatureMap = runStateMap['tableSignatureMap']
+    carriedFileMap = {}
+    if manifestFile:
+        manifestFile = join(currentPath, manifestFile)
+        if shardMap:
+            #each shard records its own files
+            manifestFile += '.shard{}of{}'.format(shardMap['shardIndex'], shardMap['shardCount'])
+        fileIterator = filterChangedFiles(fileIterator, loadManifest(manifestFile, manifestSettingMap), tableSignatureMap, carriedFileMap)
+
+    #csv and jsonl reports are written while the files are being processed
+    reportFormatList = covertTrimmedStringToList(config['REPORT'].get('FORMAT', 'xlsx'))
+    fileReportStreamList = openFileReports(outputFile, reportFormatList)
+    onFileProcessed = partial(writeFileReports, fileReportStreamList) if fileReportStreamList else None
+
+    csvTableMapping, processedFileResultMap = evaluateFiles(runStateMap, fileIterator, onFileProcessed, metricsMap)
+
+    if manifestFile:
+        print(f'Unchanged file(s) carried forward from the previous run: {len(carriedFileMap)}')
+    collectProcessMetrics(metricsMap, processedFileResultMap)
+
+    if manifestFile:
+        manifestFileMap = updateManifest(fileList, csvTableMapping, processedFileResultMap, carriedFileMap, tableSignatureMap)
+        saveManifest(manifestFile, manifestSettingMap, manifestFileMap)
+        csvTableMapping, processedFileResultMap = mergeCarriedFiles(fileList, csvTableMapping, processedFileResultMap, carriedFileMap)
+        for filePath in carriedFileMap:
+            writeFileReports(fileReportStreamList, filePath, csvTableMapping[filePath], processedFileResultMap[filePath])
+
+    for fileReportStreamMap in fileReportStreamList:
+        closeFileReport(fileReportStreamMap)
+
+    #Identify the new and deleted tables
+    newTableList, deletedTableList = getNewAndDeletedTableList(runStateMap['updatedTableColumnMap'], runStateMap['tableColumnRestructuredMap'])
+
+    #Time to create the report file
+    reportingMap = {}
+    reportingMap['originalTableList'] = runStateMap['tableColumnCurrentMap'].keys()
+    reportingMap['renamedTableList'] = runStateMap['renamedTableList']
+    reportingMap['restructuredTableList'] = runStateMap['restructuredTableList']
+    reportingMap['newTableList'] = newTableList
+    reportingMap['deletedTableList'] = deletedTableList
+    reportingMap['csvTableMapping'] = csvTableMapping
+    reportingMap['processedFileResultMap'] = processedFileResultMap
+
+    #the summary of the run is added to the report and saved next to it
+    summaryMap = summarizeMetrics(metricsMap)
+    reportingMap['summaryRowList'] = getSummaryRowList(summaryMap)
+
+    with measureStage(metricsMap, 'report'):
+        if shardMap:
+            #the xlsx report is created once the results of all the shards are merged
+            saveShardResult(outputFile + '.shard.json', shardMap['shardIndex'], shardMap['shardCount'], reportingMap, filePositionMap, summarizeMetrics(metricsMap))
+        elif 'xlsx' in reportFormatList:
+            createReport(reportingMap, outputFile + '.xlsx')
+
+    saveMetrics(summarizeMetrics(metricsMap), outputFile + '.metrics.json')
+
+
+#returns the (size, modification time) of a file, or None when it is no longer there
+def getFileStat(filePath):
+    try:
+        stat = os.stat(filePath)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+#function called on SIGTERM to stop watching the source folder once the current scan is done
+def stopWatch(watchMap, signalNumber, frame):
+    watchMap['isStopped'] = True
+
+
+#runs the evaluation each time csv files are added to or modified in the source folder, until it is stopped.
+#The schemas and the structures used to identify the files are built once and kept in memory. They are built again when a schema file changes,
+#all the files are then evaluated again. A file added or modified since the previous scan is evaluated once its size and modification time
+#are the same on the next scan, so that the files still being copied are left alone. The results are appended to the csv and jsonl reports.
+def runWatch(outputFile, metricsMap):
+    watchInterval = float(config['OTHERS'].get('WATCH_INTERVAL', str(WATCH_INTERVAL)))
+    sourcePath= config['PATH']['SOURCE']
+    fileSearchPattern = config['OTHERS']['FILES_SEARCH_PATTERN']
+    fileNamePattern = config['OTHERS']['FILES_TO_FIND']
+    walkWorkers = config['OTHERS'].get('WALK_WORKERS', '1')
+    cacheFolder = getCacheFolder()
+
+    #files unchanged since the previous run are skipped on the first scan
+    manifestFile = config['OTHERS'].get('MANIFEST_FILE', '')
+    manifestSettingMap = getManifestSettings()
+    manifestFileMap = {}
+    if manifestFile:
+        manifestFile = join(currentPath, manifestFile)
+        manifestFileMap = loadManifest(manifestFile, manifestSettingMap)
+
+    #the xlsx report is only created at the end of a run, the results of each scan are appended to the csv and jsonl reports
+    reportFormatList = [reportFormat for reportFormat in covertTrimmedStringToList(config['REPORT'].get('FORMAT', 'xlsx')) if reportFormat in ('csv', 'jsonl')] or ['jsonl']
+    fileReportStreamList = openFileReports(outputFile, reportFormatList)
+    onFileProcessed = partial(writeFileReports, fileReportStreamList)
+
+    #pandas is loaded once instead of on each scan, the worker processes started on each scan are forked with it
+    if config['OTHERS'].get('ENGINE', 'python').strip().lower() == 'pandas' or config['OTHERS'].get('VALIDATE', 'N') == 'Y':
+        import pandas
+
+    watchMap = {'isStopped': False}
+    signal.signal(signal.SIGTERM, partial(stopWatch, watchMap))
+    runStateMap = None
+    schemaStatList = []
+    #size and modification time of the files once evaluated, of the files written by the evaluation and of the files found added or modified on the previous scan.
+    #The files written by the evaluation are not evaluated, even when the schemas change.
+    knownFileMap = {}
+    writtenFileMap = {}
+    changedFileMap = {}
+    print(f'Watching {sourcePath} every {watchInterval}s, press Ctrl+C to stop')
+    try:
+        while not watchMap['isStopped']:
+            isFullScan = False
+            if runStateMap is None or [getFileStat(schemaPath) for schemaPath in runStateMap['schemaPathList']] != schemaStatList:
+                if runStateMap is not None:
+                    print('Schema file(s) changed, all the files are evaluated again')
+                runStateMap = loadRunState(cacheFolder, metricsMap)
+                schemaStatList = [getFileStat(schemaPath) for schemaPath in runStateMap['schemaPathList']]
+                knownFileMap = {}
+                changedFileMap = {}
+                isFullScan = True
+
+            start = time.perf_counter()
+            fileList = []
+            foundFileSet = set()
+            nextChangedFileMap = {}
+            for filePath in iterFiles(sourcePath, fileSearchPattern, fileNamePattern, walkWorkers, None, True):
+                foundFileSet.add(filePath)
+                fileStat = getFileStat(filePath)
+                if fileStat is None or knownFileMap.get(filePath) == fileStat or writtenFileMap.get(filePath) == fileStat:
+                    continue
+                if isFullScan or changedFileMap.get(filePath) == fileStat:
+                    fileList.append(filePath)
+                else:
+                    nextChangedFileMap[filePath] = fileStat
+            changedFileMap = nextChangedFileMap
+
+            #the files that are no longer there are forgotten
+            knownFileMap = {filePath: fileStat for filePath, fileStat in knownFileMap.items() if filePath in foundFileSet}
+            writtenFileMap = {filePath: fileStat for filePath, fileStat in writtenFileMap.items() if filePath in foundFileSet}
+            isManifestChanged = any(filePath not in foundFileSet for filePath in manifestFileMap)
+            manifestFileMap = {filePath: manifestEntry for filePath, manifestEntry in manifestFileMap.items() if filePath in foundFileSet}
+
+            if fileList:
+                #only the column names of the manifest entries are kept from the previous scans
+                resetColumns([manifestEntry['csvTableInfo'] for manifestEntry in manifestFileMap.values()])
+                carriedFileMap = {}
+                fileIterator = iter(fileList)
+                if manifestFile and isFullScan:
+                    fileIterator = filterChangedFiles(fileIterator, manifestFileMap, runStateMap['tableSignatureMap'], carriedFileMap)
+                addCounter(metricsMap, 'filesFound', len(fileList))
+                csvTableMapping, processedFileResultMap = evaluateFiles(runStateMap, fileIterator, onFileProcessed, metricsMap)
+                collectProcessMetrics(metricsMap, processedFileResultMap)
+                for filePath in carriedFileMap:
+                    writeFileReports(fileReportStreamList, filePath, carriedFileMap[filePath]['csvTableInfo'], carriedFileMap[filePath]['processResult'])
+
+                if manifestFile:
+                    manifestFileMap.update(updateManifest(fileList, csvTableMapping, processedFileResultMap, carriedFileMap, runStateMap['tableSignatureMap']))
+                    isManifestChanged = True
+
+                #the files are known as they are once processed
+                for filePath in fileList:
+                    fileStat = getFileStat(filePath)
+                    if fileStat is not None:
+                        knownFileMap[filePath] = fileStat
+                    newFilePath = processedFileResultMap[filePath].get('newFilePath') if filePath in processedFileResultMap else None
+                    fileStat = getFileStat(newFilePath) if newFilePath else None
+                    if fileStat is not None:
+                        writtenFileMap[newFilePath] = fileStat
+
+                for fileReportStreamMap in fileReportStreamList:
+                    flushFileReport(fileReportStreamMap)
+                saveMetrics(summarizeMetrics(metricsMap), outputFile + '.metrics.json')
+                print(f'{datetime.datetime.now():%Y-%m-%d %H:%M:%S} {len(fileList)} file(s) evaluated in {time.perf_counter() - start:.3f}s')
+
+            if isManifestChanged:
+                saveManifest(manifestFile, manifestSettingMap, manifestFileMap)
+
+            if not watchMap['isStopped']:
+                time.sleep(watchInterval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for fileReportStreamMap in fileReportStreamList:
+            closeFileReport(fileReportStreamMap)
+    print('Stopped watching', sourcePath)
+
+
+#function to create the reports of a sharded run from the partial results saved by each shard
+def runMerge(outputFile, shardResultFileList):
+    shardResultMapList = loadShardResults(shardResultFileList)
+    reportingMap = mergeShardResults(shardResultMapList)
+    summaryMap = mergeMetrics([shardResultMap['summary'] for shardResultMap in shardResultMapList])
+    reportingMap['summaryRowList'] = getSummaryRowList(summaryMap)
+    print(f'Merged {len(shardResultMapList)} shard(s), {len(reportingMap["csvTableMapping"])} file(s)')
+
+    reportFormatList = covertTrimmedStringToList(config['REPORT'].get('FORMAT', 'xlsx'))
+    for reportFormat in reportFormatList:
+        if reportFormat in ('csv', 'jsonl'):
+            fileReportStreamMap = openFileReport('{}.{}'.format(outputFile, reportFormat), reportFormat)
+            for filePath in reportingMap['csvTableMapping']:
+                writeFileReports([fileReportStreamMap], filePath, reportingMap['csvTableMapping'][filePath], reportingMap['processedFileResultMap'][filePath])
+            closeFileReport(fileReportStreamMap)
+    if 'xlsx' in reportFormatList:
+        createReport(reportingMap, outputFile + '.xlsx')
+    saveMetrics(summaryMap, outputFile + '.metrics.json')
+
+
+#returns the command line arguments
+def parseArguments():
+    parser = argparse.ArgumentParser(description='Evaluate and rewrite the csv files of the source folder against the schemas set in config.ini.')
+    parser.add_argument('--shard', default='', help='i/N to only evaluate the i-th of N shards of the files, balanced by file size. Saves the partial results for --merge instead of the xlsx report.')
+    parser.add_argument('--shard-plan', dest='shardPlan', default='', help='new file for each run, shared by the shards. The first shard saves the shard of each file, the others use it so that the files written by a shard are not picked up by another.')
+    parser.add_argument('--merge', nargs='+', default=[], metavar='SHARD_RESULT', help='create the reports from the partial results of all the shards')
+    parser.add_argument('--watch', action='store_true', help='keep the schemas in memory and evaluate the csv files as they are added to or modified in the source folder, until stopped. The results are appended to the csv and jsonl reports.')
+    arguments = parser.parse_args()
+    if arguments.watch and (arguments.shard or arguments.merge):
+        parser.error('--watch can not be used with --shard or --merge')
+    return arguments
+
+
+if __name__ == "__main__":
+    try:
+        start = datetime.datetime.now()
+        print(f'\nInitializing...\nTime started: {start}')
+
+        arguments = parseArguments()
+
+        #all the report files of the run share the same base path
+        outputFile = getReportFile()
+        if arguments.merge:
+            runMerge(outputFile, arguments.merge)
+        elif arguments.watch:
+            runWatch(outputFile, createMetrics())
+        else:
+            shardMap = None
+            if arguments.shard:
+                shardMap = {}
+                shardMap['shardIndex'], shardMap['shardCount'] = parseShard(arguments.shard)
+                shardMap['shardPlanFile'] = arguments.shardPlan
+                #shards started at the same time on one machine do not share their report files
+                outputFile += '_shard{}of{}'.format(shardMap['shardIndex'], shardMap['shardCount'])
+            metricsMap = createMetrics()
+            profiler = config['OTHERS'].get('PROFILE', '').strip().lower()
+            runProfiled(profiler, outputFile, metricsMap, shardMap)
+
+        finish = datetime.datetime.now()
+        print(f'\nTime elapsed:\n{finish - start}')
+    except Exception as err:
         logger.error(str(err), exc_info=True)
\ No newline at end of file
@@ -0,0 +1,181 @@
+import os, time, json, heapq
+from contextlib import contextmanager
+
+from constants import *
+
+try:
+    import resource
+except ImportError:
+    #not available on Windows, the peak memory is then not reported
+    resource = None
+
+#returns a new map where the metrics of a run are collected
+def createMetrics():
+    metricsMap = {}
+    metricsMap['stages'] = {}
+    metricsMap['counters'] = {}
+    return metricsMap
+
+
+#returns the cpu time used so far by the process and its terminated worker processes
+def getCpuTime():
+    times = os.times()
+    return time.process_time() + times.children_user + times.children_system
+
+
+#measures the wall and cpu time of a stage. A stage measured more than once is accumulated.
+@contextmanager
+def measureStage(metricsMap, stageName):
+    wallStart = time.perf_counter()
+    cpuStart = getCpuTime()
+    try:
+        yield
+    finally:
+        stageMap = metricsMap['stages'].setdefault(stageName, {'wallSeconds': 0.0, 'cpuSeconds': 0.0})
+        stageMap['wallSeconds'] += time.perf_counter() - wallStart
+        stageMap['cpuSeconds'] += getCpuTime() - cpuStart
+
+
+#function to add a value to a counter
+def addCounter(metricsMap, counterName, value=1):
+    metricsMap['counters'][counterName] = metricsMap['counters'].get(counterName, 0) + value
+
+
+#returns the peak resident memory in bytes of the process and of its largest worker process
+def getPeakMemory():
+    if resource is None:
+        return None, None
+    #ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    unit = 1 if os.uname().sysname == 'Darwin' else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * unit, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * unit
+
+
+#returns the number of items per second of a stage. The stages that overlap in a pipeline are measured as a whole.
+def getRate(metricsMap, stageName, value):
+    stageMap = metricsMap['stages'].get(stageName) or metricsMap['stages'].get('pipeline', {})
+    wallSeconds = stageMap.get('wallSeconds', 0)
+    return value / wallSeconds if wallSeconds > 0 else 0.0
+
+
+#function to collect the identification counters of the files evaluated in this run
+def collectIdentificationMetrics(metricsMap, csvTableMapping):
+    addCounter(metricsMap, 'identifiedFiles', len(csvTableMapping))
+    addCounter(metricsMap, 'identifiedFileErrors', sum(1 for csvTableInfo in csvTableMapping.values() if csvTableInfo['error']))
+
+
+#function to collect the rewrite counters, the file count per mode and the slowest files of this run.
+#Files collected more than once on the same metrics, the scans of a watched folder, are added up.
+def collectProcessMetrics(metricsMap, processedFileResultMap, slowestFileCount=SLOWEST_FILE_COUNT):
+    modeCountMap = metricsMap.setdefault('modes', {mode: 0 for mode in range(5)})
+    for processResult in processedFileResultMap.values():
+        modeCountMap[processResult['mode']] = modeCountMap.get(processResult['mode'], 0) + 1
+        if 'seconds' in processResult:
+            addCounter(metricsMap, 'rewrittenFiles')
+            addCounter(metricsMap, 'rewrittenRows', processResult.get('rows', 0))
+            addCounter(metricsMap, 'rewrittenBytes', processResult['bytes'])
+        if 'violationMap' in processResult:
+            addCounter(metricsMap, 'validatedRows', processResult['violationMap']['rows'])
+            addCounter(metricsMap, 'violations', sum(processResult['violationMap']['counts'].values()))
+            addCounter(metricsMap, 'filesWithViolations', 1 if processResult['violationMap']['samples'] else 0)
+        if 'estimatedRows' in processResult:
+            addCounter(metricsMap, 'sampledFiles')
+            addCounter(metricsMap, 'estimatedRows', processResult['estimatedRows'])
+            addCounter(metricsMap, 'estimatedBytes', processResult['estimatedBytes'])
+            addCounter(metricsMap, 'estimatedSeconds', processResult['estimatedSeconds'])
+            addCounter(metricsMap, 'invalidSampledFiles', 1 if processResult['validationErrors'] else 0)
+
+    timedFileList = [(processResult['seconds'], filePath) for filePath, processResult in processedFileResultMap.items() if 'seconds' in processResult]
+    timedFileList.extend((slowestFileMap['seconds'], slowestFileMap['file']) for slowestFileMap in metricsMap.get('slowestFiles', []))
+    metricsMap['slowestFiles'] = [{'file': filePath, 'seconds': seconds} for seconds, filePath in heapq.nlargest(slowestFileCount, timedFileList)]
+
+
+#returns the metrics of the run ready to be saved, with the throughput of the identification and rewrite stages
+def summarizeMetrics(metricsMap):
+    counterMap = metricsMap['counters']
+    summaryMap = {}
+    summaryMap['stages'] = metricsMap['stages']
+    summaryMap['counters'] = counterMap
+    summaryMap['walk'] = metricsMap.get('walk', {})
+
+    throughputMap = {}
+    throughputMap['identification'] = {}
+    throughputMap['identification']['filesPerSecond'] = getRate(metricsMap, 'identification', counterMap.get('identifiedFiles', 0))
+    throughputMap['identification']['rowsPerSecond'] = getRate(metricsMap, 'identification', counterMap.get('identifiedFiles', 0) - counterMap.get('identifiedFileErrors', 0))
+    throughputMap['identification']['bytesPerSecond'] = getRate(metricsMap, 'identification', counterMap.get('identifiedBytes', 0))
+    throughputMap['rewrite'] = {}
+    throughputMap['rewrite']['filesPerSecond'] = getRate(metricsMap, 'process', counterMap.get('rewrittenFiles', 0))
+    throughputMap['rewrite']['rowsPerSecond'] = getRate(metricsMap, 'process', counterMap.get('rewrittenRows', 0))
+    throughputMap['rewrite']['bytesPerSecond'] = getRate(metricsMap, 'process', counterMap.get('rewrittenBytes', 0))
+    summaryMap['throughput'] = throughputMap
+
+    summaryMap['modes'] = metricsMap.get('modes', {})
+    summaryMap['slowestFiles'] = metricsMap.get('slowestFiles', [])
+    summaryMap['peakMemoryBytes'], summaryMap['peakWorkerMemoryBytes'] = getPeakMemory()
+    return summaryMap
+
+
+#returns the summary of shards run in parallel as the summary of a single run. A stage lasts as long as in the slowest shard,
+#its cpu time and the counters are added up.
+def mergeMetrics(summaryMapList, slowestFileCount=SLOWEST_FILE_COUNT):
+    metricsMap = createMetrics()
+    metricsMap['walk'] = {}
+    metricsMap['modes'] = {}
+    slowestFileList = []
+    for summaryMap in summaryMapList:
+        for stageName, stageMap in summaryMap['stages'].items():
+            mergedStageMap = metricsMap['stages'].setdefault(stageName, {'wallSeconds': 0.0, 'cpuSeconds': 0.0})
+            mergedStageMap['wallSeconds'] = max(mergedStageMap['wallSeconds'], stageMap['wallSeconds'])
+            mergedStageMap['cpuSeconds'] += stageMap['cpuSeconds']
+        for counterName, value in summaryMap['counters'].items():
+            addCounter(metricsMap, counterName, value)
+        for walkName, value in summaryMap['walk'].items():
+            metricsMap['walk'][walkName] = max(metricsMap['walk'].get(walkName, 0), value)
+        for mode, count in summaryMap['modes'].items():
+            #the modes are saved as text keys
+            metricsMap['modes'][int(mode)] = metricsMap['modes'].get(int(mode), 0) + count
+        slowestFileList.extend(summaryMap['slowestFiles'])
+    metricsMap['modes'] = dict(sorted(metricsMap['modes'].items()))
+    metricsMap['slowestFiles'] = heapq.nlargest(slowestFileCount, slowestFileList, key=lambda fileMap: fileMap['seconds'])
+
+    mergedSummaryMap = summarizeMetrics(metricsMap)
+    #the memory of the shards, not the one of the merge
+    peakMemoryList = [(summaryMap['peakMemoryBytes'], summaryMap['peakWorkerMemoryBytes']) for summaryMap in summaryMapList if summaryMap['peakMemoryBytes'] is not None]
+    mergedSummaryMap['peakMemoryBytes'] = max(peakMemory for peakMemory, peakWorkerMemory in peakMemoryList) if peakMemoryList else None
+    mergedSummaryMap['peakWorkerMemoryBytes'] = max(peakWorkerMemory for peakMemory, peakWorkerMemory in peakMemoryList) if peakMemoryList else None
+    return mergedSummaryMap
+
+
+#returns the summary as a list of (metric, value) rows for the report
+def getSummaryRowList(summaryMap):
+    rowList = []
+    for stageName, stageMap in summaryMap['stages'].items():
+        rowList.append((f'{stageName} wall time (s)', round(stageMap['wallSeconds'], 3)))
+        rowList.append((f'{stageName} cpu time (s)', round(stageMap['cpuSeconds'], 3)))
+    for stageName, throughputMap in summaryMap['throughput'].items():
+        rowList.append((f'{stageName} files/sec', round(throughputMap['filesPerSecond'], 1)))
+        rowList.append((f'{stageName} rows/sec', round(throughputMap['rowsPerSecond'], 1)))
+        rowList.append((f'{stageName} bytes/sec', round(throughputMap['bytesPerSecond'], 1)))
+    if 'validatedRows' in summaryMap['counters']:
+        rowList.append(('Validated rows', summaryMap['counters']['validatedRows']))
+        rowList.append(('Validation violations', summaryMap['counters']['violations']))
+        rowList.append(('Files with violations', summaryMap['counters']['filesWithViolations']))
+    if 'sampledFiles' in summaryMap['counters']:
+        rowList.append(('Estimated rows to rewrite', summaryMap['counters']['estimatedRows']))
+        rowList.append(('Estimated bytes to rewrite', summaryMap['counters']['estimatedBytes']))
+        rowList.append(('Estimated rewrite time with one worker (s)', round(summaryMap['counters']['estimatedSeconds'], 3)))
+        rowList.append(('Sampled files failing validation', summaryMap['counters']['invalidSampledFiles']))
+    for mode, count in summaryMap['modes'].items():
+        rowList.append((f'Files in mode {mode}', count))
+    if summaryMap['peakMemoryBytes'] is not None:
+        rowList.append(('Peak memory (bytes)', summaryMap['peakMemoryBytes']))
+        rowList.append(('Peak worker memory (bytes)', summaryMap['peakWorkerMemoryBytes']))
+    for fileMap in summaryMap['slowestFiles']:
+        rowList.append((f'Slow file: {fileMap["file"]}', round(fileMap['seconds'], 3)))
+    return rowList
+
+
+#function to save the metrics of the run as a json file
+def saveMetrics(summaryMap, outputFile):
+    with open(outputFile, 'w', encoding='utf-8') as fp:
+        json.dump(summaryMap, fp, indent=2, ensure_ascii=False)
+    print("Metrics written on ", outputFile)
@@ -0,0 +1,147 @@
+import sys
+from collections.abc import MutableMapping
+
+from constants import *
+
+#names of the columns found in the csv headers. The column lists of the records hold their index in this list.
+columnNameList = []
+columnIndexMap = {}
+
+#status of the processed files, saved as their index in STATUS_LIST
+statusCodeMap = {status: code for code, status in enumerate(STATUS_LIST)}
+
+
+#returns the indices of a list of column names. Column names joined with ', ' are accepted as well.
+def encodeColumns(columnList):
+    if isinstance(columnList, str):
+        columnList = columnList.split(', ') if columnList else []
+    indexList = []
+    for columnName in columnList:
+        index = columnIndexMap.get(columnName)
+        if index is None:
+            index = columnIndexMap[columnName] = len(columnNameList)
+            columnNameList.append(columnName)
+        indexList.append(index)
+    return tuple(indexList)
+
+
+#returns the column names of a list of indices joined with ', '
+def expandColumns(indexList):
+    return ', '.join([columnNameList[index] for index in indexList])
+
+
+#function to start the column names again from the records still in use, the names of the other records are dropped.
+#The watch mode calls it before each scan since its process never ends.
+def resetColumns(recordList):
+    columnMapList = [(record, {fieldName: record[fieldName] for fieldName in record.columnFieldNames if fieldName in record}) for record in recordList]
+    columnNameList.clear()
+    columnIndexMap.clear()
+    for record, columnMap in columnMapList:
+        record.update(columnMap)
+
+
+#base of the records kept per file. The fields are slots instead of a dict per file but they are still read and written
+#as the keys of a map. A field that was never set is a missing key. Text fields listed in internedFieldSet are shared between the records,
+#the column lists listed in columnFieldNames are saved as indices of columnNameList.
+class Record(MutableMapping):
+    __slots__ = ()
+    fieldNames = ()
+    fieldNameSet = frozenset()
+    internedFieldSet = frozenset()
+    columnFieldNames = ()
+
+    def __init__(self, *args, **kwargs):
+        self.update(*args, **kwargs)
+
+    def __getitem__(self, key):
+        if key not in self.fieldNameSet:
+            raise KeyError(key)
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __setitem__(self, key, value):
+        if key not in self.fieldNameSet:
+            raise KeyError(key)
+        if key in self.internedFieldSet and type(value) is str:
+            value = sys.intern(value)
+        setattr(self, key, value)
+
+    def __delitem__(self, key):
+        if key not in self.fieldNameSet:
+            raise KeyError(key)
+        try:
+            delattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __iter__(self):
+        return (key for key in self.fieldNames if hasattr(self, key))
+
+    def __len__(self):
+        return sum(1 for key in self)
+
+    def __repr__(self):
+        return '{}({})'.format(type(self).__name__, dict(self))
+
+    #records are saved as maps so that the column indices do not depend on the run
+    def __reduce__(self):
+        return (type(self), (), dict(self))
+
+    def __setstate__(self, state):
+        self.update(state)
+
+
+#table associated with a csv file. The unmatched and lacking columns are expanded to text when they are read.
+class CsvTableInfo(Record):
+    __slots__ = ('tableName', 'numberOfColumns', 'suggestedTableName', 'suggestedTableNamePercentage', 'suggestedTableNumberOfColumns', '_unmatchedColumns', '_lackingColumns', 'error', 'encoding')
+    fieldNames = ('tableName', 'numberOfColumns', 'suggestedTableName', 'suggestedTableNamePercentage', 'suggestedTableNumberOfColumns', 'unmatchedColumns', 'lackingColumns', 'error', 'encoding')
+    fieldNameSet = frozenset(fieldNames)
+    internedFieldSet = frozenset(('tableName', 'suggestedTableName', 'error', 'encoding'))
+    columnFieldNames = ('unmatchedColumns', 'lackingColumns')
+
+    @property
+    def unmatchedColumns(self):
+        return expandColumns(self._unmatchedColumns)
+
+    @unmatchedColumns.setter
+    def unmatchedColumns(self, columnList):
+        self._unmatchedColumns = encodeColumns(columnList)
+
+    @unmatchedColumns.deleter
+    def unmatchedColumns(self):
+        del self._unmatchedColumns
+
+    @property
+    def lackingColumns(self):
+        return expandColumns(self._lackingColumns)
+
+    @lackingColumns.setter
+    def lackingColumns(self, columnList):
+        self._lackingColumns = encodeColumns(columnList)
+
+    @lackingColumns.deleter
+    def lackingColumns(self):
+        del self._lackingColumns
+
+
+#result of processing a csv file. The status is saved as a code, statuses that are not listed are kept as they are.
+class ProcessResult(Record):
+    __slots__ = ('mode', '_status', 'bytes', 'rows', 'seconds', 'newFilePath', 'violationMap', 'sampleRows', 'estimatedRows', 'estimatedBytes', 'estimatedSeconds', 'validationErrors', 'validation')
+    fieldNames = ('mode', 'status', 'bytes', 'rows', 'seconds', 'newFilePath', 'violationMap', 'sampleRows', 'estimatedRows', 'estimatedBytes', 'estimatedSeconds', 'validationErrors', 'validation')
+    fieldNameSet = frozenset(fieldNames)
+    internedFieldSet = frozenset(('validation',))
+
+    @property
+    def status(self):
+        status = self._status
+        return STATUS_LIST[status] if type(status) is int else status
+
+    @status.setter
+    def status(self, status):
+        self._status = statusCodeMap.get(status, status)
+
+    @status.deleter
+    def status(self):
+        del self._status
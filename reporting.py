@@ -1,158 +1,287 @@
-
-import pandas as pd
-import numpy as np
-import xlsxwriter
-
-def createReport(reportingMap, outputFile= "output.xlsx"):
-    originalTableList= reportingMap['originalTableList']
-    renamedTableList = reportingMap['renamedTableList']
-    restructuredTableList = reportingMap['restructuredTableList']
-    newTableList = reportingMap['newTableList']
-    deletedTableList = reportingMap['deletedTableList']
-
-    print("Writing report on ", outputFile)
-    workbook = xlsxwriter.Workbook(outputFile)
-    worksheetTableInfo = workbook.add_worksheet("Table Info")
-
-    header = workbook.add_format({'border' : 1,'bg_color' : '#5DB067', 'bold': True})
-    border = workbook.add_format({'border': 1})
-    evaluatedRow = workbook.add_format({'border' : 1,'bg_color' : '#FFFFCC'})
-    errorUnknownRow = workbook.add_format({'border' : 1, 'bg_color' : '#FFF2E5'})
-    correctedRow = workbook.add_format({'border' : 1,'bg_color' : '#E6FFFF'})
-    errorRow = workbook.add_format({'border' : 1, 'font_color' : 'red', 'bold': True})
-
-
-    worksheetTableInfo.set_column('A:A',5)
-    worksheetTableInfo.set_column('B:B',5)
-    worksheetTableInfo.set_column('C:C',40)
-    worksheetTableInfo.set_column('D:D',70)
-
-    worksheetTableInfo.write('B2','No.', header)
-    worksheetTableInfo.write('C2','Table name', header)
-    worksheetTableInfo.write('D2','Remarks', header)
-
-    row = 2
-    col= 1
-    counter = 1
-    
-    combineList= list(set(renamedTableList + restructuredTableList + newTableList + deletedTableList))
-    #print("combineList: ", combineList)
-
-    for tableName in combineList:
-        worksheetTableInfo.write_number(row, col, counter, border)
-        worksheetTableInfo.write_string(row, col + 1, tableName, border)
-        remarks= 'Table columns renamed.'
-        if tableName in renamedTableList and tableName in restructuredTableList:
-            remarks= 'Table columns were renamed and restructured.'
-        elif tableName in restructuredTableList:
-            remarks= 'Table has been restructured.'
-        elif tableName in newTableList:
-            remarks= 'New table has been detected.'
-        elif tableName in deletedTableList:
-            remarks= 'Deleted table'
-        worksheetTableInfo.write_string(row, col + 2, remarks, border)
-        row += 1
-        counter += 1
-
-    for tableName in originalTableList:
-        if tableName not in combineList:
-            worksheetTableInfo.write_number(row, col, counter, border)
-            worksheetTableInfo.write_string(row, col + 1, tableName, border)
-            worksheetTableInfo.write_string(row, col + 2, 'Unchanged', border)
-            row += 1
-            counter += 1
-
-    #Reporting per csv file listed
-    csvTableMapping = reportingMap['csvTableMapping']
-    processedFileResultMap = reportingMap['processedFileResultMap']
-
-    #update processedFileResultMap with the associated table of the csv file
-    for filePath in processedFileResultMap:
-        processedFileResultMap[filePath]['tableName'] = csvTableMapping[filePath]['tableName']
-        processedFileResultMap[filePath]['suggestedTableName'] = ''
-        if csvTableMapping[filePath]['suggestedTableNamePercentage'] > 0: 
-            processedFileResultMap[filePath]['suggestedTableName'] = '{0} ({1}%)'.format(csvTableMapping[filePath]['suggestedTableName'], csvTableMapping[filePath]['suggestedTableNamePercentage'])
-        processedFileResultMap[filePath]['unmatchedColumns'] = csvTableMapping[filePath]['unmatchedColumns']
-        if csvTableMapping[filePath]['suggestedTableNamePercentage'] == 100.0:
-            if not csvTableMapping[filePath]['lackingColumns']:
-                processedFileResultMap[filePath]['unmatchedColumns'] = 'Incorrect column ordering detected!'
-            else:
-                processedFileResultMap[filePath]['unmatchedColumns'] = 'Lacking columns: {}'.format(csvTableMapping[filePath]['lackingColumns'])
-        processedFileResultMap[filePath]['error'] = csvTableMapping[filePath]['error']
-    #print(f'processedFileResultMap: {processedFileResultMap}')
-
-    worksheetCsvFile = workbook.add_worksheet("Result")
-    worksheetCsvFile.set_column('A:A',5)
-    worksheetCsvFile.set_column('B:B',160)
-    worksheetCsvFile.set_column('C:C',50)
-    worksheetCsvFile.set_column('D:D',60)
-    worksheetCsvFile.set_column('E:E',100)
-    worksheetCsvFile.set_column('F:F',180)
-    worksheetCsvFile.set_column('G:G',100)
-    worksheetCsvFile.set_column('H:H',30)
-
-    worksheetCsvFile.write('A2','No.', header) 
-    worksheetCsvFile.write('B2','File', header)
-    worksheetCsvFile.write('C2','Table name', header)
-    worksheetCsvFile.write('D2','Suggested table model', header)
-    worksheetCsvFile.write('E2','Unmatched column names', header)
-    worksheetCsvFile.write('F2','New File Created', header)
-    worksheetCsvFile.write('G2','Remarks', header)
-    worksheetCsvFile.write('H2','CSV creation status', header)
-
-    row = 2
-    col= 0
-    counter = 1
-    
-    for itemName in processedFileResultMap:
-        itemMap = processedFileResultMap[itemName]
-        mode = itemMap.get('mode')
-        tableName = itemMap.get('tableName')
-        suggestedTableName = itemMap.get('suggestedTableName')
-        unmatchedColumns = itemMap.get('unmatchedColumns')
-        newFilePath= itemMap.get('newFilePath')
-        status= itemMap.get('status')
-        error= itemMap.get('error')
-        
-        #create remarks based on the mode
-        remarks= "---"
-        lineAttribute = border
-        if mode == 0:
-            if error:
-                remarks= error
-                lineAttribute = errorRow
-            else:
-                if not tableName:
-                    remarks= "Not evaluated. Unknown table structure."
-        elif mode == 1:
-            remarks= "Renamed table columns detected!"
-        elif mode == 2:
-            remarks= "Csv table has been restructed!"
-        elif mode == 3:
-            remarks= "Table columns renamed and restructured!"
-        elif mode == 4:
-            remarks= "Corrected table header"
-            lineAttribute = correctedRow
-        else:
-            lineAttribute = errorUnknownRow
-            remarks = "Error: Unknown!"
-
-        if not newFilePath:
-            newFilePath= '-'
-
-        if tableName in combineList:
-            lineAttribute = evaluatedRow
-
-        worksheetCsvFile.write_number(row, col, counter, lineAttribute)
-        worksheetCsvFile.write_string(row, col + 1, itemName, lineAttribute)
-        worksheetCsvFile.write_string(row, col + 2, tableName, lineAttribute)
-        worksheetCsvFile.write_string(row, col + 3, suggestedTableName, lineAttribute)
-        worksheetCsvFile.write_string(row, col + 4, unmatchedColumns, lineAttribute)
-        worksheetCsvFile.write_string(row, col + 5, newFilePath, lineAttribute)
-        worksheetCsvFile.write_string(row, col + 6, remarks, lineAttribute)
-        worksheetCsvFile.write_string(row, col + 7, status, lineAttribute)
-        row += 1
-        counter += 1
-
-    workbook.close()
-    print("Done writing report.")
\ No newline at end of file
+
+import csv, json
+
+from constants import *
+from validation import *
+
+def createReport(reportingMap, outputFile= "output.xlsx"):
+    originalTableList= reportingMap['originalTableList']
+    renamedTableList = reportingMap['renamedTableList']
+    restructuredTableList = reportingMap['restructuredTableList']
+    newTableList = reportingMap['newTableList']
+    deletedTableList = reportingMap['deletedTableList']
+
+    print("Writing report on ", outputFile)
+    #xlsxwriter is only loaded when the xlsx report is written
+    import xlsxwriter
+
+    #rows are flushed to disk as they are written so that memory does not grow with the number of files.
+    workbook = xlsxwriter.Workbook(outputFile, {'constant_memory': True})
+    worksheetTableInfo = workbook.add_worksheet("Table Info")
+
+    header = workbook.add_format({'border' : 1,'bg_color' : '#5DB067', 'bold': True})
+    border = workbook.add_format({'border': 1})
+    evaluatedRow = workbook.add_format({'border' : 1,'bg_color' : '#FFFFCC'})
+    errorUnknownRow = workbook.add_format({'border' : 1, 'bg_color' : '#FFF2E5'})
+    correctedRow = workbook.add_format({'border' : 1,'bg_color' : '#E6FFFF'})
+    errorRow = workbook.add_format({'border' : 1, 'font_color' : 'red', 'bold': True})
+
+
+    worksheetTableInfo.set_column('A:A',5)
+    worksheetTableInfo.set_column('B:B',5)
+    worksheetTableInfo.set_column('C:C',40)
+    worksheetTableInfo.set_column('D:D',70)
+
+    worksheetTableInfo.write('B2','No.', header)
+    worksheetTableInfo.write('C2','Table name', header)
+    worksheetTableInfo.write('D2','Remarks', header)
+
+    row = 2
+    col= 1
+    counter = 1
+    
+    combineList= list(set(renamedTableList + restructuredTableList + newTableList + deletedTableList))
+    combineSet = set(combineList)
+    renamedTableSet = set(renamedTableList)
+    restructuredTableSet = set(restructuredTableList)
+    newTableSet = set(newTableList)
+    deletedTableSet = set(deletedTableList)
+    #print("combineList: ", combineList)
+
+    for tableName in combineList:
+        worksheetTableInfo.write_number(row, col, counter, border)
+        worksheetTableInfo.write_string(row, col + 1, tableName, border)
+        remarks= 'Table columns renamed.'
+        if tableName in renamedTableSet and tableName in restructuredTableSet:
+            remarks= 'Table columns were renamed and restructured.'
+        elif tableName in restructuredTableSet:
+            remarks= 'Table has been restructured.'
+        elif tableName in newTableSet:
+            remarks= 'New table has been detected.'
+        elif tableName in deletedTableSet:
+            remarks= 'Deleted table'
+        worksheetTableInfo.write_string(row, col + 2, remarks, border)
+        row += 1
+        counter += 1
+
+    for tableName in originalTableList:
+        if tableName not in combineSet:
+            worksheetTableInfo.write_number(row, col, counter, border)
+            worksheetTableInfo.write_string(row, col + 1, tableName, border)
+            worksheetTableInfo.write_string(row, col + 2, 'Unchanged', border)
+            row += 1
+            counter += 1
+
+    #Reporting per csv file listed
+    csvTableMapping = reportingMap['csvTableMapping']
+    processedFileResultMap = reportingMap['processedFileResultMap']
+
+    worksheetCsvFile = workbook.add_worksheet("Result")
+    worksheetCsvFile.set_column('A:A',5)
+    worksheetCsvFile.set_column('B:B',160)
+    worksheetCsvFile.set_column('C:C',50)
+    worksheetCsvFile.set_column('D:D',60)
+    worksheetCsvFile.set_column('E:E',100)
+    worksheetCsvFile.set_column('F:F',180)
+    worksheetCsvFile.set_column('G:G',100)
+    worksheetCsvFile.set_column('H:H',30)
+
+    worksheetCsvFile.write('A2','No.', header) 
+    worksheetCsvFile.write('B2','File', header)
+    worksheetCsvFile.write('C2','Table name', header)
+    worksheetCsvFile.write('D2','Suggested table model', header)
+    worksheetCsvFile.write('E2','Unmatched column names', header)
+    worksheetCsvFile.write('F2','New File Created', header)
+    worksheetCsvFile.write('G2','Remarks', header)
+    worksheetCsvFile.write('H2','CSV creation status', header)
+
+    row = 2
+    col= 0
+    counter = 1
+    
+    #the associated table of the csv file is combined with its result while writing, in a single pass.
+    for itemName in processedFileResultMap:
+        itemMap = getFileReportMap(csvTableMapping[itemName], processedFileResultMap[itemName])
+        mode = itemMap['mode']
+        error = itemMap['error']
+        
+        lineAttribute = border
+        if mode == 0:
+            if error:
+                lineAttribute = errorRow
+        elif mode == 4:
+            lineAttribute = correctedRow
+        elif mode not in (1, 2, 3):
+            lineAttribute = errorUnknownRow
+
+        if itemMap['tableName'] in combineSet:
+            lineAttribute = evaluatedRow
+
+        worksheetCsvFile.write_number(row, col, counter, lineAttribute)
+        worksheetCsvFile.write_string(row, col + 1, itemName, lineAttribute)
+        worksheetCsvFile.write_string(row, col + 2, itemMap['tableName'], lineAttribute)
+        worksheetCsvFile.write_string(row, col + 3, itemMap['suggestedTableName'], lineAttribute)
+        worksheetCsvFile.write_string(row, col + 4, itemMap['unmatchedColumns'], lineAttribute)
+        worksheetCsvFile.write_string(row, col + 5, itemMap['newFilePath'], lineAttribute)
+        worksheetCsvFile.write_string(row, col + 6, itemMap['remarks'], lineAttribute)
+        worksheetCsvFile.write_string(row, col + 7, itemMap['status'], lineAttribute)
+        row += 1
+        counter += 1
+
+    #projected cost of the files sampled by a dry run
+    projectionFileList = [filePath for filePath in processedFileResultMap if 'estimatedRows' in processedFileResultMap[filePath]]
+    if projectionFileList:
+        worksheetProjection = workbook.add_worksheet("Projection")
+        worksheetProjection.set_column('A:A',5)
+        worksheetProjection.set_column('B:B',160)
+        worksheetProjection.set_column('C:C',50)
+        worksheetProjection.set_column('D:H',20)
+        worksheetProjection.set_column('I:I',120)
+
+        for col, columnName in enumerate(PROJECTION_REPORT_COLUMNS):
+            worksheetProjection.write_string(0, col, columnName, header)
+
+        row = 1
+        for filePath in projectionFileList:
+            processResult = processedFileResultMap[filePath]
+            lineAttribute = errorRow if processResult['validationErrors'] else border
+            worksheetProjection.write_number(row, 0, row, lineAttribute)
+            worksheetProjection.write_string(row, 1, filePath, lineAttribute)
+            worksheetProjection.write_string(row, 2, csvTableMapping[filePath]['tableName'], lineAttribute)
+            worksheetProjection.write_number(row, 3, processResult['mode'], lineAttribute)
+            worksheetProjection.write_number(row, 4, processResult['sampleRows'], lineAttribute)
+            worksheetProjection.write_number(row, 5, processResult['estimatedRows'], lineAttribute)
+            worksheetProjection.write_number(row, 6, processResult['estimatedBytes'], lineAttribute)
+            worksheetProjection.write_number(row, 7, round(processResult['estimatedSeconds'], 3), lineAttribute)
+            worksheetProjection.write_string(row, 8, processResult['validation'], lineAttribute)
+            row += 1
+
+        worksheetProjection.write_string(row, 1, 'Total', header)
+        worksheetProjection.write_number(row, 5, sum(processedFileResultMap[filePath]['estimatedRows'] for filePath in projectionFileList), header)
+        worksheetProjection.write_number(row, 6, sum(processedFileResultMap[filePath]['estimatedBytes'] for filePath in projectionFileList), header)
+        worksheetProjection.write_number(row, 7, round(sum(processedFileResultMap[filePath]['estimatedSeconds'] for filePath in projectionFileList), 3), header)
+
+    #violations found while validating the rewritten rows
+    validatedFileList = [filePath for filePath in processedFileResultMap if 'violationMap' in processedFileResultMap[filePath]]
+    if validatedFileList:
+        worksheetValidation = workbook.add_worksheet("Validation")
+        worksheetValidation.set_column('A:A',5)
+        worksheetValidation.set_column('B:B',160)
+        worksheetValidation.set_column('C:C',50)
+        worksheetValidation.set_column('D:H',15)
+        worksheetValidation.set_column('I:I',160)
+
+        for col, columnName in enumerate(VALIDATION_REPORT_COLUMNS):
+            worksheetValidation.write_string(0, col, columnName, header)
+
+        for row, filePath in enumerate(validatedFileList, 1):
+            violationMap = processedFileResultMap[filePath]['violationMap']
+            lineAttribute = errorRow if violationMap['samples'] else border
+            worksheetValidation.write_number(row, 0, row, lineAttribute)
+            worksheetValidation.write_string(row, 1, filePath, lineAttribute)
+            worksheetValidation.write_string(row, 2, csvTableMapping[filePath]['tableName'], lineAttribute)
+            worksheetValidation.write_number(row, 3, violationMap['rows'], lineAttribute)
+            for col, violationName in enumerate(('Column count', 'NOT NULL', 'Type', 'Length'), 4):
+                worksheetValidation.write_number(row, col, violationMap['counts'][violationName], lineAttribute)
+            worksheetValidation.write_string(row, 8, getViolationSummary(violationMap), lineAttribute)
+
+    #timings and counters of the run
+    summaryRowList = reportingMap.get('summaryRowList')
+    if summaryRowList:
+        worksheetSummary = workbook.add_worksheet("Summary")
+        worksheetSummary.set_column('A:A',60)
+        worksheetSummary.set_column('B:B',20)
+        worksheetSummary.write_string(0, 0, 'Metric', header)
+        worksheetSummary.write_string(0, 1, 'Value', header)
+        for row, (metricName, value) in enumerate(summaryRowList, 1):
+            worksheetSummary.write_string(row, 0, metricName, border)
+            worksheetSummary.write_number(row, 1, value, border)
+
+    workbook.close()
+    print("Done writing report.")
+
+
+#returns the values reported for a csv file based on its associated table and its processing result
+def getFileReportMap(csvTableInfo, processResult):
+    mode = processResult.get('mode')
+    tableName = csvTableInfo['tableName']
+    error = csvTableInfo['error']
+
+    suggestedTableName = ''
+    if csvTableInfo['suggestedTableNamePercentage'] > 0: 
+        suggestedTableName = '{0} ({1}%)'.format(csvTableInfo['suggestedTableName'], csvTableInfo['suggestedTableNamePercentage'])
+
+    unmatchedColumns = csvTableInfo['unmatchedColumns']
+    if csvTableInfo['suggestedTableNamePercentage'] == 100.0:
+        if not csvTableInfo['lackingColumns']:
+            unmatchedColumns = 'Incorrect column ordering detected!'
+        else:
+            unmatchedColumns = 'Lacking columns: {}'.format(csvTableInfo['lackingColumns'])
+
+    #create remarks based on the mode
+    remarks= "---"
+    if mode == 0:
+        if error:
+            remarks= error
+        else:
+            if not tableName:
+                remarks= "Not evaluated. Unknown table structure."
+    elif mode == 1:
+        remarks= "Renamed table columns detected!"
+    elif mode == 2:
+        remarks= "Csv table has been restructed!"
+    elif mode == 3:
+        remarks= "Table columns renamed and restructured!"
+    elif mode == 4:
+        remarks= "Corrected table header"
+    else:
+        remarks = "Error: Unknown!"
+
+    newFilePath= processResult.get('newFilePath')
+    if not newFilePath:
+        newFilePath= '-'
+
+    fileReportMap = {}
+    fileReportMap['mode'] = mode
+    fileReportMap['tableName'] = tableName
+    fileReportMap['suggestedTableName'] = suggestedTableName
+    fileReportMap['unmatchedColumns'] = unmatchedColumns
+    fileReportMap['newFilePath'] = newFilePath
+    fileReportMap['remarks'] = remarks
+    fileReportMap['status'] = processResult.get('status')
+    fileReportMap['error'] = error
+    return fileReportMap
+
+
+#opens a report where the result of each csv file is written as soon as the file has been processed. Supported formats are csv and jsonl.
+def openFileReport(outputFile, reportFormat):
+    fileReportStreamMap = {}
+    fileReportStreamMap['format'] = reportFormat
+    fileReportStreamMap['counter'] = 0
+    fileReportStreamMap['fp'] = open(outputFile, 'w', encoding='utf-8', newline='')
+    if reportFormat == 'csv':
+        fileReportStreamMap['writer'] = csv.writer(fileReportStreamMap['fp'])
+        fileReportStreamMap['writer'].writerow(FILE_REPORT_COLUMNS)
+    print("Writing file results on ", outputFile)
+    return fileReportStreamMap
+
+
+#function to write the result of a csv file
+def writeFileReport(fileReportStreamMap, filePath, csvTableInfo, processResult):
+    itemMap = getFileReportMap(csvTableInfo, processResult)
+    fileReportStreamMap['counter'] += 1
+    valueList = [fileReportStreamMap['counter'], filePath, itemMap['tableName'], itemMap['suggestedTableName'], itemMap['unmatchedColumns'], itemMap['newFilePath'], itemMap['remarks'], itemMap['status']]
+    if fileReportStreamMap['format'] == 'csv':
+        fileReportStreamMap['writer'].writerow(valueList)
+    else:
+        fileReportStreamMap['fp'].write(json.dumps(dict(zip(FILE_REPORT_COLUMNS, valueList)), ensure_ascii=False) + NEWLINE)
+
+
+#function to write the buffered results of a report on disk
+def flushFileReport(fileReportStreamMap):
+    fileReportStreamMap['fp'].flush()
+
+
+#function to close a report opened with openFileReport
+def closeFileReport(fileReportStreamMap):
+    fileReportStreamMap['fp'].close()
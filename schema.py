@@ -0,0 +1,135 @@
+import re
+
+from constants import *
+
+#tokens of the schema statements. Quoted names and values, dollar-quoted bodies and comments are single tokens
+#so that the parentheses and semicolons inside them are not taken as the structure of the statement.
+quotedPattern = r"(?:'[^']*')+|(?:\"[^\"]*\")+"
+dollarPattern = r'\$(?P<tag>\w*)\$[\s\S]*?\$(?P=tag)\$'
+commentPattern = r'--[^\n]*|/\*[\s\S]*?\*/'
+plainTextPattern = r'[^-/\'"$(),;]+|-(?!-)|/(?!\*)|\$(?!\w*\$)'
+statementTokenPattern = re.compile(r'(?P<text>(?:{0}|,)+)|(?P<quoted>{1})|(?P<dollar>{2})|(?P<comment>{3})|(?P<open>\()|(?P<close>\))|(?P<end>;)|(?P<other>[\s\S])'.format(plainTextPattern, quotedPattern, dollarPattern, commentPattern))
+#tokens of a table definition, parentheses without nested ones are part of the text
+definitionTokenPattern = re.compile(r'(?P<text>(?:{0}|{1}|\([^()\'";]*\))+)|(?P<dollar>{2})|(?P<comment>{3})|(?P<open>\()|(?P<close>\))|(?P<comma>,)|(?P<end>;)|(?P<other>[\s\S])'.format(plainTextPattern, quotedPattern, dollarPattern, commentPattern))
+#table definition up to its closing parenthesis without quotes, comments or nested parentheses, the way most tables are written.
+#Its column definitions are then found at once.
+simpleTableBodyPattern = re.compile(r'([^-/\'"$();]*(?:(?:-(?!-)|/(?!\*)|\([^-/\'"$();]*\))[^-/\'"$();]*)*)\)')
+simpleDefinitionPattern = re.compile(r'(?:[^,(]+|\([^)]*\))+')
+#start of the constraints following the data type of a column definition
+columnConstraintPattern = re.compile(r'\s(?:NOT\s+NULL|NULL|DEFAULT|PRIMARY\s+KEY|REFERENCES|CHECK|UNIQUE|CONSTRAINT|COLLATE|GENERATED)\b', re.IGNORECASE)
+
+
+#returns the compiled (exclude, NOT NULL, DEFAULT, PRIMARY KEY) column patterns of the parser settings
+def getColumnRegexList(settingMap):
+    return [re.compile(settingMap[settingName], re.IGNORECASE) for settingName in ('FIELD_NAME_EXCLUDE', 'NOT_NULL', 'DEFAULT', 'PRIMARY_KEY')]
+
+
+#returns the field of a column definition split on white spaces, or None when the definition is empty or excluded.
+#The data type is the whole text between the name and the constraints, e.g. character varying(20).
+def getFieldMap(itemList, columnRegexList):
+    if not itemList:
+        return None
+    regexFieldNameExclude, regexNotNull, regexDefault, regexPrimarykey = columnRegexList
+    definition = ' '.join(itemList)
+    if regexFieldNameExclude.search(definition):
+        return None
+
+    fieldMap = {}
+    fieldMap['fieldName'] = itemList[0]
+    typeText = definition[len(itemList[0]):]
+    constraintStart = columnConstraintPattern.search(typeText)
+    fieldMap['dataType'] = (typeText[:constraintStart.start()] if constraintStart else typeText).strip()
+    fieldMap['isNotNull'] = False
+    if regexNotNull.search(definition):
+        fieldMap['isNotNull'] = True
+    if regexDefault.search(definition):
+        fieldMap['default'] = itemList[3] if len(itemList) > 3 else ''
+    if regexPrimarykey.search(definition):
+        fieldMap['isPrimaryKey'] = True
+    return fieldMap
+
+
+#returns the (tableMap, tableColumnMap) of a schema. The text is read in a single pass, statement by statement, and the column
+#definitions are split on the commas outside of parentheses so that a definition written over several lines is a single column.
+#settingMap holds the patterns of the parser settings of config.ini. They are searched on each statement starting a table
+#and on each column definition, with the white spaces of the definition replaced by single spaces.
+def parseSchemaText(schemaText, settingMap):
+    regexTableStart = re.compile(settingMap['TABLE_START'], re.IGNORECASE)
+    regexTableName = re.compile(settingMap['TABLE_NAME_SEARCH_PATTERN'], re.IGNORECASE)
+    columnRegexList = getColumnRegexList(settingMap)
+
+    tableMap = {}
+    tableColumnMap = {}
+    #text of the current statement up to its first parenthesis
+    headerList = []
+    isHeader = True
+    pos = 0
+    textLength = len(schemaText)
+    while pos < textLength:
+        token = statementTokenPattern.match(schemaText, pos)
+        pos = token.end()
+        tokenType = token.lastgroup
+        if tokenType == 'end':
+            headerList = []
+            isHeader = True
+        elif tokenType == 'open':
+            if not isHeader:
+                continue
+            isHeader = False
+            header = ' '.join(''.join(headerList).split()) + ' ('
+            tableName = regexTableStart.search(header) and regexTableName.search(header)
+            if not tableName:
+                continue
+
+            #This is for collecting the table names
+            tableName = tableName.group()
+            columnList = tableMap[tableName] = []
+            columnNameList = tableColumnMap[tableName] = []
+            simpleTableBody = simpleTableBodyPattern.match(schemaText, pos)
+            if simpleTableBody:
+                pos = simpleTableBody.end()
+                for definition in simpleDefinitionPattern.findall(simpleTableBody.group(1)):
+                    fieldMap = getFieldMap(definition.split(), columnRegexList)
+                    if fieldMap:
+                        columnList.append(fieldMap)
+                        columnNameList.append(fieldMap['fieldName'])
+                continue
+
+            pieceList = []
+            nesting = 0
+            while pos < textLength:
+                token = definitionTokenPattern.match(schemaText, pos)
+                pos = token.end()
+                tokenType = token.lastgroup
+                if tokenType == 'open':
+                    nesting += 1
+                elif tokenType == 'close' and nesting:
+                    nesting -= 1
+                elif tokenType in ('close', 'end') or tokenType == 'comma' and not nesting:
+                    #end of a column definition
+                    fieldMap = getFieldMap(''.join(pieceList).split(), columnRegexList)
+                    if fieldMap:
+                        columnList.append(fieldMap)
+                        columnNameList.append(fieldMap['fieldName'])
+                    pieceList = []
+                    if tokenType == 'comma':
+                        continue
+                    break
+                pieceList.append(' ' if tokenType == 'comment' else token.group())
+
+            #the rest of the statement is skipped
+            if tokenType == 'end':
+                headerList = []
+                isHeader = True
+        elif tokenType == 'comment':
+            if isHeader:
+                headerList.append(' ')
+        elif isHeader:
+            headerList.append(token.group())
+    return tableMap, tableColumnMap
+
+
+#returns the (tableMap, tableColumnMap) of a schema file
+def parseSchemaFile(schemaPath, settingMap):
+    with open(schemaPath, 'rt', encoding='utf-8') as fp:
+        return parseSchemaText(fp.read(), settingMap)
@@ -0,0 +1,112 @@
+import heapq, json, os, re, tempfile
+
+from constants import *
+from records import *
+
+shardPattern = re.compile(r'^\s*(\d+)\s*/\s*(\d+)\s*$')
+
+
+#returns the (shardIndex, shardCount) of a shard given as i/N, the shards being numbered from 1 to N
+def parseShard(shard):
+    hasShard = shardPattern.match(shard)
+    if not hasShard or not 1 <= int(hasShard.group(1)) <= int(hasShard.group(2)):
+        raise ValueError('Invalid shard {}, expected i/N with i from 1 to N!'.format(shard))
+    return int(hasShard.group(1)), int(hasShard.group(2))
+
+
+#returns the shard of each file, numbered from 1. Files are assigned from the largest to the smallest, each one to the shard
+#having the least bytes so far. Each file also weighs SHARD_FILE_COST bytes for the time spent opening and identifying it.
+#Ties are broken on the file key and the shard number so that every node computes the same assignment.
+def assignShards(fileSizeMap, shardCount):
+    shardHeap = [(0, shardIndex) for shardIndex in range(1, shardCount + 1)]
+    fileShardMap = {}
+    for fileKey in sorted(fileSizeMap, key=lambda fileKey: (-fileSizeMap[fileKey], fileKey)):
+        shardBytes, shardIndex = heapq.heappop(shardHeap)
+        fileShardMap[fileKey] = shardIndex
+        heapq.heappush(shardHeap, (shardBytes + fileSizeMap[fileKey] + SHARD_FILE_COST, shardIndex))
+    return fileShardMap
+
+
+#function to write a json file. The file is replaced only once it has been completely written.
+def writeJsonFile(filePath, dataMap):
+    folderPath = os.path.dirname(filePath) or '.'
+    os.makedirs(folderPath, exist_ok=True)
+    fd, tempFilePath = tempfile.mkstemp(suffix='.tmp', dir=folderPath)
+    try:
+        with open(fd, 'w', encoding='utf-8') as fp:
+            json.dump(dataMap, fp, ensure_ascii=False)
+        os.replace(tempFilePath, filePath)
+    except:
+        if os.path.exists(tempFilePath):
+            os.remove(tempFilePath)
+        raise
+
+
+#returns the shard plan saved by the first node, or None when there is none for this number of shards
+def loadShardPlan(shardPlanFile, shardCount):
+    try:
+        with open(shardPlanFile, 'r', encoding='utf-8') as fp:
+            shardPlanMap = json.load(fp)
+    except (OSError, ValueError):
+        return None
+    if shardPlanMap.get('version') != SHARD_VERSION or shardPlanMap.get('shardCount') != shardCount:
+        return None
+    return shardPlanMap['files']
+
+
+#function to save the shard of each file so that the other nodes use the same assignment
+def saveShardPlan(shardPlanFile, shardCount, fileShardMap):
+    writeJsonFile(shardPlanFile, {'version': SHARD_VERSION, 'shardCount': shardCount, 'files': fileShardMap})
+
+
+#returns the partial results of the shards, checking that all the shards of the same run are there exactly once
+def loadShardResults(shardResultFileList):
+    shardResultMapList = []
+    for shardResultFile in shardResultFileList:
+        with open(shardResultFile, 'r', encoding='utf-8') as fp:
+            shardResultMap = json.load(fp)
+        if shardResultMap.get('version') != SHARD_VERSION:
+            raise ValueError('{} is not a shard result file of this version!'.format(shardResultFile))
+        shardResultMapList.append(shardResultMap)
+    if not shardResultMapList:
+        raise ValueError('No shard result file to merge!')
+
+    shardCount = shardResultMapList[0]['shardCount']
+    shardIndexList = sorted(shardResultMap['shardIndex'] for shardResultMap in shardResultMapList)
+    if any(shardResultMap['shardCount'] != shardCount for shardResultMap in shardResultMapList) or len(set(shardIndexList)) != len(shardIndexList):
+        raise ValueError('The shard result files are not from the same run!')
+    missingShardList = ['{}/{}'.format(shardIndex, shardCount) for shardIndex in range(1, shardCount + 1) if shardIndex not in shardIndexList]
+    if missingShardList:
+        raise ValueError('Missing shard result(s): {}'.format(', '.join(missingShardList)))
+    if any(shardResultMap['tables'] != shardResultMapList[0]['tables'] for shardResultMap in shardResultMapList):
+        raise ValueError('The shards were run with different schemas!')
+    return shardResultMapList
+
+
+#function to save the partial results of a shard. The files are saved with their position in the listing of the whole tree.
+def saveShardResult(shardResultFile, shardIndex, shardCount, reportingMap, filePositionMap, summaryMap):
+    shardResultMap = {}
+    shardResultMap['version'] = SHARD_VERSION
+    shardResultMap['shardIndex'] = shardIndex
+    shardResultMap['shardCount'] = shardCount
+    shardResultMap['tables'] = {tableListName: list(reportingMap[tableListName]) for tableListName in SHARD_TABLE_LIST_NAMES}
+    shardResultMap['files'] = [[filePositionMap[filePath], filePath] for filePath in reportingMap['csvTableMapping']]
+    shardResultMap['csvTableMapping'] = {filePath: dict(csvTableInfo) for filePath, csvTableInfo in reportingMap['csvTableMapping'].items()}
+    shardResultMap['processedFileResultMap'] = {filePath: dict(processResult) for filePath, processResult in reportingMap['processedFileResultMap'].items()}
+    shardResultMap['summary'] = summaryMap
+    writeJsonFile(shardResultFile, shardResultMap)
+    print("Shard result written on ", shardResultFile)
+
+
+#returns the report data of the whole run from the partial results of the shards. Files are in the order of the listing of the whole tree.
+def mergeShardResults(shardResultMapList):
+    reportingMap = dict(shardResultMapList[0]['tables'])
+    fileList = sorted((position, shardResultMap['shardIndex'], filePath) for shardResultMap in shardResultMapList for position, filePath in shardResultMap['files'])
+    shardResultByIndexMap = {shardResultMap['shardIndex']: shardResultMap for shardResultMap in shardResultMapList}
+
+    reportingMap['csvTableMapping'] = {}
+    reportingMap['processedFileResultMap'] = {}
+    for position, shardIndex, filePath in fileList:
+        reportingMap['csvTableMapping'][filePath] = CsvTableInfo(shardResultByIndexMap[shardIndex]['csvTableMapping'][filePath])
+        reportingMap['processedFileResultMap'][filePath] = ProcessResult(shardResultByIndexMap[shardIndex]['processedFileResultMap'][filePath])
+    return reportingMap
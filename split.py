@@ -0,0 +1,53 @@
+import io, math
+
+from constants import *
+
+
+#returns the newline-aligned byte ranges (start, end) of a file from start up to end. Each range holds about rangeSize bytes
+#and is extended up to the end of the line it cuts, so that every line belongs to exactly one range.
+def getByteRanges(fp, start, end, rangeSize):
+    byteRangeList = []
+    while start < end:
+        rangeEnd = start + rangeSize
+        if rangeEnd < end:
+            #the byte before the end is read again so that a range already ending with a new line is kept as it is
+            fp.seek(rangeEnd - 1)
+            fp.readline()
+            rangeEnd = min(fp.tell(), end)
+        else:
+            rangeEnd = end
+        byteRangeList.append((start, rangeEnd))
+        start = rangeEnd
+    return byteRangeList
+
+
+#returns the size of the ranges a file is split into. There are a few ranges per worker so that a slow range
+#does not keep the other workers waiting, but no range is smaller than SPLIT_MIN_RANGE_BYTES.
+def getRangeSize(dataBytes, workers):
+    return max(SPLIT_MIN_RANGE_BYTES, math.ceil(dataBytes / (workers * SPLIT_RANGES_PER_WORKER)))
+
+
+#raw reader of the bytes of a file between two offsets, read as if they were the whole file
+class FileRangeReader(io.RawIOBase):
+    def __init__(self, filePath, start, end):
+        self.fp = open(filePath, 'rb', buffering=0)
+        self.fp.seek(start)
+        self.remaining = end - start
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = self.fp.readinto(memoryview(buffer)[:min(len(buffer), self.remaining)]) if self.remaining > 0 else 0
+        self.remaining -= size
+        return size
+
+    def close(self):
+        self.fp.close()
+        super().close()
+
+
+#function to open a byte range of a file. The range is read in text mode when an encoding is given, the same way the whole file is.
+def openFileRange(filePath, byteRange, encoding=None, errors=None):
+    fp = io.BufferedReader(FileRangeReader(filePath, *byteRange), buffer_size=WRITE_BUFFER_SIZE)
+    return fp if encoding is None else io.TextIOWrapper(fp, encoding=encoding, errors=errors)
@@ -0,0 +1,47 @@
+--
+-- PostgreSQL database dump
+--
+
+SET statement_timeout = 0;
+SET client_encoding = 'UTF8';
+SELECT pg_catalog.set_config('search_path', '', false);
+
+--
+-- Name: order_tbl; Type: TABLE; Schema: public; Owner: app
+--
+
+CREATE TABLE public.order_tbl (
+    order_id integer NOT NULL,
+    user_id integer,
+    price numeric(10,2) DEFAULT 0 NOT NULL,
+    status character varying(3) DEFAULT 'N' NOT NULL,
+    created_at timestamp without time zone
+);
+
+
+ALTER TABLE public.order_tbl OWNER TO app;
+
+CREATE SEQUENCE public.order_tbl_order_id_seq
+    AS integer
+    START WITH 1
+    INCREMENT BY 1
+    NO MINVALUE
+    NO MAXVALUE
+    CACHE 1;
+
+--
+-- Name: user_tbl; Type: TABLE; Schema: public; Owner: app
+--
+
+CREATE TABLE public.user_tbl (
+    user_id integer NOT NULL,
+    user_name text,
+    rate numeric(5,3),
+    CONSTRAINT user_pk PRIMARY KEY (user_id)
+);
+
+
+ALTER TABLE ONLY public.order_tbl
+    ADD CONSTRAINT order_pk PRIMARY KEY (order_id);
+
+CREATE INDEX order_tbl_user_idx ON public.order_tbl USING btree (user_id);
@@ -0,0 +1,84 @@
+import re
+
+#the former line by line parser of main.py, kept to check the schema tokenizer of schema.py against it.
+#It reads the same config.ini settings from settingMap. A column written over several lines is not supported.
+def parseSchemaByLine(schemaText, settingMap):
+    tableStartIndicator = settingMap['TABLE_START']
+    tableEndIndicator = settingMap['TABLE_END']
+    tableNameSearchPattern = settingMap['TABLE_NAME_SEARCH_PATTERN']
+    fieldNameExclude = settingMap['FIELD_NAME_EXCLUDE']
+    notNull = settingMap['NOT_NULL']
+    default = settingMap['DEFAULT']
+    primaryKey = settingMap['PRIMARY_KEY']
+
+    regexTableStart= re.compile(tableStartIndicator, re.IGNORECASE)
+    regexTableName= re.compile(tableNameSearchPattern, re.IGNORECASE)
+    regexFieldNameExclude = re.compile(fieldNameExclude, re.IGNORECASE)
+    regexNotNull = re.compile(notNull, re.IGNORECASE)
+    regexDefault = re.compile(default, re.IGNORECASE)
+    regexPrimarykey = re.compile(primaryKey, re.IGNORECASE)
+    
+    tableMap = {}
+    tableColumnMap = {}
+    tableName = ''
+    isNewTable= False
+
+    for line in schemaText.splitlines():
+        line = line.strip()
+        #print(f'line: {line}') 
+        
+        #make sure line is not empty
+        if not line or line == '(':
+            continue
+        
+        hasTable = regexTableStart.search(line)
+        if hasTable:
+            #This is for collecting the table names
+            tableName = regexTableName.search(line)
+            if tableName:
+                isNewTable= True
+                tableName = tableName.group()
+                tableMap[tableName] = []
+                tableColumnMap[tableName] = []
+                #print(f'tableName: {tableName}')
+                continue
+
+        #Check first if the table structure has been terminated/closed.
+        if tableEndIndicator in line:
+            isNewTable= False
+            
+        #Next is we need to collect the table fields
+        fieldNameExcluded =  regexFieldNameExclude.search(line)
+        if isNewTable and not fieldNameExcluded:
+            columnList = tableMap[tableName]
+            line = line.replace(',','')
+            item = []
+            for ele in re.split(r'\s', line):
+                if ele.strip():
+                    item.append(ele)
+            
+            columnName = item[0]
+            dataType = item[1]
+
+            fieldMap= {}
+            fieldMap['fieldName'] = columnName
+            fieldMap['dataType'] = dataType
+            fieldMap['isNotNull'] = False
+            #fieldMap['isPrimaryKey'] = False
+            
+            tableColumnMap[tableName].append(columnName)
+            
+            isNotNull = regexNotNull.search(line)
+            if isNotNull:
+                fieldMap['isNotNull'] = True
+
+            hasDefault = regexDefault.search(line)
+            if hasDefault:
+                fieldMap['default'] = item[3]
+
+            hasPrimaryKey = regexPrimarykey.search(line)
+            if hasPrimaryKey:
+                fieldMap['isPrimaryKey'] = True
+
+            columnList.append(fieldMap)
+    return tableMap, tableColumnMap
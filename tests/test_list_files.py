@@ -0,0 +1,16 @@
+import os
+
+from main import listFiles
+
+
+#FILES_TO_FIND is a regular expression searched in the file names, without the compression suffix
+def test_listFiles_fileNamePattern(tmp_path):
+    os.mkdir(tmp_path / 'sub')
+    for name in ['a.csv', 'b.CSV', 'c.csv.gz', 'd.tsv', 'e.txt', 'f.csv.bak', os.path.join('sub', 'g.tsv.bz2')]:
+        (tmp_path / name).write_bytes(b'')
+
+    fileList = [os.path.relpath(filePath, tmp_path) for filePath in listFiles(str(tmp_path), '.', r'\.(csv|tsv)$')]
+    assert sorted(fileList) == ['a.csv', 'b.CSV', 'c.csv.gz', 'd.tsv', os.path.join('sub', 'g.tsv.bz2')]
+
+    fileList = [os.path.relpath(filePath, tmp_path) for filePath in listFiles(str(tmp_path), r'\w\.csv', r'\.csv')]
+    assert sorted(fileList) == ['a.csv', 'b.CSV', 'c.csv.gz', 'f.csv.bak']
@@ -0,0 +1,13 @@
+import pytest
+
+from main import config, getManifestSettings
+
+
+#the files are evaluated again when a setting changing the rewritten files changes
+@pytest.mark.parametrize('settingName, valueList', [('ENGINE', ['python', 'pandas']), ('HEADER_FAST_PATH', ['Y', 'N']), ('VALIDATE', ['Y', 'N'])])
+def test_getManifestSettings_outputSettings(monkeypatch, settingName, valueList):
+    settingMapList = []
+    for value in valueList:
+        monkeypatch.setitem(config['OTHERS'], settingName, value)
+        settingMapList.append(getManifestSettings())
+    assert settingMapList[0] != settingMapList[1]
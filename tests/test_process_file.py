@@ -0,0 +1,102 @@
+import pytest
+
+from main import getProcessData, initWorker, process, processFile
+from validation import compileColumnCheckList
+
+updatedTableColumnMap = {'order_tbl': ['id', 'code', 'qty']}
+fieldList = [{'fieldName': 'id', 'dataType': 'integer', 'isNotNull': True}, {'fieldName': 'code', 'dataType': 'varchar(3)', 'isNotNull': False}, {'fieldName': 'qty', 'dataType': 'integer', 'isNotNull': False}]
+
+
+#returns the result of processing a file with renamed columns (mode 1), the rows being validated
+def processRenamedFile(filePath, isTestMode='N', headerFastPath='N', dryRunSampleRows=0, isValidated=True):
+    validationPlanMap = {('order_tbl', False): compileColumnCheckList(updatedTableColumnMap['order_tbl'], fieldList)} if isValidated else None
+    initWorker(getProcessData(updatedTableColumnMap, [], {}, {}, '_new', isTestMode, headerFastPath=headerFastPath, dryRunSampleRows=dryRunSampleRows, validationPlanMap=validationPlanMap))
+    return processFile(str(filePath), 1, 'order_tbl')
+
+
+def test_processFile_sampleValidated(tmp_path):
+    filePath = tmp_path / 'order.csv'
+    filePath.write_bytes(b'id,ref,qty\n' + b''.join(b'%d,a,x\n' % i for i in range(20)) + b'20,b\n')
+    resultMap = processRenamedFile(filePath, isTestMode='Y', dryRunSampleRows=10)
+    assert resultMap['sampleRows'] == 10
+    assert resultMap['violationMap']['rows'] == 10
+    assert resultMap['violationMap']['counts']['Type'] == 10
+    assert resultMap['violationMap']['samples']['Type qty'] == [2, 3, 4, 5, 6]
+
+    #the lines with another number of values are counted apart, the line numbers of the lines after them are kept
+    resultMap = processRenamedFile(filePath, isTestMode='Y', dryRunSampleRows=30)
+    assert resultMap['violationMap']['rows'] == 21
+    assert resultMap['violationMap']['counts'] == {'Column count': 1, 'NOT NULL': 0, 'Type': 20, 'Length': 0}
+    assert resultMap['violationMap']['samples']['Column count'] == [22]
+
+    filePath.write_bytes(b'id,ref,qty\n1,a,x\n2,b\n3,c,x\n4,d,x\n')
+    resultMap = processRenamedFile(filePath, isTestMode='Y', dryRunSampleRows=10)
+    assert resultMap['violationMap']['samples'] == {'Column count': [3], 'Type qty': [2, 4, 5]}
+
+
+#the sampled lines end with \n, \r\n or \r the same way as the lines of a real run
+def test_processFile_sampleLineEnds(tmp_path):
+    resultList = []
+    for lineEnd in [b'\n', b'\r\n', b'\r']:
+        filePath = tmp_path / 'order.csv'
+        filePath.write_bytes(lineEnd.join([b'id,ref,qty'] + [b'%d,a,x' % i for i in range(20)] + [b'20,b', b'']))
+        resultMap = processRenamedFile(filePath, isTestMode='Y', dryRunSampleRows=10)
+        assert resultMap['sampleRows'] == 10
+        resultList.append((resultMap['estimatedRows'], resultMap['validation'], resultMap['violationMap']))
+    assert resultList[1] == resultList[0] and resultList[2] == resultList[0]
+
+
+#the header fast path copies the lines byte for byte whether they are validated or not
+def test_processFile_fastPathValidated(tmp_path):
+    data = b'id,ref,qty\r\n1,a,x\r\n ,abcd,2 \r\n3,c,3'
+    filePath = tmp_path / 'order.csv'
+    filePath.write_bytes(data)
+    resultMap = processRenamedFile(filePath, headerFastPath='Y', isValidated=False)
+    expected = (tmp_path / 'order_new.csv').read_bytes()
+    assert expected == b'id,code,qty\r\n1,a,x\r\n ,abcd,2 \r\n3,c,3\r\n'
+
+    resultMap = processRenamedFile(filePath, headerFastPath='Y')
+    assert (tmp_path / 'order_new.csv').read_bytes() == expected
+    assert resultMap['status'] == 'Success'
+    assert resultMap['rows'] == 4
+    assert resultMap['violationMap']['counts'] == {'Column count': 0, 'NOT NULL': 1, 'Type': 1, 'Length': 1}
+
+
+#returns the bytes of a restructured file (mode 2) once rewritten by an engine
+def rewriteRestructuredFile(tmp_path, data, engine):
+    filePath = tmp_path / '{}.csv'.format(engine)
+    filePath.write_bytes(data)
+    tableColumnRestructuredMap = {'order_tbl': ['id', 'code', 'qty', 'status']}
+    tableRestructuredMap = {'order_tbl': fieldList + [{'fieldName': 'status', 'dataType': 'varchar(1)', 'isNotNull': True, 'default': 'N'}]}
+    initWorker(getProcessData(updatedTableColumnMap, ['order_tbl'], tableColumnRestructuredMap, tableRestructuredMap, '_new', 'N', engine))
+    assert processFile(str(filePath), 2, 'order_tbl')['status'] == 'Success'
+    return (tmp_path / '{}_new.csv'.format(engine)).read_bytes()
+
+
+#both engines only trim the ascii white spaces of the lines
+def test_processFile_enginesTrimAlike(tmp_path):
+    pytest.importorskip('pandas')
+    data = 'id,code,qty\n 1,a,2 \n\t2,b,3\xa0\n3\u3000,c,\u30007\u3000\n\xa04,d,5\x0c\n'.encode('utf-8')
+    assert rewriteRestructuredFile(tmp_path, data, 'pandas') == rewriteRestructuredFile(tmp_path, data, 'python')
+
+
+#the files are reported in the order they were found, the untouched files (mode 0) included
+@pytest.mark.parametrize('workers', [1, 2])
+def test_process_reportOrder(tmp_path, workers):
+    csvTableMapping = {}
+    for name, tableName in [('a.csv', 'order_tbl'), ('b.csv', 'other_tbl'), ('c.csv', 'order_tbl'), ('d.csv', 'other_tbl')]:
+        filePath = tmp_path / name
+        filePath.write_bytes(b'id,ref,qty\n1,a,2\n')
+        csvTableMapping[str(filePath)] = {'tableName': tableName, 'encoding': 'utf-8'}
+    reportList = []
+    process(csvTableMapping, ['order_tbl'], updatedTableColumnMap, [], {}, {}, '_new', 'N', 'N', workers, onFileProcessed=lambda filePath, csvTableInfo, processResult: reportList.append((filePath, processResult['status'])))
+    assert reportList == [(filePath, 'Success' if csvTableInfo['tableName'] == 'order_tbl' else '-') for filePath, csvTableInfo in csvTableMapping.items()]
+
+
+#bytes that are not valid utf-8 are kept as they are by both engines
+def test_processFile_enginesKeepInvalidBytes(tmp_path):
+    pytest.importorskip('pandas')
+    data = b'id,code,qty\n1,x,2\n2,\xff\xfe,3\n\xe9\x80,\x81,\n'
+    expected = b'id,code,qty,status\n1,x,2,N\n2,\xff\xfe,3,N\n\xe9\x80,\x81,,N\n'
+    assert rewriteRestructuredFile(tmp_path, data, 'python') == expected
+    assert rewriteRestructuredFile(tmp_path, data, 'pandas') == expected
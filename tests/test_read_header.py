@@ -0,0 +1,23 @@
+import pytest
+
+from constants import HEADER_READ_SIZE
+from main import readHeader
+
+encodingList = ['utf-8', 'cp932']
+
+
+#an ascii header is decoded by every encoding, the encoding is then chosen from the start of the data
+@pytest.mark.parametrize('data, expected', [
+    (b'id,name\n1,abc\n', 'utf-8'),
+    ('id,name\n1,あ\n'.encode('utf-8'), 'utf-8'),
+    ('id,name\n1,あ\n'.encode('cp932'), 'cp932'),
+    ('id,名前\n1,abc\n'.encode('cp932'), 'cp932'),
+    #the character cut at the end of the data read is not an error
+    (b'id,name\n' + b'x' * (HEADER_READ_SIZE - 9) + 'あ\n'.encode('utf-8'), 'utf-8'),
+    #none of the encodings decodes the data, the first one decoding the header is used
+    (b'id,name\n1,\x81\x7f\n', 'utf-8'),
+])
+def test_readHeader_encoding(tmp_path, data, expected):
+    filePath = tmp_path / 'data.csv'
+    filePath.write_bytes(data)
+    assert readHeader(str(filePath), encodingList) == (data.split(b'\n')[0].decode(expected), expected)
@@ -0,0 +1,16 @@
+import records
+from records import CsvTableInfo, resetColumns
+
+
+#only the column names of the records still in use are kept
+def test_resetColumns():
+    keptRecord = CsvTableInfo(tableName='order_tbl', unmatchedColumns='ref, note', lackingColumns=['code'])
+    CsvTableInfo(tableName='user_tbl', unmatchedColumns='nickname')
+    emptyRecord = CsvTableInfo(tableName='item_tbl')
+    resetColumns([keptRecord, emptyRecord])
+    assert records.columnNameList == ['ref', 'note', 'code']
+    assert keptRecord['unmatchedColumns'] == 'ref, note' and keptRecord['lackingColumns'] == 'code'
+    assert 'unmatchedColumns' not in emptyRecord
+
+    resetColumns([])
+    assert records.columnNameList == [] and records.columnIndexMap == {}
@@ -0,0 +1,74 @@
+from pathlib import Path
+
+from legacy_schema import parseSchemaByLine
+from main import getSchemaSettings
+from schema import parseSchemaText
+
+pgDumpSchema = (Path(__file__).resolve().parent / 'data' / 'pgdump.sql').read_text(encoding='utf-8')
+
+expectedTableMap = {}
+expectedTableMap['order_tbl'] = [
+    {'fieldName': 'order_id', 'dataType': 'integer', 'isNotNull': True},
+    {'fieldName': 'user_id', 'dataType': 'integer', 'isNotNull': False},
+    {'fieldName': 'price', 'dataType': 'numeric(10,2)', 'isNotNull': True, 'default': '0'},
+    {'fieldName': 'status', 'dataType': 'character varying(3)', 'isNotNull': True, 'default': 'DEFAULT'},
+    {'fieldName': 'created_at', 'dataType': 'timestamp without time zone', 'isNotNull': False},
+]
+expectedTableMap['user_tbl'] = [
+    {'fieldName': 'user_id', 'dataType': 'integer', 'isNotNull': True},
+    {'fieldName': 'user_name', 'dataType': 'text', 'isNotNull': False},
+    {'fieldName': 'rate', 'dataType': 'numeric(5,3)', 'isNotNull': False},
+]
+
+#data types read differently by the former line by line parser, (tokenizer, line parser). It removes the commas of
+#the lines, numeric(10,2) becomes numeric(102), and only keeps the first word of the data types.
+knownDataTypeMap = {}
+knownDataTypeMap[('order_tbl', 'price')] = ('numeric(10,2)', 'numeric(102)')
+knownDataTypeMap[('order_tbl', 'status')] = ('character varying(3)', 'character')
+knownDataTypeMap[('order_tbl', 'created_at')] = ('timestamp without time zone', 'timestamp')
+knownDataTypeMap[('user_tbl', 'rate')] = ('numeric(5,3)', 'numeric(53)')
+
+
+def test_parseSchemaText_pgDump():
+    tableMap, tableColumnMap = parseSchemaText(pgDumpSchema, getSchemaSettings())
+    assert tableMap == expectedTableMap
+    assert tableColumnMap == {tableName: [fieldMap['fieldName'] for fieldMap in fieldList] for tableName, fieldList in expectedTableMap.items()}
+
+
+#the tokenizer reads the same tables and columns as the former parser, the data types listed in knownDataTypeMap aside
+def test_parseSchemaText_lineParser():
+    tableMap, tableColumnMap = parseSchemaText(pgDumpSchema, getSchemaSettings())
+    lineTableMap, lineTableColumnMap = parseSchemaByLine(pgDumpSchema, getSchemaSettings())
+    assert tableColumnMap == lineTableColumnMap
+    assert list(tableMap) == list(lineTableMap)
+
+    dataTypePairMap = {}
+    for tableName in tableMap:
+        for fieldMap, lineFieldMap in zip(tableMap[tableName], lineTableMap[tableName], strict=True):
+            if fieldMap['dataType'] != lineFieldMap['dataType']:
+                dataTypePairMap[(tableName, fieldMap['fieldName'])] = (fieldMap['dataType'], lineFieldMap['dataType'])
+            assert dict(fieldMap, dataType='') == dict(lineFieldMap, dataType='')
+    assert dataTypePairMap == knownDataTypeMap
+
+
+#columns written over several lines, with comments, are read the same way
+def test_parseSchemaText_multiline():
+    multilineSchema = pgDumpSchema.replace(' DEFAULT', '\n        DEFAULT').replace(' NOT NULL', ' -- required\n        NOT NULL')
+    assert multilineSchema.count('NOT NULL') == pgDumpSchema.count('NOT NULL')
+    assert parseSchemaText(multilineSchema, getSchemaSettings()) == parseSchemaText(pgDumpSchema, getSchemaSettings())
+
+
+#CREATE TABLE statements in function bodies and comments are not tables
+def test_parseSchemaText_functionBody():
+    schemaText = pgDumpSchema + '''
+CREATE FUNCTION public.archive() RETURNS void
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    CREATE TABLE archive_tbl (id integer, note text);
+END;
+$$;
+
+/* CREATE TABLE comment_tbl (id integer); */
+'''
+    assert parseSchemaText(schemaText, getSchemaSettings()) == parseSchemaText(pgDumpSchema, getSchemaSettings())
@@ -0,0 +1,36 @@
+from main import getSchemaSettings
+from schema import parseSchemaText
+from validation import compileColumnCheckList, createViolationMap, validateBlock
+
+#table written the way pg_dump writes it
+pgDumpSchema = '''CREATE TABLE public.item_tbl (
+    id integer NOT NULL,
+    code character varying(3) NOT NULL,
+    label varchar(5),
+    price numeric(10,2) DEFAULT 0,
+    created timestamp without time zone
+);
+'''
+
+
+def test_compileColumnCheckList_pgDump():
+    tableMap = parseSchemaText(pgDumpSchema, getSchemaSettings())[0]
+    columnCheckList = compileColumnCheckList(['id', 'code', 'label', 'price', 'created'], tableMap['item_tbl'])
+    assert columnCheckList == [('id', True, 'integer', None), ('code', True, 'length', 3), ('label', False, 'length', 5), ('price', False, 'numeric', None), ('created', False, 'timestamp', None)]
+
+
+def test_validateBlock_length():
+    tableMap = parseSchemaText(pgDumpSchema, getSchemaSettings())[0]
+    columnCheckList = compileColumnCheckList(['id', 'code', 'label'], tableMap['item_tbl'])
+    violationMap = createViolationMap()
+    validateBlock(b'1,abc,ok\n2,abcd,toolong\n3,,x', 2, columnCheckList, violationMap)
+    assert violationMap['counts'] == {'Column count': 0, 'NOT NULL': 1, 'Type': 0, 'Length': 2}
+    assert violationMap['samples'] == {'Length code': [3], 'Length label': [3], 'NOT NULL code': [4]}
+
+
+#the database only accepts the ascii digits in integer and numeric values
+def test_validateBlock_asciiDigits():
+    columnCheckList = [('qty', False, 'integer', None), ('price', False, 'numeric', None)]
+    violationMap = createViolationMap()
+    validateBlock(' 1 ,+2.5e3\n١٢,٣.٤\n１２,１.５\n-3,.4'.encode('utf-8'), 2, columnCheckList, violationMap)
+    assert violationMap['samples'] == {'Type qty': [3, 4], 'Type price': [3, 4]}
@@ -0,0 +1,28 @@
+import gzip
+
+import pytest
+
+from main import writeFileHeader
+
+
+#the data lines are copied as they are whatever their line terminator, only the header is replaced
+@pytest.mark.parametrize('data, expected', [
+    (b'id,code,note\n1,a,b\n2,c,d\n', b'id,ref,note\n1,a,b\n2,c,d\n'),
+    (b'id,code,note\r\n1,a,b\r\n2,c,d\r\n', b'id,ref,note\r\n1,a,b\r\n2,c,d\r\n'),
+    (b'id,code,note\r1,a,b\r2,c,d\r', b'id,ref,note\r1,a,b\r2,c,d\r'),
+    (b'id,code,note\n1,a,b\n2,c,d', b'id,ref,note\n1,a,b\n2,c,d\n'),
+    (b'id,code,note\r1,a,b\r2,c,d', b'id,ref,note\r1,a,b\r2,c,d\r'),
+    (b'id,code,note', b'id,ref,note\n'),
+])
+def test_writeFileHeader(tmp_path, data, expected):
+    filePath = tmp_path / 'data.csv'
+    filePath.write_bytes(data)
+    writeFileHeader(str(filePath), str(tmp_path / 'data_new.csv'), 'id,ref,note')
+    assert (tmp_path / 'data_new.csv').read_bytes() == expected
+
+
+def test_writeFileHeader_compressed(tmp_path):
+    filePath = tmp_path / 'data.csv.gz'
+    filePath.write_bytes(gzip.compress(b'id,code,note\r1,a,b\r2,c,d'))
+    writeFileHeader(str(filePath), str(tmp_path / 'data_new.csv.gz'), 'id,ref,note')
+    assert gzip.decompress((tmp_path / 'data_new.csv.gz').read_bytes()) == b'id,ref,note\r1,a,b\r2,c,d\r'
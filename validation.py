@@ -0,0 +1,208 @@
+import re
+from itertools import compress, repeat
+
+from constants import *
+
+#values accepted by the checked data types. Surrounding spaces and only the ascii digits are accepted, the same way the database does.
+integerPattern = r'[ \t]*[+-]?[0-9]+[ \t]*'
+numericPattern = r'[ \t]*[+-]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][+-]?[0-9]+)?[ \t]*'
+booleanPattern = r'(?i:[ \t]*(?:t|f|true|false|y|n|yes|no|on|off|1|0)[ \t]*)'
+booleanValueList = ['t', 'f', 'true', 'false', 'y', 'n', 'yes', 'no', 'on', 'off', '1', '0']
+lengthPattern = re.compile(r'\(\s*([0-9]+)\s*\)')
+#types written in several words, checked the same way as their short name
+typeAliasMap = {'character varying': 'varchar', 'double precision': 'double', 'timestamp with time zone': 'timestamptz', 'timestamp without time zone': 'timestamp'}
+
+#matches a whole column of values joined with new lines, empty values included. A column is only checked value by value when it does not match.
+def compileColumnPattern(valuePattern):
+    return re.compile('(?:{0})?(?:\n(?:{0})?)*'.format(valuePattern))
+
+#returns True when a column of values joined with new lines only holds ascii digits. Empty values are not type violations.
+def isDigitColumn(columnText):
+    digitText = columnText.replace(NEWLINE, '')
+    return digitText.isascii() and digitText.isdigit()
+
+columnPatternMap = {'integer': compileColumnPattern(integerPattern), 'numeric': compileColumnPattern(numericPattern), 'boolean': compileColumnPattern(booleanPattern)}
+
+
+#returns the check done on the values of a column based on its data type, e.g. varchar(20) or character varying(20).
+#Types that are not listed are not checked.
+def getTypeCheck(dataType):
+    dataType = ' '.join(dataType.lower().split())
+    typeName = dataType.split('(')[0].strip()
+    typeName = typeAliasMap.get(typeName, typeName.split(' ')[0])
+    if typeName in ('integer', 'int', 'int2', 'int4', 'int8', 'smallint', 'bigint', 'serial', 'smallserial', 'bigserial'):
+        return 'integer', None
+    if typeName in ('numeric', 'decimal', 'real', 'double', 'float', 'float4', 'float8'):
+        return 'numeric', None
+    if typeName in ('boolean', 'bool'):
+        return 'boolean', None
+    if typeName == 'date':
+        return 'date', None
+    if typeName in ('timestamp', 'timestamptz'):
+        return 'timestamp', None
+
+    #maximum length of the character types
+    hasLength = lengthPattern.search(dataType)
+    if typeName in ('varchar', 'char', 'character', 'bpchar') and hasLength:
+        return 'length', int(hasLength.group(1))
+    return None, None
+
+
+#returns the checks of each column of a csv file written with the given column names.
+#Each check is (column name, is not null, type check, type check argument).
+def compileColumnCheckList(columnNameList, fieldList):
+    fieldByNameMap = {fieldMap['fieldName']: fieldMap for fieldMap in fieldList}
+    columnCheckList = []
+    for columnName in columnNameList:
+        fieldMap = fieldByNameMap.get(columnName, {})
+        checkType, checkArgument = getTypeCheck(fieldMap.get('dataType', ''))
+        columnCheckList.append((columnName, bool(fieldMap.get('isNotNull')), checkType, checkArgument))
+    return columnCheckList
+
+
+#returns a new map where the violations of a file are counted
+def createViolationMap():
+    violationMap = {}
+    violationMap['rows'] = 0
+    violationMap['counts'] = {'Column count': 0, 'NOT NULL': 0, 'Type': 0, 'Length': 0}
+    #first line numbers per violation and column
+    violationMap['samples'] = {}
+    return violationMap
+
+
+#function to count violations and keep the first line numbers where they occur
+def addViolations(violationMap, violationName, columnName, lineNumberArray):
+    if not len(lineNumberArray):
+        return
+    violationMap['counts'][violationName] += len(lineNumberArray)
+    sampleList = violationMap['samples'].setdefault(f'{violationName} {columnName}'.strip(), [])
+    if len(sampleList) < VALIDATION_SAMPLE_LINES:
+        sampleList.extend(lineNumberArray[:VALIDATION_SAMPLE_LINES - len(sampleList)].tolist())
+
+
+#function to add the violations of a part of a file. The line numbers of the part are shifted by lineOffset, the number of lines before it.
+def mergeViolations(violationMap, partViolationMap, lineOffset):
+    violationMap['rows'] += partViolationMap['rows']
+    for violationName, count in partViolationMap['counts'].items():
+        violationMap['counts'][violationName] += count
+    for violationName, lineNumberList in partViolationMap['samples'].items():
+        sampleList = violationMap['samples'].setdefault(violationName, [])
+        sampleList.extend(lineNumber + lineOffset for lineNumber in lineNumberList[:VALIDATION_SAMPLE_LINES - len(sampleList)])
+
+
+#returns the lines once validated in chunks against the checks of their columns. Each chunk is returned as a single block
+#of lines. The pandas engine yields blocks of lines, they are split back into lines.
+#The lines are bytes, each chunk is decoded with the encoding of the file to be checked. Bytes that are not valid in this encoding are kept as they are.
+#Rows with a different number of values are counted when isColumnCountChecked, otherwise they are counted while being remapped.
+def validateLines(lines, columnCheckList, violationMap, chunkSize=CHUNK_SIZE, isColumnCountChecked=True, encoding=ENCODING_LIST[0]):
+    chunkSize = int(chunkSize)
+    lineList = []
+    firstLineNumber = 2
+    isHeader = True
+    for block in lines:
+        if isHeader:
+            isHeader = False
+            yield block
+            continue
+        lineList.extend(block.split(NEWLINE_BYTES))
+        if len(lineList) >= chunkSize:
+            block = NEWLINE_BYTES.join(lineList)
+            validateBlock(block, firstLineNumber, columnCheckList, violationMap, isColumnCountChecked, encoding)
+            yield block
+            firstLineNumber += len(lineList)
+            lineList = []
+    if lineList:
+        block = NEWLINE_BYTES.join(lineList)
+        validateBlock(block, firstLineNumber, columnCheckList, violationMap, isColumnCountChecked, encoding)
+        yield block
+
+
+#validates a block of lines once decoded
+def validateBlock(block, firstLineNumber, columnCheckList, violationMap, isColumnCountChecked=True, encoding=ENCODING_LIST[0]):
+    block = block.decode(encoding, 'surrogateescape')
+    validateChunk(block.split(NEWLINE), block, firstLineNumber, columnCheckList, violationMap, isColumnCountChecked)
+
+
+#validates the lines of a sample, the header being left out. lineNumberList holds the line number of each line, the lines
+#consecutive in the file are validated together. The lines left out of the sample for having another number of values are counted apart.
+def validateSampleLines(lineList, lineNumberList, columnCountLineNumberList, columnCheckList, violationMap, encoding=ENCODING_LIST[0]):
+    import numpy as np
+
+    violationMap['rows'] += len(columnCountLineNumberList)
+    addViolations(violationMap, 'Column count', '', np.array(columnCountLineNumberList, dtype=np.int64))
+    runStart = 0
+    for index in range(1, len(lineList) + 1):
+        if index == len(lineList) or lineNumberList[index] != lineNumberList[index - 1] + 1:
+            validateBlock(NEWLINE_BYTES.join(lineList[runStart:index]), lineNumberList[runStart], columnCheckList, violationMap, True, encoding)
+            runStart = index
+
+
+#validates a chunk of lines with column-wide operations. block is the chunk joined with new lines.
+def validateChunk(lineList, block, firstLineNumber, columnCheckList, violationMap, isColumnCountChecked=True):
+    #numpy and pandas are loaded on the first chunk validated, the runs without validation do not need them
+    import numpy as np
+    import pandas as pd
+
+    violationMap['rows'] += len(lineList)
+    columnCount = len(columnCheckList)
+    lineNumberArray = np.arange(firstLineNumber, firstLineNumber + len(lineList))
+
+    #the values of rows with a different number of values can not be checked
+    separatorCountArray = np.fromiter(map(str.count, lineList, repeat(',')), dtype=np.int64, count=len(lineList))
+    validRowMask = separatorCountArray == columnCount - 1
+    if not validRowMask.all():
+        if isColumnCountChecked:
+            addViolations(violationMap, 'Column count', '', lineNumberArray[~validRowMask])
+        lineList = list(compress(lineList, validRowMask))
+        lineNumberArray = lineNumberArray[validRowMask]
+        if not lineList:
+            return
+        block = NEWLINE.join(lineList)
+
+    #all the rows have the same number of values so the chunk is split at once
+    valueArray = np.array(block.replace(NEWLINE, ',').split(','), dtype=object).reshape(len(lineList), columnCount)
+
+    for index, (columnName, isNotNull, checkType, checkArgument) in enumerate(columnCheckList):
+        if not isNotNull and checkType is None:
+            continue
+        column = valueArray[:, index]
+        emptyMask = column == ''
+        if isNotNull:
+            addViolations(violationMap, 'NOT NULL', columnName, lineNumberArray[emptyMask])
+        if checkType is None:
+            continue
+
+        #every value of the chunk is valid. Plain unsigned integers, the most common case, are recognized without a regex.
+        columnText = NEWLINE.join(column) if checkType in columnPatternMap else None
+        if checkType == 'integer' and isDigitColumn(columnText):
+            continue
+        if columnText is not None and columnPatternMap[checkType].fullmatch(columnText):
+            continue
+
+        #empty values are loaded as NULL, only the other values are checked
+        valueMask = ~emptyMask
+        if not valueMask.any():
+            continue
+        values = pd.Series(column[valueMask], dtype=object)
+        if checkType == 'integer':
+            invalidMask = ~values.str.fullmatch(integerPattern).to_numpy(dtype=bool)
+        elif checkType == 'numeric':
+            invalidMask = pd.to_numeric(values.str.strip(), errors='coerce').isna().to_numpy()
+        elif checkType == 'boolean':
+            invalidMask = ~values.str.strip().str.lower().isin(booleanValueList).to_numpy()
+        elif checkType == 'date':
+            invalidMask = pd.to_datetime(values.str.strip(), format='%Y-%m-%d', errors='coerce').isna().to_numpy()
+        elif checkType == 'timestamp':
+            invalidMask = pd.to_datetime(values.str.strip(), format='ISO8601', errors='coerce').isna().to_numpy()
+        else:
+            invalidMask = np.fromiter(map(len, values), dtype=np.int64, count=len(values)) > checkArgument
+
+        violationName = 'Length' if checkType == 'length' else 'Type'
+        addViolations(violationMap, violationName, columnName, lineNumberArray[valueMask][invalidMask])
+
+
+#returns the violations of a file as a readable text
+def getViolationSummary(violationMap):
+    if not violationMap['samples']:
+        return 'OK'
+    return '; '.join('{}: line no. {}'.format(violationName, ', '.join(map(str, lineNumberList))) for violationName, lineNumberList in violationMap['samples'].items())